@@ -139,6 +139,9 @@ class AdWordsClient(Client):
     self._config['last_units'] = [0]
     self._config['last_operations'] = [0]
 
+    # Initialize resources shared by all services of this client.
+    self._SetUpSharedResources()
+
     # Only load from the pickle if 'headers' wasn't specified.
     if headers is None:
       self._headers = self.__LoadAuthCredentials()
@@ -30,13 +30,22 @@ from adspygoogle.adwords.AdWordsErrors import AdWordsApiError
 from adspygoogle.adwords.AdWordsErrors import AdWordsError
 from adspygoogle.adwords.AdWordsErrors import ERRORS
 from adspygoogle.adwords.AdWordsSoapBuffer import AdWordsSoapBuffer
+from adspygoogle.common import OperationChunker
+from adspygoogle.common import RateLimiter
 from adspygoogle.common import Utils
+from adspygoogle.common import WsdlRegistry
+from adspygoogle.common import WsdlSnapshot
 from adspygoogle.common.Errors import Error
 from adspygoogle.common.Errors import ValidationError
 from adspygoogle.common.GenericApiService import GenericApiService
 from adspygoogle.common.GenericApiService import MethodInfoKeys
 
 
+# Services read the WSDLs bundled with the library, if any, before downloading.
+WsdlRegistry.REGISTRY.AddSnapshot(
+    'adspygoogle.adwords', WsdlSnapshot.Load('adspygoogle.adwords'))
+
+
 class GenericAdWordsService(GenericApiService):
 
   """Wrapper for any AdWords web service."""
@@ -56,8 +65,18 @@ class GenericAdWordsService(GenericApiService):
   # The _BUFFER_CLASS is the subclass of SoapBuffer that should be used to track
   # all SOAP interactions
   _BUFFER_CLASS = AdWordsSoapBuffer
+  # The _PACKAGE is the package whose WSDL snapshot the services read.
+  _PACKAGE = 'adspygoogle.adwords'
   # List of fields we should convert to string.
   _STR_CONVERT = ['clientCustomerId']
+  # Maps the rateScope of a RateExceededError to the rate limiter's scope.
+  _RATE_SCOPES = {
+      'ACCOUNT': RateLimiter.CUSTOMER,
+      'DEVELOPER': RateLimiter.TOKEN
+  }
+  # The _TRANSIENT_ERROR_TYPES are the ApiError types of failures which may
+  # succeed when retried.
+  _TRANSIENT_ERROR_TYPES = ('InternalApiError', 'RateExceededError')
 
   def __init__(self, headers, config, op_config, lock, logger, service_name):
     """Inits GenericAdWordsService.
@@ -68,7 +87,8 @@ class GenericAdWordsService(GenericApiService):
       config: dict Dictionary object with populated configuration values.
       op_config: dict Dictionary object with additional configuration values for
                  this operation.
-      lock: thread.lock Thread lock to use to synchronize requests.
+      lock: thread.lock Thread lock guarding the authentication token and the
+            unit counters shared with the client's other services.
       logger: Logger Instance of Logger to use for logging.
       service_name: string The name of this service.
     """
@@ -88,32 +108,46 @@ class GenericAdWordsService(GenericApiService):
         GenericAdWordsService._WRAP_LISTS, GenericAdWordsService._BUFFER_CLASS,
         namespace, namespace_extractor)
 
-    # AdWords-specific changes to the SOAPpy.WSDL.Proxy
+  def _SetUpSoappyService(self, soappyservice):
+    """Sets the AdWords-specific method attributes of the SOAPpy proxy.
+
+    Args:
+      soappyservice: SOAPpy.WSDL.Proxy The SOAPpy proxy of this service.
+    """
     methodattrs = {}
-    for namespace in self._soappyservice.wsdl.types.keys():
+    for namespace in soappyservice.wsdl.types.keys():
       group_name = AdWordsUtils.ExtractGroupNameFromUrl(namespace)
       methodattrs['xmlns:' + group_name] = namespace
     methodattrs['xmlns'] = self._namespace
-    self._soappyservice.soapproxy.methodattrs = methodattrs
+    soappyservice.soapproxy.methodattrs = methodattrs
 
   def _SetHeaders(self):
-    """Sets the SOAP headers for this service's requests."""
-    now = time.time()
-    if ((('authToken' not in self._headers and
-          'auth_token_epoch' not in self._config) or
-         int(now - self._config['auth_token_epoch']) >= AUTH_TOKEN_EXPIRE) and
-        not self._headers.get('oauth2credentials')):
-      if ('email' not in self._headers or not self._headers['email'] or
-          'password' not in self._headers or not self._headers['password']):
-        raise ValidationError('Required authentication headers, \'email\' and '
-                              '\'password\', are missing. Unable to regenerate '
-                              'authentication token.')
-      self._headers['authToken'] = Utils.GetAuthToken(
-          self._headers['email'], self._headers['password'], AUTH_TOKEN_SERVICE,
-          LIB_SIG, self._config['proxy'])
-      self._config['auth_token_epoch'] = time.time()
-
-    # Apply headers to the SOAPpy service.
+    """Builds the SOAP headers for a request made by this service.
+
+    Returns:
+      SOAPpy.Types.headerType The SOAP headers to send.
+    """
+    self._lock.acquire()
+    try:
+      now = time.time()
+      if ((('authToken' not in self._headers and
+            'auth_token_epoch' not in self._config) or
+           int(now - self._config['auth_token_epoch']) >= AUTH_TOKEN_EXPIRE) and
+          not self._headers.get('oauth2credentials')):
+        if ('email' not in self._headers or not self._headers['email'] or
+            'password' not in self._headers or not self._headers['password']):
+          raise ValidationError('Required authentication headers, \'email\' '
+                                'and \'password\', are missing. Unable to '
+                                'regenerate authentication token.')
+        self._headers['authToken'] = Utils.GetAuthToken(
+            self._headers['email'], self._headers['password'],
+            AUTH_TOKEN_SERVICE, LIB_SIG, self._config['proxy'])
+        self._config['auth_token_epoch'] = time.time()
+      headers = self._headers.copy()
+    finally:
+      self._lock.release()
+
+    # Build the SOAPpy headers from this call's snapshot of the headers.
     header_attrs = {
         'xmlns': self._namespace,
         'xmlns:cm': ('https://adwords.google.com/api/adwords/cm/' +
@@ -123,10 +157,10 @@ class GenericAdWordsService(GenericApiService):
     request_header_data = {}
     for key in GenericAdWordsService._POSSIBLE_ADWORDS_REQUEST_HEADERS:
       if (key in GenericAdWordsService._OAUTH_IGNORE_HEADERS
-          and self._headers.get('oauth2credentials')):
+          and headers.get('oauth2credentials')):
         continue
-      if key in self._headers and self._headers[key]:
-        value = self._headers[key]
+      if key in headers and headers[key]:
+        value = headers[key]
         if key in GenericAdWordsService._STR_CONVERT:
           value = str(value)
         request_header_data['cm:' + key] = SOAPpy.Types.stringType(
@@ -134,7 +168,7 @@ class GenericAdWordsService(GenericApiService):
     request_header = SOAPpy.Types.structType(
         data=request_header_data, name='RequestHeader', typed=0)
     soap_headers.RequestHeader = request_header
-    self._soappyservice.soapproxy.header = soap_headers
+    return soap_headers
 
   def _GetMethodInfo(self, method_name):
     """Pulls all of the relevant data about a method from a SOAPpy service.
@@ -203,6 +237,95 @@ class GenericAdWordsService(GenericApiService):
             AdWordsUtils.TransformUserListRuleOperands(operation['operand'])
     return args
 
+  def _GetWsdlSnapshotKey(self):
+    """Returns the key of this service's WSDL in the bundled snapshots.
+
+    Services of a limited access version have their own WSDLs, which are not
+    bundled.
+
+    Returns:
+      tuple The product's package, version and service name, or None if the
+      WSDL is not to be read from a snapshot.
+    """
+    if self._config['access']:
+      return None
+    return super(GenericAdWordsService, self)._GetWsdlSnapshotKey()
+
+  def _GetRateLimitKeys(self):
+    """Returns the keys a call made by this service is rate limited by.
+
+    Returns:
+      list (scope, value) tuples, see RateLimiter.RateLimiter.Acquire.
+    """
+    keys = super(GenericAdWordsService, self)._GetRateLimitKeys()
+    if self._headers.get('developerToken'):
+      keys.append((RateLimiter.TOKEN, self._headers['developerToken']))
+    if self._headers.get('clientCustomerId'):
+      keys.append((RateLimiter.CUSTOMER, self._headers['clientCustomerId']))
+    return keys
+
+  def _GetRateLimitBackoff(self, error):
+    """Tells whether an error is a RateExceededError.
+
+    Args:
+      error: Exception The error raised by a call.
+
+    Returns:
+      tuple The scope the rate was exceeded in and the number of seconds the
+      server asked to wait for, or None if the error is not a rate error.
+    """
+    if isinstance(error, AdWordsApiError):
+      for detail in error.errors:
+        if getattr(detail, 'type', None) == 'RateExceededError':
+          retry_after = getattr(detail, 'retryAfterSeconds', None)
+          if retry_after is not None:
+            retry_after = int(retry_after)
+          return (self._RATE_SCOPES.get(getattr(detail, 'rateScope', None)),
+                  retry_after)
+    return None
+
+  def _IsTransientError(self, error):
+    """Tells whether a call failed with an error worth retrying.
+
+    Args:
+      error: Exception The error raised or returned by the call.
+
+    Returns:
+      bool True if the call may succeed when retried.
+    """
+    if isinstance(error, AdWordsApiError):
+      for detail in error.errors:
+        if (getattr(detail, 'type', None) in
+            GenericAdWordsService._TRANSIENT_ERROR_TYPES):
+          return True
+    return super(GenericAdWordsService, self)._IsTransientError(error)
+
+  def _OffsetMutateResult(self, result, offset):
+    """Shifts the field paths of partial failure errors in a chunk's result.
+
+    Args:
+      result: mixed The result of a call sending a chunk of operations.
+      offset: int The index of the chunk's first operation in the whole list.
+
+    Returns:
+      mixed The result, its partial failure errors pointing into the whole list
+      of operations.
+    """
+    if not offset:
+      return result
+    if isinstance(result, (list, tuple)):
+      return_values = result
+    else:
+      return_values = [result]
+    for return_value in return_values:
+      if not isinstance(return_value, dict):
+        continue
+      for error in return_value.get('partialFailureErrors') or []:
+        if isinstance(error, dict) and error.get('fieldPath'):
+          error['fieldPath'] = OperationChunker.OffsetFieldPath(
+              error['fieldPath'], offset)
+    return result
+
   def _HandleLogsAndErrors(self, buf, start_time, stop_time, error=None):
     """Manage SOAP XML message.
 
@@ -218,10 +341,14 @@ class GenericAdWordsService(GenericApiService):
     try:
       # Update the number of units and operations consumed by API call.
       if buf.GetCallUnits() and buf.GetCallOperations():
-        self._config['units'][0] += int(buf.GetCallUnits())
-        self._config['operations'][0] += int(buf.GetCallOperations())
-        self._config['last_units'][0] = int(buf.GetCallUnits())
-        self._config['last_operations'][0] = int(buf.GetCallOperations())
+        self._lock.acquire()
+        try:
+          self._config['units'][0] += int(buf.GetCallUnits())
+          self._config['operations'][0] += int(buf.GetCallOperations())
+          self._config['last_units'][0] = int(buf.GetCallUnits())
+          self._config['last_operations'][0] = int(buf.GetCallOperations())
+        finally:
+          self._lock.release()
 
       handlers = self.__GetLogHandlers(buf)
       fault = super(GenericAdWordsService, self)._ManageSoap(
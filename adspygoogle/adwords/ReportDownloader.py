@@ -21,6 +21,7 @@ __author__ = 'api.kwinter@gmail.com (Kevin Winter)'
 import datetime
 import gzip
 import re
+import socket
 import StringIO
 import time
 import urllib
@@ -36,6 +37,7 @@ from adspygoogle.adwords.util import XsdToWsdl
 from adspygoogle.common import MessageHandler
 from adspygoogle.common import SanityCheck
 from adspygoogle.common import Utils
+from adspygoogle.common.Errors import TimeoutError
 from adspygoogle.common.Errors import ValidationError
 from adspygoogle.common.Logger import Logger
 
@@ -78,7 +80,8 @@ class ReportDownloader(object):
     xsd_url = '%s%s%s/reportDefinition.xsd' % (op_config['server'],
                                                '/api/adwords/reportdownload/',
                                                self._op_config['version'])
-    self._soappyservice = XsdToWsdl.CreateWsdlFromXsdUrl(xsd_url)
+    self._soappyservice = XsdToWsdl.CreateWsdlFromXsdUrl(
+        xsd_url, config.get('wsdl_cache'))
     self._logger = logger
 
   def DownloadReport(self, report_definition_or_id, return_micros=False,
@@ -312,6 +315,9 @@ class ReportDownloader(object):
 
     Returns:
       str Report data as a string if fileobj=None, otherwise None
+
+    Raises:
+      TimeoutError: if the server did not answer within the read timeout.
     """
     headers = headers or {}
     request_url = self._op_config['server'] + url
@@ -328,9 +334,13 @@ class ReportDownloader(object):
 
     start_time = time.strftime('%Y-%m-%d %H:%M:%S')
     request = urllib2.Request(request_url, payload, headers)
+    response_code = '---'
+    response_headers = []
     try:
       try:
-        response = urllib2.urlopen(request)
+        response = urllib2.urlopen(
+            request, None,
+            Utils.GetDownloadTimeout(self._config, self._op_config))
         response_code = response.code
         response_headers = response.info().headers
         if response.info().get('Content-Encoding') == 'gzip':
@@ -355,7 +365,11 @@ class ReportDownloader(object):
         response = e
         response_code = '---'
         response_headers = []
+        if isinstance(e.reason, socket.timeout):
+          raise TimeoutError('Report download timed out: %s' % e.reason)
         raise AdWordsError(str(e))
+      except socket.timeout, e:
+        raise TimeoutError('Report download timed out: %s' % e)
     finally:
       end_time = time.strftime('%Y-%m-%d %H:%M:%S')
       xml_log_data = self.__CreateXmlLogData(start_time, end_time, request_url,
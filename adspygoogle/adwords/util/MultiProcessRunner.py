@@ -0,0 +1,176 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Runs a task for many client customers across several processes.
+
+Packing and unpacking SOAP messages is pure Python and holds the GIL, so
+threads do not speed up jobs which go through thousands of accounts of an MCC.
+This module spreads such jobs over a pool of processes, each with its own
+AdWordsClient built from a picklable ClientSpec.
+
+Example:
+  def GetCampaignCount(client, customer_id, server, version):
+    service = client.GetCampaignService(server, version)
+    return service.get({'fields': ['Id']})[0]['totalNumEntries']
+
+  spec = ClientSpec(headers, config)
+  for customer_id, count, error in RunForCustomers(spec, GetCampaignCount,
+                                                   customer_ids):
+    ...
+
+The task must be a module-level function so that it can be pickled, and so
+must its return value. Errors it raises which cannot be pickled are replaced
+by an Error holding their message.
+"""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import multiprocessing
+import pickle
+
+from adspygoogle.adwords import DEFAULT_API_VERSION
+from adspygoogle.common.Errors import Error
+
+
+# The client instance of the current worker process, set by _InitWorker.
+_worker_client = None
+# The ClientSpec the current worker process was started with.
+_worker_spec = None
+
+
+class ClientSpec(object):
+
+  """Picklable description of an AdWordsClient.
+
+  Live objects, such as OAuth 2.0 credentials, connection pools and locks,
+  cannot be sent to other processes. OAuth 2.0 credentials are converted to
+  JSON and rebuilt in each worker; other values in the config which cannot be
+  pickled are dropped and recreated by the worker's client.
+  """
+
+  def __init__(self, headers, config=None,
+               server='https://adwords.google.com', version=None):
+    """Inits ClientSpec.
+
+    Args:
+      headers: dict Authentication headers, as given to AdWordsClient.
+      [optional]
+      config: dict Configuration values, as given to AdWordsClient.
+      server: str API server the task's services should access.
+      version: str API version the task's services should use.
+    """
+    self.headers = {}
+    self.oauth2credentials_json = None
+    for key, value in headers.iteritems():
+      if key == 'oauth2credentials':
+        if value is not None:
+          self.oauth2credentials_json = value.to_json()
+      else:
+        self.headers[key] = value
+
+    self.config = {}
+    for key, value in (config or {}).iteritems():
+      try:
+        pickle.dumps(value)
+      except Exception:
+        continue
+      self.config[key] = value
+
+    self.server = server
+    if version is None:
+      version = DEFAULT_API_VERSION
+    self.version = version
+
+  def CreateClient(self):
+    """Creates an AdWordsClient from this spec.
+
+    Returns:
+      AdWordsClient A new client.
+    """
+    from adspygoogle.adwords.AdWordsClient import AdWordsClient
+    headers = dict(self.headers)
+    if self.oauth2credentials_json is not None:
+      from oauth2client.client import Credentials
+      headers['oauth2credentials'] = Credentials.new_from_json(
+          self.oauth2credentials_json)
+    return AdWordsClient(headers=headers, config=dict(self.config) or None)
+
+
+def RunForCustomers(spec, task, customer_ids, processes=None, chunksize=1):
+  """Runs a task for each client customer on a pool of processes.
+
+  Results are yielded as soon as they are available, so they may come back in
+  a different order than the given customer IDs.
+
+  Args:
+    spec: ClientSpec The client each worker process should create.
+    task: function A module-level function taking the worker's AdWordsClient,
+          already set to the client customer, the client customer ID, and the
+          spec's server and version.
+    customer_ids: list The client customer IDs to run the task for.
+    [optional]
+    processes: int Number of worker processes. Defaults to the number of CPUs.
+    chunksize: int Number of customers sent to a worker at a time.
+
+  Yields:
+    tuple The client customer ID, the task's return value (None if it raised
+    an error) and the error it raised (None if it succeeded).
+  """
+  pool = multiprocessing.Pool(processes, _InitWorker, (spec,))
+  try:
+    jobs = [(task, customer_id) for customer_id in customer_ids]
+    for outcome in pool.imap_unordered(_RunTask, jobs, chunksize):
+      yield outcome
+    pool.close()
+  finally:
+    pool.terminate()
+    pool.join()
+
+
+def _InitWorker(spec):
+  """Creates the client of a worker process.
+
+  Args:
+    spec: ClientSpec The client to create.
+  """
+  global _worker_client
+  global _worker_spec
+  _worker_spec = spec
+  _worker_client = spec.CreateClient()
+
+
+def _RunTask(job):
+  """Runs the task for one client customer in a worker process.
+
+  Args:
+    job: tuple The task function and the client customer ID.
+
+  Returns:
+    tuple The client customer ID, the task's return value and its error.
+  """
+  task, customer_id = job
+  _worker_client.SetClientCustomerId(customer_id)
+  try:
+    return (customer_id,
+            task(_worker_client, customer_id, _worker_spec.server,
+                 _worker_spec.version),
+            None)
+  except Exception, e:
+    try:
+      pickle.loads(pickle.dumps(e))
+    except Exception:
+      e = Error('%s: %s' % (e.__class__.__name__, e))
+    return customer_id, None, e
@@ -19,6 +19,7 @@
 __author__ = 'api.kwinter@gmail.com (Kevin Winter)'
 
 import re
+import threading
 import urllib
 
 from adspygoogle import SOAPpy
@@ -34,6 +35,10 @@ WSDL_TEMPLATE = ('<?xml version="1.0" encoding="UTF-8"?>'
                  '<wsdl:types>%s</wsdl:types>'
                  '</wsdl:definitions>')
 
+# Fake WSDL proxies already created, keyed by XSD URL.
+_PROXIES = {}
+_PROXIES_LOCK = threading.Lock()
+
 
 class FakeWsdlProxy(SOAPpy.WSDL.Proxy):
 
@@ -62,29 +67,55 @@ def ElementToComplexType(xsd):
   return xsd
 
 
-def CreateWsdlFromXsdUrl(xsd_url):
+def CreateWsdlFromXsdUrl(xsd_url, wsdl_cache=None):
   """Creates a fake WSDL object we can use with our SOAPpy xml logic.
 
+  The XSD at each URL, which identifies the server and version, is downloaded
+  and parsed once per process. The proxy returned is shared and must not be
+  changed.
+
   Args:
     xsd_url: str URL the XSD can be located at.
+    [optional]
+    wsdl_cache: WsdlCache.WsdlCache The on-disk cache to read the XSD through,
+                if any.
 
   Returns:
     FakeWsdlProxy: A Fake WSDL proxy.
   """
-  wsdl = DownloadAndWrapXsdInWsdl(xsd_url)
+  _PROXIES_LOCK.acquire()
+  try:
+    if xsd_url in _PROXIES:
+      return _PROXIES[xsd_url]
+  finally:
+    _PROXIES_LOCK.release()
+
+  wsdl = DownloadAndWrapXsdInWsdl(xsd_url, wsdl_cache)
   reader = wstools.WSDLTools.WSDLReader()
   parsed_wsdl = reader.loadFromString(wsdl)
-  return FakeWsdlProxy(parsed_wsdl)
+
+  _PROXIES_LOCK.acquire()
+  try:
+    # Another thread may have created the proxy meanwhile; keep the first one.
+    return _PROXIES.setdefault(xsd_url, FakeWsdlProxy(parsed_wsdl))
+  finally:
+    _PROXIES_LOCK.release()
 
 
-def DownloadAndWrapXsdInWsdl(url):
+def DownloadAndWrapXsdInWsdl(url, wsdl_cache=None):
   """Creates a fake WSDL text from XSD text.
 
   Args:
     url: str URL the XSD can be located at.
+    [optional]
+    wsdl_cache: WsdlCache.WsdlCache The on-disk cache to read the XSD through,
+                if any.
 
   Returns:
     str: WSDL wrapping the provided XSD.
   """
-  xsd = urllib.urlopen(url).read()
+  if wsdl_cache:
+    xsd = wsdl_cache.Fetch(url)
+  else:
+    xsd = urllib.urlopen(url).read()
   return WSDL_TEMPLATE % ElementToComplexType(xsd)
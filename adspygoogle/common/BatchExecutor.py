@@ -0,0 +1,186 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Runs many SOAP calls concurrently on a pool of threads."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import Queue
+import threading
+import time
+
+from adspygoogle.common import WorkerPool
+from adspygoogle.common.Errors import Error
+
+
+class CallResult(object):
+
+  """The outcome of one call run by ExecuteConcurrently.
+
+  Attributes:
+    service: GenericApiService The service the call was made on.
+    method_name: str The name of the called method.
+    args: tuple The arguments the method was called with.
+    result: mixed The value returned by the call, None if it raised an error.
+    error: Exception The error raised by the call, None if it succeeded.
+    latency: float Number of seconds the call took.
+    units: int Number of API units the call consumed, None if the product
+           does not report units or the response did not contain them.
+    operations: int Number of operations the call performed, None if the
+                product does not report them.
+  """
+
+  def __init__(self, service, method_name, args):
+    """Inits CallResult.
+
+    Args:
+      service: GenericApiService The service to make the call on.
+      method_name: str The name of the method to call.
+      args: tuple The arguments to call the method with.
+    """
+    self.service = service
+    self.method_name = method_name
+    self.args = tuple(args)
+    self.result = None
+    self.error = None
+    self.latency = None
+    self.units = None
+    self.operations = None
+
+  def IsSuccess(self):
+    """Returns whether the call completed without raising an error.
+
+    Returns:
+      bool True if the call succeeded, False otherwise.
+    """
+    return self.error is None
+
+  def _Run(self):
+    """Makes the call and records its outcome."""
+    start_time = time.time()
+    try:
+      self.result = getattr(self.service, self.method_name)(*self.args)
+    except Exception, e:
+      self.error = e
+    self.latency = time.time() - start_time
+
+    get_last_buffer = getattr(self.service, 'GetLastBuffer', None)
+    if get_last_buffer is None:
+      return
+    buf = get_last_buffer()
+    if buf is None or not hasattr(buf, 'GetCallUnits'):
+      return
+    try:
+      if buf.GetCallUnits():
+        self.units = int(buf.GetCallUnits())
+      if buf.GetCallOperations():
+        self.operations = int(buf.GetCallOperations())
+    except Error:
+      # The call failed before a SOAP response was received.
+      pass
+
+
+def ExecuteConcurrently(calls, max_workers=None, worker_pool=None):
+  """Runs SOAP calls concurrently on the calling thread and a worker pool.
+
+  Services of the same client can be used concurrently, so the calls may mix
+  services freely. An error raised by one call is recorded in its CallResult
+  and does not affect the other calls.
+
+  The calling thread makes calls itself, helped by threads of the worker pool.
+  Helpers which only get a thread once all calls have been made are not
+  waited for, so a batch run from a thread of the pool completes even when
+  the pool is busy.
+
+  Args:
+    calls: list (service, method name, args) tuples, args being a tuple or list
+           of the arguments to pass to the method.
+    [optional]
+    max_workers: int Maximum number of calls to run at the same time. Defaults
+                 to the calling thread plus every thread of the pool.
+    worker_pool: WorkerPool.WorkerPool The pool to run calls on besides the
+                 calling thread. Defaults to WorkerPool.DEFAULT_POOL.
+
+  Returns:
+    list CallResult objects, one per call, in the order of the given calls.
+
+  Raises:
+    ValueError: if max_workers is less than 1.
+  """
+  if max_workers is not None and max_workers < 1:
+    raise ValueError('max_workers must be at least 1.')
+  if worker_pool is None:
+    worker_pool = WorkerPool.DEFAULT_POOL
+  if max_workers is None:
+    max_workers = worker_pool.GetMaxWorkers() + 1
+
+  results = [CallResult(service, method_name, args)
+             for service, method_name, args in calls]
+  pending = Queue.Queue()
+  for result in results:
+    pending.put(result)
+
+  state = {'done': False, 'started': []}
+  state_lock = threading.Lock()
+  helpers = []
+  for index in range(min(max_workers, len(results)) - 1):
+    helpers.append(worker_pool.Submit(_Help, index, pending, state,
+                                      state_lock))
+  _Work(pending)
+
+  state_lock.acquire()
+  try:
+    state['done'] = True
+    started = list(state['started'])
+  finally:
+    state_lock.release()
+  for index in started:
+    helpers[index].Result()
+  return results
+
+
+def _Help(index, pending, state, state_lock):
+  """Runs calls from the queue on a pool thread, unless all were made.
+
+  Args:
+    index: int The index of this helper.
+    pending: Queue.Queue The CallResult objects of the calls left to run.
+    state: dict Whether the calling thread has stopped waiting for helpers
+           ('done') and the indexes of the helpers which started ('started').
+    state_lock: threading.Lock Guards state.
+  """
+  state_lock.acquire()
+  try:
+    if state['done']:
+      return
+    state['started'].append(index)
+  finally:
+    state_lock.release()
+  _Work(pending)
+
+
+def _Work(pending):
+  """Runs calls from the queue until it is empty.
+
+  Args:
+    pending: Queue.Queue The CallResult objects of the calls left to run.
+  """
+  while True:
+    try:
+      result = pending.get_nowait()
+    except Queue.Empty:
+      return
+    result._Run()
@@ -23,9 +23,18 @@ import os
 import pickle
 import warnings
 
+from adspygoogle.common import BatchExecutor
+from adspygoogle.common import ConnectionPool
+from adspygoogle.common import HedgePolicy
 from adspygoogle.common import PYXML
+from adspygoogle.common import RateLimiter
+from adspygoogle.common import ResponseCache
+from adspygoogle.common import RetryPolicy
 from adspygoogle.common import SanityCheck
+from adspygoogle.common import SingleFlight
 from adspygoogle.common import Utils
+from adspygoogle.common import WorkerPool
+from adspygoogle.common import WsdlCache
 from adspygoogle.common.Errors import ValidationError
 
 
@@ -45,7 +54,30 @@ _DEFAULT_CONFIG = {
     'pretty_xml': 'y',
     'compress': 'y',
     'access': '',
-    'wrap_in_tuple': 'y'
+    'wrap_in_tuple': 'y',
+    'pool_size': ConnectionPool.DEFAULT_MAX_CONNECTIONS,
+    'pool_timeout': ConnectionPool.DEFAULT_IDLE_TIMEOUT,
+    'async_workers': WorkerPool.DEFAULT_MAX_WORKERS,
+    'token_rate': None,
+    'customer_rate': None,
+    'service_rate': None,
+    'max_retries': RetryPolicy.DEFAULT_MAX_RETRIES,
+    'retry_delay': RetryPolicy.DEFAULT_BASE_DELAY,
+    'retry_mutates': 'n',
+    'conn_timeout': None,
+    'read_timeout': None,
+    'call_timeout': None,
+    'hedge_calls': 'n',
+    'hedge_pctile': HedgePolicy.DEFAULT_PERCENTILE,
+    'coalesce': 'n',
+    'cache_ttl': None,
+    'cache_entries': ResponseCache.DEFAULT_MAX_ENTRIES,
+    'cache_bytes': ResponseCache.DEFAULT_MAX_BYTES,
+    'wsdl_dir': None,
+    'wsdl_offline': 'n',
+    'codegen': 'n',
+    'direct_xml': 'n',
+    'stream_body': 'n'
 }
 
 # The _OAUTH_2_AUTH_KEYS are the keys in the authentication dictionary that are
@@ -163,6 +195,193 @@ class Client(object):
         config[key] = _DEFAULT_CONFIG[key]
     return config
 
+  def _SetUpSharedResources(self):
+    """Creates the resources shared by all services of this client.
+
+    The resources are stored in the config dictionary, which is handed to every
+    service this client creates. Must be called once the config is loaded.
+    """
+    self._config['connection_pool'] = ConnectionPool.ConnectionPool(
+        self._config['pool_size'], self._config['pool_timeout'])
+    self._config['worker_pool'] = WorkerPool.WorkerPool(
+        self._config['async_workers'])
+    self._config['rate_limiter'] = RateLimiter.RateLimiter({
+        RateLimiter.TOKEN: self._config['token_rate'],
+        RateLimiter.CUSTOMER: self._config['customer_rate'],
+        RateLimiter.SERVICE: self._config['service_rate']
+    })
+    self._config['retry_policy'] = RetryPolicy.RetryPolicy(
+        self._config['max_retries'], self._config['retry_delay'],
+        Utils.BoolTypeConvert(self._config['retry_mutates']))
+    if Utils.BoolTypeConvert(self._config['hedge_calls']):
+      self._config['hedge_policy'] = HedgePolicy.HedgePolicy(
+          self._config['hedge_pctile'], self._config['worker_pool'])
+    if Utils.BoolTypeConvert(self._config['coalesce']):
+      self._config['single_flight'] = SingleFlight.SingleFlight()
+    if self._config['cache_ttl'] is not None:
+      self._config['response_cache'] = ResponseCache.ResponseCache(
+          self._config['cache_ttl'], self._config['cache_entries'],
+          self._config['cache_bytes'])
+    if self._config['wsdl_dir']:
+      self._config['wsdl_cache'] = WsdlCache.WsdlCache(
+          self._config['wsdl_dir'],
+          Utils.BoolTypeConvert(self._config['wsdl_offline']))
+
+  def GetConnectionPoolStats(self):
+    """Return usage counters of the HTTP connection pool of this client.
+
+    Returns:
+      dict Connection pool statistics, see ConnectionPool.GetStats.
+    """
+    return self._config['connection_pool'].GetStats()
+
+  def GetRateLimiterStats(self):
+    """Return usage counters of the rate limiter of this client.
+
+    Returns:
+      dict Rate limiter statistics, see RateLimiter.GetStats.
+    """
+    return self._config['rate_limiter'].GetStats()
+
+  def GetRetryStats(self):
+    """Return retry counters of the calls made by this client.
+
+    Returns:
+      dict Retry statistics, see RetryPolicy.GetStats.
+    """
+    return self._config['retry_policy'].GetStats()
+
+  def GetHedgeStats(self):
+    """Return hedging counters of the calls made by this client.
+
+    Returns:
+      dict Hedge statistics, see HedgePolicy.GetStats, or None if hedging is
+      off.
+    """
+    if 'hedge_policy' not in self._config:
+      return None
+    return self._config['hedge_policy'].GetStats()
+
+  def GetCoalescingStats(self):
+    """Return coalescing counters of the calls made by this client.
+
+    Returns:
+      dict Coalescing statistics, see SingleFlight.GetStats, or None if
+      coalescing is off.
+    """
+    if 'single_flight' not in self._config:
+      return None
+    return self._config['single_flight'].GetStats()
+
+  def GetResponseCacheStats(self):
+    """Return usage counters of the response cache of this client.
+
+    Returns:
+      dict Response cache statistics, see ResponseCache.GetStats, or None if
+      caching is off.
+    """
+    if 'response_cache' not in self._config:
+      return None
+    return self._config['response_cache'].GetStats()
+
+  def SetCacheTtl(self, service_name, ttl):
+    """Sets how long the responses of a service are cached for.
+
+    Args:
+      service_name: str The name of the service, e.g. 'CampaignService'.
+      ttl: float Seconds its responses are kept, 0 to not cache them. None to
+           use the cache_ttl config value again.
+
+    Raises:
+      ValidationError: if caching is off, see the cache_ttl config value.
+    """
+    if 'response_cache' not in self._config:
+      raise ValidationError('Response caching is off, set cache_ttl to turn '
+                            'it on.')
+    self._config['response_cache'].SetTtl(service_name, ttl)
+
+  def InvalidateResponseCache(self, service_name=None, customer=None):
+    """Drops cached responses.
+
+    Args:
+      [optional]
+      service_name: str The name of the service whose responses to drop. All
+                    services if None.
+      customer: str The customer, e.g. clientCustomerId or networkCode, whose
+                responses to drop. All customers if None.
+    """
+    if 'response_cache' in self._config:
+      self._config['response_cache'].Invalidate(service_name, customer)
+
+  def GetWsdlCacheStats(self):
+    """Return usage counters of the on-disk WSDL cache of this client.
+
+    Returns:
+      dict WSDL cache statistics, see WsdlCache.GetStats, or None if there is
+      no WSDL cache.
+    """
+    if 'wsdl_cache' not in self._config:
+      return None
+    return self._config['wsdl_cache'].GetStats()
+
+  def ExecuteConcurrently(self, calls, max_workers=None):
+    """Runs SOAP calls on the calling thread and the client's worker pool.
+
+    Args:
+      calls: list (service, method name, args) tuples, where service was
+             created by this client and args is a tuple of the arguments to pass
+             to the method.
+      [optional]
+      max_workers: int Maximum number of calls to run at the same time.
+                   Defaults to the calling thread plus the async_workers
+                   threads of the worker pool.
+
+    Returns:
+      list BatchExecutor.CallResult objects holding the result or error,
+      latency and units of each call, in the order of the given calls.
+    """
+    return BatchExecutor.ExecuteConcurrently(calls, max_workers,
+                                             self._config['worker_pool'])
+
+  def Prefetch(self, service_names, **kwargs):
+    """Loads the WSDLs of services in the background.
+
+    Services load their WSDL on first use. Prefetching them loads the WSDLs in
+    parallel on the client's worker pool, so that their first calls do not wait
+    for the download and parse. The WSDLs are shared with every service later
+    created for the same server and version.
+
+    Args:
+      service_names: list Names of the services to load, e.g. 'CampaignService'.
+      **kwargs: dict Keyword arguments for the services' Get*Service methods,
+                such as server and version.
+
+    Returns:
+      list WorkerPool.Future objects, in the order of the given services, whose
+      results are the services once their WSDL is loaded.
+    """
+    futures = []
+    for service_name in service_names:
+      if hasattr(self, 'Get' + service_name):
+        service = getattr(self, 'Get' + service_name)(**kwargs)
+      else:
+        service = self.GetService(service_name, **kwargs)
+      futures.append(self._config['worker_pool'].Submit(
+          self._LoadServiceWsdl, service))
+    return futures
+
+  def _LoadServiceWsdl(self, service):
+    """Loads the WSDL of a service.
+
+    Args:
+      service: GenericApiService The service to load.
+
+    Returns:
+      GenericApiService The service.
+    """
+    service.LoadWsdl()
+    return service
+
   def GetAuthCredentials(self):
     """Return authentication credentials.
 
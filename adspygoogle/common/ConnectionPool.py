@@ -0,0 +1,524 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Pool of persistent HTTP connections shared by the services of a client."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import httplib
+import socket
+import sys
+import thread
+import threading
+import time
+
+from adspygoogle.common.Errors import Error
+from adspygoogle.common.Errors import TimeoutError
+
+
+# Default number of connections open at once per address.
+DEFAULT_MAX_CONNECTIONS = 10
+# Default number of seconds an idle connection is kept open before it is closed.
+DEFAULT_IDLE_TIMEOUT = 60
+# Number of bytes read at a time from a response which has a deadline.
+_READ_CHUNK_SIZE = 65536
+
+
+class PooledConnection(object):
+
+  """An HTTP connection checked out of a ConnectionPool."""
+
+  def __init__(self, key, connection, reused):
+    """Inits PooledConnection.
+
+    Args:
+      key: tuple The (scheme, address, proxy) key the connection belongs to.
+      connection: httplib.HTTPConnection The open connection.
+      reused: bool Whether this connection already served another request.
+    """
+    self.key = key
+    self.connection = connection
+    self.reused = reused
+    self.last_used = time.time()
+    self.aborted = False
+
+
+class ConnectionPool(object):
+
+  """Keeps HTTP and HTTPS connections open so they can be reused.
+
+  Connections are keyed by scheme, host, port and HTTP proxy. A connection is
+  handed out to one request at a time; once the response has been read in full
+  it is returned to the pool and can be reused by the next request for the same
+  key, skipping the TCP and SSL handshakes.
+
+  The pool is thread safe. A single instance is created by each Client and
+  shared by every service the Client creates.
+
+  The pool bounds the number of connections open at once for each key, idle
+  or in use. A request for a key whose connections are all in use waits for
+  one to be released, up to its connect timeout or deadline.
+  """
+
+  def __init__(self, max_connections=DEFAULT_MAX_CONNECTIONS,
+               idle_timeout=DEFAULT_IDLE_TIMEOUT):
+    """Inits ConnectionPool.
+
+    Args:
+      [optional]
+      max_connections: int Maximum number of connections open at once per
+                       key, idle or in use.
+      idle_timeout: int Number of seconds an idle connection may stay in the
+                    pool before it is closed.
+
+    Raises:
+      ValueError: if max_connections is less than 1.
+    """
+    if int(max_connections) < 1:
+      raise ValueError('max_connections must be at least 1.')
+    self._max_connections = int(max_connections)
+    self._idle_timeout = float(idle_timeout)
+    self._idle = {}
+    # Number of connections open for each key, idle or in use.
+    self._open = {}
+    # Connections sending a request, keyed by the identifier of the thread.
+    self._active = {}
+    self._lock = threading.Lock()
+    # Notified whenever a connection is released or closed, for the requests
+    # waiting for one.
+    self._available = threading.Condition(self._lock)
+    self._stats = {
+        'hits': 0,
+        'misses': 0,
+        'opened': 0,
+        'closed': 0,
+        'evicted': 0,
+        'waits': 0
+    }
+
+  def Acquire(self, scheme, address, proxy=None, timeout=None):
+    """Checks out a connection for the given address.
+
+    If every connection of the address is in use, waits for one to be
+    released or closed.
+
+    Args:
+      scheme: str Either 'http' or 'https'.
+      address: str Host name, optionally followed by ':port'.
+      [optional]
+      proxy: str HTTP proxy to connect through, as 'host[:port]'.
+      timeout: float Seconds to wait for a connection. Waits forever if None.
+
+    Returns:
+      PooledConnection A connection ready to send a request.
+
+    Raises:
+      TimeoutError: if no connection became available within the timeout.
+    """
+    key = (scheme, address, proxy)
+    give_up_time = None
+    if timeout is not None:
+      give_up_time = time.time() + timeout
+    self._lock.acquire()
+    try:
+      waited = False
+      while True:
+        self.__EvictExpired(time.time())
+        idle = self._idle.get(key)
+        if idle:
+          pooled = idle.pop()
+          pooled.reused = True
+          self._stats['hits'] += 1
+          return pooled
+        if self._open.get(key, 0) < self._max_connections:
+          break
+        if not waited:
+          waited = True
+          self._stats['waits'] += 1
+        if give_up_time is None:
+          self._available.wait()
+        else:
+          remaining = give_up_time - time.time()
+          if remaining <= 0:
+            raise TimeoutError('No connection to %s became available within '
+                               '%s seconds.' % (address, timeout))
+          self._available.wait(remaining)
+      self._open[key] = self._open.get(key, 0) + 1
+      self._stats['misses'] += 1
+      self._stats['opened'] += 1
+    finally:
+      self._lock.release()
+    pooled = PooledConnection(key, None, False)
+    try:
+      pooled.connection = self._NewConnection(scheme, proxy or address)
+    except:
+      self._lock.acquire()
+      try:
+        self.__Forget(pooled)
+      finally:
+        self._lock.release()
+      raise
+    return pooled
+
+  def Release(self, pooled):
+    """Returns a connection to the pool so that it can be reused.
+
+    Args:
+      pooled: PooledConnection A connection obtained from Acquire whose last
+              response has been read in full.
+    """
+    pooled.last_used = time.time()
+    self._lock.acquire()
+    try:
+      self._idle.setdefault(pooled.key, []).append(pooled)
+      self._available.notifyAll()
+    finally:
+      self._lock.release()
+
+  def Discard(self, pooled):
+    """Closes a connection instead of returning it to the pool.
+
+    Args:
+      pooled: PooledConnection A connection obtained from Acquire.
+    """
+    self._lock.acquire()
+    try:
+      self._stats['closed'] += 1
+      self.__Forget(pooled)
+    finally:
+      self._lock.release()
+    _Close(pooled)
+
+  def Abort(self, thread_id):
+    """Makes the request a thread is sending fail, and closes its connection.
+
+    Nothing happens if the thread is not sending a request.
+
+    Args:
+      thread_id: int The identifier of the thread, as returned by
+                 thread.get_ident.
+    """
+    self._lock.acquire()
+    try:
+      pooled = self._active.get(thread_id)
+      if pooled is None:
+        return
+      pooled.aborted = True
+      sock = pooled.connection.sock
+      if sock is not None:
+        try:
+          # Wakes the thread up if it is waiting on the socket.
+          sock.shutdown(socket.SHUT_RDWR)
+        except socket.error:
+          pass
+    finally:
+      self._lock.release()
+
+  def EvictIdleConnections(self):
+    """Closes every idle connection which has exceeded the idle timeout."""
+    self._lock.acquire()
+    try:
+      self.__EvictExpired(time.time())
+    finally:
+      self._lock.release()
+
+  def CloseAll(self):
+    """Closes every idle connection held by the pool."""
+    self._lock.acquire()
+    try:
+      for idle in self._idle.values():
+        for pooled in idle:
+          self._stats['closed'] += 1
+          self.__Forget(pooled)
+          _Close(pooled)
+      self._idle = {}
+    finally:
+      self._lock.release()
+
+  def GetStats(self):
+    """Returns the usage counters of this pool.
+
+    Returns:
+      dict The number of requests served by an idle connection ('hits') or by
+      a new one ('misses'), the number of connections opened, closed, and
+      evicted for being idle, and the number of requests which had to wait
+      for a connection ('waits'). 'idle' holds the number of connections
+      currently waiting in the pool.
+    """
+    self._lock.acquire()
+    try:
+      stats = dict(self._stats)
+      stats['idle'] = sum([len(idle) for idle in self._idle.values()])
+    finally:
+      self._lock.release()
+    return stats
+
+  def Request(self, scheme, address, method, path, headers, body, proxy=None,
+              connect_timeout=None, read_timeout=None, deadline=None,
+              stream=False):
+    """Sends an HTTP request over a pooled connection and reads the response.
+
+    A request on a reused connection which the server closed without sending
+    any of a response is sent once more on a new connection, since the server
+    may have closed the idle connection in the meantime. Other failures are
+    not resent, as the server may have received the request, and sending a
+    mutate twice could apply it twice.
+
+    Every socket operation is bounded by its timeout and by what is left until
+    the deadline, so a stalled server cannot block the caller past either.
+    Another thread may also make the request fail with Abort.
+
+    Args:
+      scheme: str Either 'http' or 'https'.
+      address: str Host name, optionally followed by ':port'.
+      method: str The HTTP method, e.g. 'POST'.
+      path: str The path (or full URL, when using a proxy) to request.
+      headers: list (name, value) tuples to send, in order.
+      body: mixed The request body. A string, unicode being sent as UTF-8,
+            or, when streaming, an iterable of strings.
+      [optional]
+      proxy: str HTTP proxy to connect through, as 'host[:port]'.
+      connect_timeout: float Seconds to wait for a new connection to be
+                       established. Waits forever if None.
+      read_timeout: float Seconds to wait for the server on each send or
+                    receive. Waits forever if None.
+      deadline: float Time, in seconds since the epoch, by which the response
+                must have arrived. No deadline if None.
+      stream: bool Whether to send the body with chunked transfer encoding.
+              The body is then iterated again if the request is sent once
+              more, and the headers must include 'Transfer-Encoding: chunked'.
+
+    Returns:
+      tuple The HTTP status code, the reason phrase, the response headers as
+      an httplib.HTTPMessage and the response body.
+
+    Raises:
+      Error: if the request was aborted.
+      TimeoutError: if a timeout expired or the deadline passed.
+    """
+    if isinstance(body, unicode):
+      body = body.encode('utf-8')
+    thread_id = thread.get_ident()
+    while True:
+      pooled = self.Acquire(scheme, address, proxy,
+                            _GetTimeout(connect_timeout, deadline))
+      self.__SetActive(thread_id, pooled)
+      try:
+        connection = pooled.connection
+        if connection.sock is None:
+          connection.timeout = _GetTimeout(connect_timeout, deadline)
+          connection.connect()
+        connection.sock.settimeout(_GetTimeout(read_timeout, deadline))
+        connection.putrequest(method, path, skip_host=True,
+                              skip_accept_encoding=True)
+        for name, value in headers:
+          connection.putheader(name, value)
+        connection.endheaders()
+        if stream:
+          _SendChunked(connection, body, read_timeout, deadline)
+        else:
+          connection.send(body)
+        response = connection.getresponse()
+        data = _ReadBody(response, connection.sock, read_timeout, deadline)
+      except:
+        error_type, error, trace = sys.exc_info()
+        self.__SetActive(thread_id, None)
+        self.Discard(pooled)
+        if pooled.aborted:
+          raise Error('Request to %s was aborted.' % address)
+        if isinstance(error, socket.timeout):
+          raise TimeoutError('Request to %s timed out: %s' % (address, error))
+        if pooled.reused and _IsClosedWithoutResponse(error):
+          continue
+        raise error_type, error, trace
+      self.__SetActive(thread_id, None)
+      if response.will_close or pooled.aborted:
+        self.Discard(pooled)
+      else:
+        self.Release(pooled)
+      return response.status, response.reason, response.msg, data
+
+  def _NewConnection(self, scheme, address):
+    """Opens a new connection.
+
+    Args:
+      scheme: str Either 'http' or 'https'.
+      address: str Host name, optionally followed by ':port'.
+
+    Returns:
+      httplib.HTTPConnection A new, not yet connected, connection.
+    """
+    if scheme == 'https':
+      try:
+        from https import Https
+        return Https.GetHttpsConnectionClass()(address)
+      except ImportError:
+        return httplib.HTTPSConnection(address)
+    return httplib.HTTPConnection(address)
+
+  def __SetActive(self, thread_id, pooled):
+    """Records the connection a thread is sending a request on.
+
+    Args:
+      thread_id: int The identifier of the thread.
+      pooled: PooledConnection The connection, None once the request is done.
+    """
+    self._lock.acquire()
+    try:
+      if pooled is None:
+        self._active.pop(thread_id, None)
+      else:
+        self._active[thread_id] = pooled
+    finally:
+      self._lock.release()
+
+  def __Forget(self, pooled):
+    """Stops counting a closed connection and wakes up a waiting request.
+
+    Must be called while holding the pool's lock.
+
+    Args:
+      pooled: PooledConnection The connection being closed.
+    """
+    count = self._open.get(pooled.key, 0) - 1
+    if count > 0:
+      self._open[pooled.key] = count
+    else:
+      self._open.pop(pooled.key, None)
+    self._available.notifyAll()
+
+  def __EvictExpired(self, now):
+    """Closes idle connections that exceeded the idle timeout.
+
+    Must be called while holding the pool's lock.
+
+    Args:
+      now: float The current time, in seconds since the epoch.
+    """
+    for key in self._idle.keys():
+      fresh = []
+      for pooled in self._idle[key]:
+        if now - pooled.last_used > self._idle_timeout:
+          self._stats['evicted'] += 1
+          self._stats['closed'] += 1
+          self.__Forget(pooled)
+          _Close(pooled)
+        else:
+          fresh.append(pooled)
+      if fresh:
+        self._idle[key] = fresh
+      else:
+        del self._idle[key]
+
+
+def _GetTimeout(timeout, deadline):
+  """Returns the socket timeout to use given a timeout and a deadline.
+
+  Args:
+    timeout: float Seconds an operation may take, None for no limit.
+    deadline: float Time by which the request must be done, None for none.
+
+  Returns:
+    float The number of seconds to wait for, None to wait forever.
+
+  Raises:
+    TimeoutError: if the deadline has already passed.
+  """
+  if deadline is None:
+    return timeout
+  remaining = deadline - time.time()
+  if remaining <= 0:
+    raise TimeoutError('Request did not complete before its deadline.')
+  if timeout is None:
+    return remaining
+  return min(timeout, remaining)
+
+
+def _IsClosedWithoutResponse(error):
+  """Returns whether an error means the server closed without responding.
+
+  Args:
+    error: Exception The error raised while sending a request.
+
+  Returns:
+    bool True if the server closed the connection before sending any of the
+    response.
+  """
+  if not isinstance(error, httplib.BadStatusLine):
+    return False
+  # httplib reports an empty status line as its repr, or describes it in
+  # newer versions.
+  return (error.line in ('', repr('')) or
+          error.line.startswith('No status line received'))
+
+
+def _ReadBody(response, sock, read_timeout, deadline):
+  """Reads the body of a response, keeping an eye on the deadline.
+
+  Args:
+    response: httplib.HTTPResponse The response to read.
+    sock: socket.socket The socket the response arrives on.
+    read_timeout: float Seconds to wait on each receive, None for no limit.
+    deadline: float Time by which the body must be read, None for none.
+
+  Returns:
+    str The response body.
+
+  Raises:
+    TimeoutError: if the deadline passed before the body was read.
+  """
+  if deadline is None:
+    return response.read()
+  chunks = []
+  while True:
+    sock.settimeout(_GetTimeout(read_timeout, deadline))
+    chunk = response.read(_READ_CHUNK_SIZE)
+    if not chunk:
+      return ''.join(chunks)
+    chunks.append(chunk)
+
+
+def _SendChunked(connection, body, read_timeout, deadline):
+  """Sends a request body with chunked transfer encoding.
+
+  Args:
+    connection: httplib.HTTPConnection The connection to send the body on.
+    body: iterable The strings making up the body.
+    read_timeout: float Seconds to wait on each send, None for no limit.
+    deadline: float Time by which the body must be sent, None for none.
+
+  Raises:
+    TimeoutError: if the deadline passed before the body was sent.
+  """
+  for chunk in body:
+    if not chunk:
+      continue
+    if deadline is not None:
+      connection.sock.settimeout(_GetTimeout(read_timeout, deadline))
+    connection.send('%x\r\n%s\r\n' % (len(chunk), chunk))
+  connection.send('0\r\n\r\n')
+
+
+def _Close(pooled):
+  """Closes the connection of a PooledConnection, ignoring socket errors.
+
+  Args:
+    pooled: PooledConnection The connection to close.
+  """
+  try:
+    pooled.connection.close()
+  except socket.error:
+    pass
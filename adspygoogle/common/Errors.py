@@ -118,6 +118,33 @@ class MalformedBufferError(Error):
   pass
 
 
+class TimeoutError(Error):
+
+  """Implements TimeoutError.
+
+  Responsible for handling a request which did not complete within its connect,
+  read or total timeout.
+  """
+
+  pass
+
+
+class MutateAllError(Error):
+
+  """Implements MutateAllError.
+
+  Responsible for handling chunks of operations which failed when sent by
+  GenericApiService.MutateAll. The chunks which succeeded are applied; their
+  results are merged in result. chunk_errors holds the index of the first
+  operation, the number of operations and the error of each failed chunk.
+  """
+
+  def __init__(self, msg, result, chunk_errors):
+    Error.__init__(self, msg)
+    self.result = result
+    self.chunk_errors = chunk_errors
+
+
 class AuthTokenError(Error):
 
   """Implements AuthTokenError.
@@ -18,23 +18,40 @@
 
 __author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
 
+import collections
+import copy
 import datetime
 import httplib
-import sys
-import time
+import socket
 import threading
+import time
+import weakref
 
 from adspygoogle import SOAPpy
+from adspygoogle.common import ConnectionPool
+from adspygoogle.common import BatchExecutor
 from adspygoogle.common import MessageHandler
+from adspygoogle.common import OperationChunker
+from adspygoogle.common import RateLimiter
+from adspygoogle.common import ResponseCache
+from adspygoogle.common import RetryPolicy
 from adspygoogle.common import SanityCheck
 from adspygoogle.common import Utils
+from adspygoogle.common import WorkerPool
+from adspygoogle.common import WsdlRegistry
 from adspygoogle.common.Errors import AuthTokenError
 from adspygoogle.common.Errors import Error
+from adspygoogle.common.Errors import MutateAllError
+from adspygoogle.common.Errors import TimeoutError
 from adspygoogle.common.Errors import ValidationError
 from adspygoogle.common.Logger import Logger
+from adspygoogle.common.soappy import EnvelopeWriter
+from adspygoogle.common.soappy import Serializers
+from adspygoogle.common.soappy import SoappyUtils
+from adspygoogle.common.soappy import Validators
+from adspygoogle.common.soappy.PooledHttpTransport import PooledHttpTransport
 from adspygoogle.SOAPpy.wstools.WSDLTools import WSDLError
 
-sys_stdout_monkey_lock = threading.Lock()
 # We will refresh an OAuth 2.0 credential _OAUTH2_REFRESH_MINUTES_IN_ADVANCE
 # minutes in advance of it's expiration.
 _OAUTH2_REFRESH_MINUTES_IN_ADVANCE = 5
@@ -44,6 +61,16 @@ _OAUTH2_REFRESH_MINUTES_IN_ADVANCE = 5
 _SOAP_CONFIG = SOAPpy.SOAPConfig(
     typed=0, namespaceStyle='2001', returnFaultInfo=1, dumpHeadersIn=1,
     dumpHeadersOut=1, dumpSOAPIn=1, dumpSOAPOut=1)
+# HTTP status codes of responses, usually HTML error pages, sent by servers
+# which could not handle a request at the time.
+_TRANSIENT_HTTP_CODES = (500, 502, 503, 504)
+# Keys of the connect, read and total timeouts of a call, in seconds, in the
+# config, the op_config and the per-call timeouts of GetTimeoutProxy.
+_TIMEOUT_KEYS = ('conn_timeout', 'read_timeout', 'call_timeout')
+# Metadata of the methods of each parsed WSDL, keyed by the WSDL so that the
+# services sharing a parse also share it. See GenericApiService._LookUpMethod.
+_METHOD_INFOS = weakref.WeakKeyDictionary()
+_METHOD_INFOS_LOCK = threading.Lock()
 
 
 class GenericApiService(object):
@@ -61,11 +88,20 @@ class GenericApiService(object):
   The following methods are intended to be overridden as necessary, but provide
   functioning default implementations:
 
+  _SetUpSoappyService
   _TakeActionOnSoapCall
   _TakeActionOnPackedArgs
   _WrapSoapCall
+  _GetRateLimitKeys
+  _GetRateLimitBackoff
+  _IsTransientError
+  _GetWsdlSnapshotKey
   """
 
+  # The _PACKAGE is the package of the product, whose snapshot of bundled WSDLs
+  # is looked up by version and service name.
+  _PACKAGE = None
+
   def __init__(self, headers, config, op_config, lock, logger, service_name,
                service_url, wrap_lists, buffer_class, namespace,
                namespace_extractor):
@@ -77,8 +113,10 @@ class GenericApiService(object):
       config: dict Dictionary object with populated configuration values.
       op_config: dict Dictionary object with additional configuration values for
                  this operation.
-      lock: mixed Thread lock to use to synchronize requests. May be a
-            thread.lock or a threading.RLock
+      lock: mixed Thread lock guarding the state shared by the services of a
+            client, such as authentication tokens and unit counters. Calls
+            are not serialized on it. May be a thread.lock or a
+            threading.RLock
       logger: Logger Instance of Logger to use for logging.
       service_name: string The name of this service.
       service_url: string The URL pointing to this web service.
@@ -90,8 +128,8 @@ class GenericApiService(object):
                            namespace prefix to use to represent it.
 
     Raises:
-      Error: The WSDL for this service could not be found. Will also be raised
-      if GenericApiService is initialized directly rather than by a subclass.
+      Error: if GenericApiService is initialized directly rather than by a
+      subclass.
     """
     if self.__class__ == GenericApiService:
       raise Error('GenericApiService cannot be instantiated directly.')
@@ -108,17 +146,93 @@ class GenericApiService(object):
     self._namespace = namespace
     self._namespace_extractor = namespace_extractor
     self._method_proxies = {}
+    self._last_call = threading.local()
+    self._call_timeouts = threading.local()
+    # Services created by a Client share its pools, see
+    # Client._SetUpSharedResources.
+    if 'connection_pool' in config:
+      self._connection_pool = config['connection_pool']
+    else:
+      self._connection_pool = ConnectionPool.ConnectionPool()
+    if 'worker_pool' in config:
+      self._worker_pool = config['worker_pool']
+    else:
+      self._worker_pool = WorkerPool.DEFAULT_POOL
+    if 'rate_limiter' in config:
+      self._rate_limiter = config['rate_limiter']
+    else:
+      self._rate_limiter = RateLimiter.RateLimiter()
+    if 'retry_policy' in config:
+      self._retry_policy = config['retry_policy']
+    else:
+      self._retry_policy = RetryPolicy.RetryPolicy()
+    # Hedging is optional; the client only creates a policy when it is on.
+    self._hedge_policy = config.get('hedge_policy')
+    self._single_flight = config.get('single_flight')
+    self._response_cache = config.get('response_cache')
+
+    self._transport = PooledHttpTransport(self._connection_pool)
+    # The WSDL is loaded on first use, see LoadWsdl.
+    self._wsdl_lock = threading.Lock()
+    self._wsdl_proxy = None
+
+  def LoadWsdl(self):
+    """Loads the WSDL of this service, unless it is loaded already.
 
-    wsdl_url = service_url + '?wsdl'
+    Services load their WSDL when first used. Calling this ahead of time, for
+    instance through client.Prefetch, keeps the WSDL's download and parse, and
+    the indexing of its types, off the first call.
+
+    Returns:
+      SOAPpy.WSDL.Proxy The SOAPpy proxy of this service.
+
+    Raises:
+      Error: The WSDL for this service could not be found.
+    """
+    self._wsdl_lock.acquire()
     try:
-      self._soappyservice = SOAPpy.WSDL.Proxy(
-          wsdl_url, noroot=1, http_proxy=self._op_config['http_proxy'],
-          config=self._GetSoapConfig())
-    except WSDLError:
-      raise Error('Unable to locate WSDL at path \'%s\'' % wsdl_url)
-    else:
-      for method_key in self._soappyservice.methods:
-        self._soappyservice.methods[method_key].location = service_url
+      if self._wsdl_proxy is None:
+        # The parsed WSDL is shared with every other service of the same URL in
+        # the process; only the SOAPpy proxy is this service's own.
+        try:
+          wsdl_proxy = WsdlRegistry.REGISTRY.GetProxy(
+              self._service_url, self._GetSoapConfig(),
+              self._config.get('wsdl_cache'),
+              snapshot_key=self._GetWsdlSnapshotKey(), noroot=1,
+              http_proxy=self._op_config['http_proxy'])
+        except WSDLError:
+          raise Error('Unable to locate WSDL at path \'%s?wsdl\''
+                      % self._service_url)
+        wsdl_proxy.soapproxy.transport = self._transport
+        self._SetUpSoappyService(wsdl_proxy)
+        # Index the WSDL's types now rather than on the first call's lookups.
+        SoappyUtils.GetTypeIndex(wsdl_proxy)
+        if Utils.BoolTypeConvert(self._config.get('codegen', 'n')):
+          Serializers.GetSerializerSet(wsdl_proxy)
+          if Utils.BoolTypeConvert(self._config['strict']):
+            Validators.GetValidatorSet(wsdl_proxy)
+        self._wsdl_proxy = wsdl_proxy
+      return self._wsdl_proxy
+    finally:
+      self._wsdl_lock.release()
+
+  def __GetSoappyService(self):
+    """Returns the SOAPpy proxy of this service, loading its WSDL if needed.
+
+    Returns:
+      SOAPpy.WSDL.Proxy The SOAPpy proxy of this service.
+    """
+    return self.LoadWsdl()
+
+  _soappyservice = property(__GetSoappyService)
+
+  def _SetUpSoappyService(self, soappyservice):
+    """Gives the service a chance to set up its SOAPpy proxy once loaded.
+
+    Args:
+      soappyservice: SOAPpy.WSDL.Proxy The SOAPpy proxy of this service.
+    """
+    pass
 
   def _GetSoapConfig(self):
     """Creates a new SOAPpy.SOAPConfig for this service to use.
@@ -150,15 +264,189 @@ class GenericApiService(object):
       SOAP operation in this service.
     """
     if name not in self._method_proxies:
-      self._method_proxies[name] = self._WrapSoapCall(self._CreateMethod(name))
+      self._method_proxies[name] = self._WrapCaching(
+          name, self._WrapCoalescing(
+              name, self._WrapRetries(
+                  name, self._WrapHedging(
+                      name, self._WrapSoapCall(self._CreateMethod(name))))))
     return self._method_proxies[name]
 
   def __dir__(self):
     """Overrides default dir() behavior; prints the service's public methods."""
-    dir_list = ['CallRawMethod']
+    dir_list = ['CallRawMethod', 'GetAsyncProxy', 'GetLastBuffer',
+                'GetTimeoutProxy', 'InvalidateCache', 'LoadWsdl', 'MutateAll']
     dir_list.extend(self._soappyservice.methods.keys())
     return dir_list
 
+  def GetAsyncProxy(self):
+    """Returns a proxy whose methods make this service's calls asynchronously.
+
+    Calling a method on the proxy, e.g. proxy.get(selector), returns at once
+    with a WorkerPool.Future. The call runs, with the same packing, validation
+    and error handling as a direct call, on the worker pool shared by the
+    client's services, so many pending calls share a few threads.
+
+    Returns:
+      AsyncServiceProxy The asynchronous proxy for this service.
+    """
+    return AsyncServiceProxy(self, self._worker_pool)
+
+  def GetTimeoutProxy(self, conn_timeout=None, read_timeout=None,
+                      call_timeout=None):
+    """Returns a proxy whose methods make calls with the given timeouts.
+
+    Timeouts left as None fall back to the service's op_config, then to the
+    client's config.
+
+    Args:
+      [optional]
+      conn_timeout: float Seconds to wait for a connection to the server.
+      read_timeout: float Seconds to wait for the server on each send or
+                    receive.
+      call_timeout: float Seconds the whole call, each retry included, may
+                    take.
+
+    Returns:
+      TimeoutServiceProxy The proxy for this service.
+    """
+    return TimeoutServiceProxy(self, {'conn_timeout': conn_timeout,
+                                      'read_timeout': read_timeout,
+                                      'call_timeout': call_timeout})
+
+  def GetLastBuffer(self):
+    """Returns the SOAP buffer of the last call made by the calling thread.
+
+    Returns:
+      SoapBuffer The buffer holding the SOAP messages of the calling thread's
+      last call on this service, or None if it has not made a call yet.
+    """
+    return getattr(self._last_call, 'buffer', None)
+
+  def InvalidateCache(self):
+    """Drops the cached responses of this service for its customer.
+
+    Responses are dropped automatically when a call changing data through this
+    service succeeds. Changes made by other means, e.g. through another service
+    or in the user interface, call for dropping them explicitly.
+    """
+    if self._response_cache is not None:
+      self._response_cache.Invalidate(*self._GetCacheScope())
+
+  def MutateAll(self, operations,
+                max_ops=OperationChunker.DEFAULT_MAX_OPERATIONS,
+                max_bytes=None, workers=None,
+                method_name='mutate'):
+    """Sends a list of operations in chunks, in parallel, merging the results.
+
+    The operations are split into chunks of at most max_ops operations and, if
+    given, max_bytes bytes of XML. The chunks are sent as concurrent calls to
+    the given method and their results merged back into the order of the
+    operations. Indexes into the operations found in the results, such as the
+    field paths of AdWords partial failure errors, are shifted to index into
+    the given list.
+
+    Args:
+      operations: list The operations to send, the only argument of the method.
+      [optional]
+      max_ops: int Maximum number of operations sent in one call.
+      max_bytes: int Maximum size, in bytes of XML, of the operations sent in
+                 one call. No limit if None.
+      workers: int Maximum number of calls to make at the same time. Defaults
+               to the calling thread plus every thread of the worker pool.
+      method_name: str The name of the method to call, e.g. 'createLineItems'.
+
+    Returns:
+      mixed The merged result, as returned by a single call to the method.
+
+    Raises:
+      MutateAllError: if any chunk failed. Its result holds the merged results
+                      of the other chunks, with None in place of the results
+                      of the failed chunks' operations.
+      ValueError: if the method does not take exactly one argument.
+    """
+    method_info = self._LookUpMethod(method_name)
+    if len(method_info.inputs) != 1:
+      raise ValueError('%s() does not take a single list of operations.'
+                       % method_name)
+
+    sizes = None
+    if max_bytes is not None:
+      sizes = self._MeasureOperations(method_info.inputs[0], operations)
+    chunks = OperationChunker.SplitOperations(operations, max_ops, max_bytes,
+                                              sizes)
+    call_results = BatchExecutor.ExecuteConcurrently(
+        [(self, method_name, (chunk,)) for unused_offset, chunk in chunks],
+        workers, self._worker_pool)
+
+    results = []
+    chunk_errors = []
+    for i in range(len(chunks)):
+      offset, chunk = chunks[i]
+      if call_results[i].IsSuccess():
+        results.append(self._OffsetMutateResult(call_results[i].result,
+                                                offset))
+      else:
+        results.append(None)
+        chunk_errors.append((offset, len(chunk), call_results[i].error))
+
+    is_list = not (method_info.outputs and
+                   method_info.outputs[0].max_occurs == '1')
+    result = OperationChunker.MergeResults(
+        results, [len(chunk) for unused_offset, chunk in chunks], is_list,
+        Utils.BoolTypeConvert(self._config['wrap_in_tuple']))
+    if chunk_errors:
+      raise MutateAllError(
+          '%d of %d chunks of operations failed, the first one with: %s'
+          % (len(chunk_errors), len(chunks), chunk_errors[0][2]), result,
+          chunk_errors)
+    return result
+
+  def _MeasureOperations(self, param, operations):
+    """Returns the size in bytes of the XML of each operation.
+
+    Args:
+      param: ParamInfo The parameter taking the list of operations.
+      operations: list The operations to measure.
+
+    Returns:
+      list The size of each operation, estimated from its representation if it
+      cannot be written as XML directly.
+    """
+    try:
+      writer = EnvelopeWriter.EnvelopeWriter(
+          self._soappyservice, self._wrap_lists, self._namespace_extractor)
+    except ValueError:
+      writer = None
+    sizes = []
+    for operation in operations:
+      size = None
+      if writer is not None:
+        try:
+          size = sum([len(chunk) for chunk in writer.GenerateParameters(
+              ([operation],), (param,))])
+        except (TypeError, ValueError):
+          # Left for the call to report, or to pack.
+          pass
+      if size is None:
+        size = len(repr(operation))
+      sizes.append(size)
+    return sizes
+
+  def _OffsetMutateResult(self, result, offset):
+    """Shifts the indexes into the operations found in a chunk's result.
+
+    If a product's results refer to operations by index, then its extending
+    service class must override this method.
+
+    Args:
+      result: mixed The result of a call sending a chunk of operations.
+      offset: int The index of the chunk's first operation in the whole list.
+
+    Returns:
+      mixed The result, indexing into the whole list of operations.
+    """
+    return result
+
   def _WrapSoapCall(self, call_function):
     """Gives the service a chance to wrap a call in a product-specific function.
 
@@ -176,17 +464,287 @@ class GenericApiService(object):
     """
     return call_function
 
+  def _CallWithTimeouts(self, method, args, timeouts):
+    """Makes a call with timeouts applying to the calling thread only.
+
+    Args:
+      method: function The method proxy to call.
+      args: tuple The arguments to pass to the method.
+      timeouts: dict The timeouts of the call, keyed by _TIMEOUT_KEYS.
+
+    Returns:
+      mixed The value returned by the method.
+    """
+    previous = getattr(self._call_timeouts, 'values', None)
+    self._call_timeouts.values = timeouts
+    try:
+      return method(*args)
+    finally:
+      self._call_timeouts.values = previous
+
+  def _GetTimeouts(self):
+    """Returns the timeouts of a request about to be sent by this thread.
+
+    Returns:
+      tuple The connect timeout, the read timeout and the deadline of the
+      request, each None if not set.
+    """
+    overrides = getattr(self._call_timeouts, 'values', None) or {}
+    timeouts = []
+    for key in _TIMEOUT_KEYS:
+      value = overrides.get(key)
+      if value is None:
+        value = self._op_config.get(key)
+      if value is None:
+        value = self._config.get(key)
+      if value is not None:
+        value = float(value)
+      timeouts.append(value)
+    connect_timeout, read_timeout, call_timeout = timeouts
+
+    deadline = getattr(self._call_timeouts, 'deadline', None)
+    if deadline is None and call_timeout is not None:
+      deadline = time.time() + call_timeout
+    return connect_timeout, read_timeout, deadline
+
+  def _WrapRetries(self, method_name, call_function):
+    """Wraps a call in the retry policy shared by the client's services.
+
+    Args:
+      method_name: string The name of the SOAP operation being called.
+      call_function: function The function to make a SOAP call.
+
+    Returns:
+      function A new function wrapping the input function which retries it
+      when it fails with a transient error.
+    """
+
+    def RetryTransientErrors(*args):
+      deadline = getattr(self._call_timeouts, 'deadline', None)
+      if deadline is not None:
+        return self._retry_policy.Call(method_name, call_function, args,
+                                       self._IsTransientError, deadline)
+      # The total timeout covers every attempt of the call.
+      deadline = self._GetTimeouts()[2]
+      self._call_timeouts.deadline = deadline
+      try:
+        return self._retry_policy.Call(method_name, call_function, args,
+                                       self._IsTransientError, deadline)
+      finally:
+        self._call_timeouts.deadline = None
+
+    return RetryTransientErrors
+
+  def _WrapHedging(self, method_name, call_function):
+    """Wraps a read-only call in the hedge policy shared by the client.
+
+    The calling thread makes the first attempt, and second attempts run on the
+    hedge policy's threads. The calling thread's timeouts are handed to them,
+    and the buffer and transport error of the attempt which is used are handed
+    back, so that GetLastBuffer and the retry policy see the same state as for
+    an unhedged call. An attempt which succeeds first aborts the request of the
+    other one on the connection pool.
+
+    Args:
+      method_name: string The name of the SOAP operation being called.
+      call_function: function The function to make a SOAP call.
+
+    Returns:
+      function A new function wrapping the input function which hedges slow
+      calls, or the input function if the call may not be hedged.
+    """
+    if self._hedge_policy is None or not Utils.IsReadOnlyMethod(method_name):
+      return call_function
+
+    def HedgeSlowCalls(*args):
+      timeouts = getattr(self._call_timeouts, 'values', None)
+      deadline = getattr(self._call_timeouts, 'deadline', None)
+
+      def Attempt():
+        self._call_timeouts.values = timeouts
+        self._call_timeouts.deadline = deadline
+        self._last_call.buffer = None
+        self._last_call.transport_error = None
+        response = error = None
+        try:
+          response = call_function(*args)
+        except Exception, e:
+          error = e
+        self._call_timeouts.values = None
+        self._call_timeouts.deadline = None
+        return (response, error, self._last_call.buffer,
+                self._last_call.transport_error)
+
+      response, error, buf, transport_error = self._hedge_policy.Call(
+          (self._service_url, method_name), Attempt,
+          self._connection_pool.Abort)
+      self._last_call.buffer = buf
+      self._last_call.transport_error = transport_error
+      if error is not None:
+        raise error
+      return response
+
+    return HedgeSlowCalls
+
+  def _WrapCaching(self, method_name, call_function):
+    """Wraps a call in the response cache shared by the client.
+
+    The responses of get, query and get*ByStatement calls are cached for the
+    time to live of this service. They are keyed like coalesced calls, see
+    _WrapCoalescing. A call which changes data drops the cached responses of
+    this service for its customer once it succeeds. Calls answered from the
+    cache leave no buffer for GetLastBuffer.
+
+    Args:
+      method_name: string The name of the SOAP operation being called.
+      call_function: function The function to make a SOAP call.
+
+    Returns:
+      function A new function wrapping the input function which caches its
+      responses or invalidates cached ones, or the input function if there is
+      no cache or the call's responses are not cached.
+    """
+    if self._response_cache is None:
+      return call_function
+
+    if not Utils.IsReadOnlyMethod(method_name):
+
+      def InvalidateCachedResponses(*args):
+        response = call_function(*args)
+        if not isinstance(response, Error):
+          self._response_cache.Invalidate(*self._GetCacheScope())
+        return response
+
+      return InvalidateCachedResponses
+
+    if not ResponseCache.IsCacheableMethod(method_name):
+      return call_function
+
+    def CacheResponses(*args):
+      ttl = self._response_cache.GetTtl(self._service_name)
+      if ttl <= 0:
+        return call_function(*args)
+      key = (self._service_url, method_name, tuple(self._GetRateLimitKeys()),
+             self._config['wrap_in_tuple'], self._config['raw_response'],
+             Utils.GetCanonicalDigest(args))
+      found, response = self._response_cache.Get(key)
+      if found:
+        self._last_call.buffer = None
+        self._last_call.transport_error = None
+        return response
+
+      scope = self._GetCacheScope()
+      generation = self._response_cache.GetGeneration(scope)
+      response = call_function(*args)
+      if not isinstance(response, Error):
+        self._response_cache.Put(key, scope, response, len(repr(response)),
+                                 ttl, generation)
+      return response
+
+    return CacheResponses
+
+  def _GetCacheScope(self):
+    """Returns the scope this service's responses are cached under.
+
+    Returns:
+      tuple The name of this service and its customer, None if it has no
+      customer.
+    """
+    customer = None
+    for scope, value in self._GetRateLimitKeys():
+      if scope == RateLimiter.CUSTOMER:
+        customer = value
+    return self._service_name, customer
+
+  def _WrapCoalescing(self, method_name, call_function):
+    """Wraps a read-only call in the single flight shared by the client.
+
+    Identical calls are those made to the same method of the same service with
+    the same rate limit keys, e.g. the same customer, and arguments with the
+    same Utils.GetCanonicalDigest. The calls waiting for an identical call are
+    handed its buffer and transport error, and a copy of its response.
+
+    Args:
+      method_name: string The name of the SOAP operation being called.
+      call_function: function The function to make a SOAP call.
+
+    Returns:
+      function A new function wrapping the input function which coalesces
+      identical concurrent calls, or the input function if the call may not
+      be coalesced.
+    """
+    if self._single_flight is None or not Utils.IsReadOnlyMethod(method_name):
+      return call_function
+
+    def CoalesceIdenticalCalls(*args):
+      key = (self._service_url, method_name,
+             tuple(self._GetRateLimitKeys()), Utils.GetCanonicalDigest(args))
+      deadline = self._GetTimeouts()[2]
+      timeout = None
+      if deadline is not None:
+        timeout = max(0, deadline - time.time())
+
+      def Attempt():
+        response = error = None
+        try:
+          response = call_function(*args)
+        except Exception, e:
+          error = e
+        return (response, error, getattr(self._last_call, 'buffer', None),
+                getattr(self._last_call, 'transport_error', None))
+
+      outcome, made_call = self._single_flight.Call(key, Attempt, timeout)
+      response, error, buf, transport_error = outcome
+      self._last_call.buffer = buf
+      self._last_call.transport_error = transport_error
+      if error is not None:
+        raise error
+      if not made_call:
+        response = copy.deepcopy(response)
+      return response
+
+    return CoalesceIdenticalCalls
+
+  def _IsTransientError(self, error):
+    """Tells whether a call failed with an error worth retrying.
+
+    The default implementation recognizes network errors and HTTP error pages
+    sent instead of a SOAP response. Products must override this method to
+    add the SOAP faults of their servers which are transient.
+
+    Args:
+      error: Exception The error raised or returned by the call.
+
+    Returns:
+      bool True if the call may succeed when retried.
+    """
+    transport_error = getattr(self._last_call, 'transport_error', None)
+    if isinstance(transport_error, TimeoutError):
+      # Not worth retrying once the call's deadline has passed.
+      deadline = getattr(self._call_timeouts, 'deadline', None)
+      return deadline is None or time.time() < deadline
+    if isinstance(transport_error, (socket.error, httplib.HTTPException)):
+      return True
+    return (isinstance(transport_error, SOAPpy.Errors.HTTPError) and
+            transport_error.code in _TRANSIENT_HTTP_CODES)
+
   def _SetHeaders(self):
-    """Sets the SOAP headers for this service's requests.
+    """Builds the SOAP headers for a request made by this service.
 
-    Must be overridden by an extending class.
+    Must be overridden by an extending class. The headers are returned rather
+    than set on the shared SOAPpy proxy, so that concurrent calls each send
+    their own.
+
+    Returns:
+      SOAPpy.Types.headerType The SOAP headers to send.
     """
     raise NotImplementedError
 
   def _GetMethodInfo(self, method_name):
     """Pulls all of the relevant data about a method from a SOAPpy service.
 
-    Must be overridden by an extending class.
+    Must be overridden by an extending class. Calls use the result through
+    _LookUpMethod, which builds it once per parsed WSDL.
 
     The return dictionary has two keys, MethodInfoKeys.INPUTS and
     MethodInfoKeys.OUTPUTS. Each of these keys has a list value. These lists
@@ -234,7 +792,9 @@ class GenericApiService(object):
     """Allows a service to take product-specific action on packed arguments.
 
     If a product needs to take the opportunity to modify the packed inputs, then
-    its extending service class must override this method.
+    its extending service class must override this method. The arguments of
+    services which override it are always packed, even if the 'direct_xml' or
+    'stream_body' configuration value is on.
 
     Args:
       method_name: string The name of the SOAP operation being called.
@@ -246,183 +806,300 @@ class GenericApiService(object):
     """
     return ksoap_args
 
+  def _GetWsdlSnapshotKey(self):
+    """Returns the key of this service's WSDL in the bundled snapshots.
+
+    Products serving other WSDLs than the bundled ones for some configurations
+    must override this method to return None for them.
+
+    Returns:
+      tuple The product's package, version and service name, or None if the
+      WSDL is not to be read from a snapshot.
+    """
+    if self._PACKAGE is None:
+      return None
+    return self._PACKAGE, self._op_config['version'], self._service_name
+
+  def _GetRateLimitKeys(self):
+    """Returns the keys a call made by this service is rate limited by.
+
+    Products which are rate limited per account or per developer token must
+    override this method to add their own keys.
+
+    Returns:
+      list (scope, value) tuples, see RateLimiter.RateLimiter.Acquire.
+    """
+    return [(RateLimiter.SERVICE, self._service_name)]
+
+  def _GetRateLimitBackoff(self, error):
+    """Tells whether an error means calls have to slow down.
+
+    Products whose servers report rate limit errors must override this method
+    to recognize them.
+
+    Args:
+      error: Exception The error raised by a call.
+
+    Returns:
+      tuple The scope the limit was exceeded in (None for all scopes) and the
+      number of seconds the server asked to wait for (None if it did not say),
+      or None if the error is not a rate limit error.
+    """
+    return None
+
   def _ReadyOAuth(self):
-    """If OAuth is on, sets the transport handler to add OAuth HTTP header.
+    """If OAuth is on, returns the OAuth HTTP header to send with a request.
 
     This method refreshes OAuth 2.0 credentials as necessary.
+
+    Returns:
+      dict The HTTP headers to add to the request.
     """
+    http_headers = {}
     if self._headers.get('oauth2credentials'):
       self._RefreshCredentialIfNecessary(self._headers['oauth2credentials'])
-      self._headers['oauth2credentials'].apply(
-          self._soappyservice.soapproxy.transport.additional_headers)
-    else:
-      if ('Authorization' in
-          self._soappyservice.soapproxy.transport.additional_headers):
-        del self._soappyservice.soapproxy.transport.additional_headers[
-            'Authorization']
+      self._headers['oauth2credentials'].apply(http_headers)
+    return http_headers
 
   def _RefreshCredentialIfNecessary(self, credential):
     """Checks if the credential needs refreshing and refreshes if necessary."""
-    if (credential.token_expiry is not None and credential.token_expiry -
-        datetime.datetime.utcnow() <
-        datetime.timedelta(minutes=_OAUTH2_REFRESH_MINUTES_IN_ADVANCE)):
-      import httplib2
-      self._headers['oauth2credentials'].refresh(httplib2.Http())
+    self._lock.acquire()
+    try:
+      if (credential.token_expiry is not None and credential.token_expiry -
+          datetime.datetime.utcnow() <
+          datetime.timedelta(minutes=_OAUTH2_REFRESH_MINUTES_IN_ADVANCE)):
+        import httplib2
+        credential.refresh(httplib2.Http())
+    finally:
+      self._lock.release()
 
   def _ReadyCompression(self):
-    """Sets whether the HTTP transport layer should use compression."""
+    """Determines whether the HTTP transport layer should use compression.
+
+    Returns:
+      tuple Whether to compress the request and whether to accept a compressed
+      response.
+    """
     compress = Utils.BoolTypeConvert(self._config['compress'])
-    self._soappyservice.soapproxy.config.send_compressed = compress
-    self._soappyservice.soapproxy.config.accept_compressed = compress
+    return compress, compress
 
   def _CreateMethod(self, method_name):
     """Create a method wrapping an invocation to the SOAP service."""
+    # Looking the method up on the WSDL proxy points its SOAPpy proxy at the
+    # method's location and namespace, which are the same for every method of
+    # a service.
     try:
-      soap_service_method = getattr(self._soappyservice, method_name)
+      getattr(self._soappyservice, method_name)
     except AttributeError:
       method_name = method_name[0].lower() + method_name[1:]
-      soap_service_method = getattr(self._soappyservice, method_name)
+      getattr(self._soappyservice, method_name)
 
     def CallMethod(*args):
       """Perform a SOAP call."""
-      try:
-        self._lock.acquire()
-        self._ReadyOAuth()
-        self._ReadyCompression()
-        self._SetHeaders()
-
-        args = self._TakeActionOnSoapCall(method_name, args)
-        method_info = self._GetMethodInfo(method_name)
-        method_attrs_holder = None
-
-        if len(method_info[MethodInfoKeys.INPUTS]) > 1:
-          self._ConfigureArgOrder(method_name,
-                                  method_info[MethodInfoKeys.INPUTS])
-
-        if not method_info[MethodInfoKeys.INPUTS]:
-          # Don't put any namespaces other than this service's namespace on
-          # calls with no input params.
-          method_attrs_holder = self._soappyservice.soapproxy.methodattrs
-          self._soappyservice.soapproxy.methodattrs = {
-              'xmlns': self._namespace
-          }
-
-        if len(args) != len(method_info[MethodInfoKeys.INPUTS]):
-          raise TypeError(''.join([
-              method_name + '() takes exactly ',
-              str(len(self._soappyservice.methods[method_name].inparams)),
-              ' argument(s). (', str(len(args)), ' given)']))
-
-        ksoap_args = {}
-        for i in range(len(method_info[MethodInfoKeys.INPUTS])):
-          if Utils.BoolTypeConvert(self._config['strict']):
-            SanityCheck.SoappySanityCheck(
-                self._soappyservice, args[i],
-                method_info[MethodInfoKeys.INPUTS][i][MethodInfoKeys.NS],
-                method_info[MethodInfoKeys.INPUTS][i][MethodInfoKeys.TYPE],
-                method_info[MethodInfoKeys.INPUTS][i][
-                    MethodInfoKeys.MAX_OCCURS])
-
-          element_name = str(method_info[MethodInfoKeys.INPUTS][i][
-              MethodInfoKeys.ELEMENT_NAME])
-
-          ksoap_args[element_name] = MessageHandler.PackForSoappy(
+      self._last_call.transport_error = None
+      config = self._config.copy()
+      http_headers = self._ReadyOAuth()
+      send_compressed, accept_compressed = self._ReadyCompression()
+      soap_headers = self._SetHeaders()
+
+      args = self._TakeActionOnSoapCall(method_name, args)
+      method_info = self._LookUpMethod(method_name)
+      method_attrs = None
+
+      if len(method_info.inputs) > 1:
+        self._ConfigureArgOrder(method_name, method_info.arg_order)
+
+      if not method_info.inputs:
+        # Don't put any namespaces other than this service's namespace on
+        # calls with no input params.
+        method_attrs = {'xmlns': self._namespace}
+
+      if len(args) != len(method_info.inputs):
+        raise TypeError(''.join([
+            method_name + '() takes exactly ',
+            str(len(self._soappyservice.methods[method_name].inparams)),
+            ' argument(s). (', str(len(args)), ' given)']))
+
+      serializers = validators = None
+      if Utils.BoolTypeConvert(config.get('codegen', 'n')):
+        serializers = Serializers.GetSerializerSet(self._soappyservice)
+        if Utils.BoolTypeConvert(config['strict']):
+          validators = Validators.GetValidatorSet(self._soappyservice)
+
+      if Utils.BoolTypeConvert(config['strict']):
+        for i in range(len(method_info.inputs)):
+          param = method_info.inputs[i]
+          SanityCheck.SoappySanityCheck(
+              self._soappyservice, args[i], param.ns, param.type,
+              param.max_occurs, validators)
+
+      # The parameters are written as XML directly, and possibly streamed, when
+      # asked to, unless a subclass acts on them once packed for SOAPpy.
+      stream_body = Utils.BoolTypeConvert(config.get('stream_body', 'n'))
+      request_body = None
+      if (method_info.inputs and
+          (stream_body or
+           Utils.BoolTypeConvert(config.get('direct_xml', 'n'))) and
+          self._TakeActionOnPackedArgs.im_func is
+          GenericApiService._TakeActionOnPackedArgs.im_func):
+        try:
+          writer = EnvelopeWriter.EnvelopeWriter(
+              self._soappyservice, self._wrap_lists, self._namespace_extractor)
+          if stream_body:
+            request_body = writer.StreamParameters(args, method_info.inputs)
+          else:
+            request_body = writer.WriteParameters(args, method_info.inputs)
+        except ValueError:
+          # Packed for SOAPpy below instead.
+          request_body = None
+
+      ksoap_args = {}
+      if request_body is None:
+        for i in range(len(method_info.inputs)):
+          param = method_info.inputs[i]
+          ksoap_args[param.element_name] = MessageHandler.PackForSoappy(
               args[i],
-              method_info[MethodInfoKeys.INPUTS][i][MethodInfoKeys.NS],
-              method_info[MethodInfoKeys.INPUTS][i][MethodInfoKeys.TYPE],
+              param.ns,
+              param.type,
               self._soappyservice,
               self._wrap_lists,
-              self._namespace_extractor)
+              self._namespace_extractor,
+              serializers)
 
         ksoap_args = self._TakeActionOnPackedArgs(method_name, ksoap_args)
 
-        buf = self._buffer_class(
-            xml_parser=self._config['xml_parser'],
-            pretty_xml=Utils.BoolTypeConvert(self._config['pretty_xml']))
-        sys_stdout_monkey_lock.acquire()
+      # The SOAP headers and method attributes are passed to SOAPpy as per-call
+      # directives so that the shared proxy is never modified.
+      soap_call = getattr(self._soappyservice.soapproxy._hd(soap_headers)._ma(
+          method_attrs), method_name)
+
+      # Waiting for the rate limiter counts towards the call's deadline.
+      connect_timeout, read_timeout, deadline = self._GetTimeouts()
+      rate_limit_keys = self._GetRateLimitKeys()
+      self._rate_limiter.Acquire(rate_limit_keys, deadline)
+
+      buf = self._buffer_class(
+          xml_parser=config['xml_parser'],
+          pretty_xml=Utils.BoolTypeConvert(config['pretty_xml']))
+      self._last_call.buffer = buf
+      error = {}
+      response = None
+      start_time = time.strftime('%Y-%m-%d %H:%M:%S')
+      self._transport.BeginCall(buf, http_headers, send_compressed,
+                                accept_compressed, connect_timeout,
+                                read_timeout, deadline, request_body,
+                                stream_body)
+      try:
+        response = MessageHandler.UnpackResponseAsDict(soap_call(**ksoap_args))
+      except Exception, e:
+        error['data'] = e
+        self._last_call.transport_error = e
+      self._transport.EndCall()
+      stop_time = time.strftime('%Y-%m-%d %H:%M:%S')
+
+      if isinstance(response, Error):
+        error = response
+
+      if not Utils.BoolTypeConvert(config['raw_debug']):
         try:
-            old_stdout = sys.stdout
-            sys.stdout = buf
-
-            error = {}
-            response = None
-            start_time = time.strftime('%Y-%m-%d %H:%M:%S')
-            try:
-              response = MessageHandler.UnpackResponseAsDict(
-                  soap_service_method(**ksoap_args))
-            except Exception, e:
-              error['data'] = e
-            stop_time = time.strftime('%Y-%m-%d %H:%M:%S')
-            # Restore stdout
-            sys.stdout = old_stdout
-        finally:
-            sys_stdout_monkey_lock.release()
-
-        if isinstance(response, Error):
-          error = response
-
-        if not Utils.BoolTypeConvert(self._config['raw_debug']):
           self._HandleLogsAndErrors(buf, start_time, stop_time, error)
-
-        # When debugging mode is ON, fetch last traceback.
-        if Utils.BoolTypeConvert(self._config['debug']):
-          if Utils.LastStackTrace() and Utils.LastStackTrace() != 'None':
-            error['trace'] = Utils.LastStackTrace()
-
-        # Catch local errors prior to going down to the SOAP layer, which may
-        # not exist for this error instance.
-        if 'data' in error and not buf.IsHandshakeComplete():
-          # Check if buffer contains non-XML data, most likely an HTML page.
-          # This happens in the case of 502 errors (and similar). Otherwise,
-          # this is a local error and API request was never made.
-          html_error = Utils.GetErrorFromHtml(buf.GetBufferAsStr())
-          if html_error:
-            msg = html_error
-          else:
-            msg = str(error['data'])
-            if Utils.BoolTypeConvert(self._config['debug']):
-              msg += '\n%s' % error['trace']
-
-          # When debugging mode is ON, store the raw content of the buffer.
-          if Utils.BoolTypeConvert(self._config['debug']):
-            error['raw_data'] = buf.GetBufferAsStr()
-
-          # Catch errors from AuthToken and ValidationError levels, raised
-          # during try/except above.
-          if isinstance(error['data'], AuthTokenError):
-            raise AuthTokenError(msg)
-          elif isinstance(error['data'], ValidationError):
-            raise ValidationError(error['data'])
-          if 'raw_data' in error:
-            msg = '%s [RAW DATA: %s]' % (msg, error['raw_data'])
-          return Error(msg)
-
-        if Utils.BoolTypeConvert(self._config['raw_response']):
-          response = buf.GetRawSoapIn()
-        elif error:
-          response = error
+        except Error, e:
+          backoff = self._GetRateLimitBackoff(e)
+          if backoff is not None:
+            scope, retry_after = backoff
+            self._rate_limiter.Backoff(rate_limit_keys, retry_after, scope)
+          if isinstance(self._last_call.transport_error, TimeoutError):
+            raise self._last_call.transport_error
+          raise
+      if not error:
+        self._rate_limiter.Recover(rate_limit_keys)
+
+      # When debugging mode is ON, fetch last traceback.
+      if Utils.BoolTypeConvert(config['debug']):
+        if Utils.LastStackTrace() and Utils.LastStackTrace() != 'None':
+          error['trace'] = Utils.LastStackTrace()
+
+      # Catch local errors prior to going down to the SOAP layer, which may
+      # not exist for this error instance.
+      if 'data' in error and not buf.IsHandshakeComplete():
+        # Check if buffer contains non-XML data, most likely an HTML page.
+        # This happens in the case of 502 errors (and similar). Otherwise,
+        # this is a local error and API request was never made.
+        html_error = Utils.GetErrorFromHtml(buf.GetBufferAsStr())
+        if html_error:
+          msg = html_error
         else:
-          output_types = [(out_param[MethodInfoKeys.NS],
-                           out_param[MethodInfoKeys.TYPE],
-                           out_param[MethodInfoKeys.MAX_OCCURS]) for out_param
-                          in method_info[MethodInfoKeys.OUTPUTS]]
-          response = MessageHandler.RestoreListTypeWithSoappy(
-              response, self._soappyservice, output_types)
-
-        if Utils.BoolTypeConvert(self._config['wrap_in_tuple']):
-          response = MessageHandler.WrapInTuple(response)
+          msg = str(error['data'])
+          if Utils.BoolTypeConvert(config['debug']):
+            msg += '\n%s' % error['trace']
+
+        # When debugging mode is ON, store the raw content of the buffer.
+        if Utils.BoolTypeConvert(config['debug']):
+          error['raw_data'] = buf.GetBufferAsStr()
+
+        # Catch errors from AuthToken and ValidationError levels, raised
+        # during try/except above.
+        if isinstance(error['data'], AuthTokenError):
+          raise AuthTokenError(msg)
+        elif isinstance(error['data'], ValidationError):
+          raise ValidationError(error['data'])
+        elif isinstance(error['data'], TimeoutError):
+          raise error['data']
+        if 'raw_data' in error:
+          msg = '%s [RAW DATA: %s]' % (msg, error['raw_data'])
+        return Error(msg)
+
+      if Utils.BoolTypeConvert(config['raw_response']):
+        response = buf.GetRawSoapIn()
+      elif error:
+        response = error
+      else:
+        response = MessageHandler.RestoreListTypeWithSoappy(
+            response, self._soappyservice, method_info.output_types)
 
-        # Restore method_attrs if they were over-ridden
-        if method_attrs_holder:
-          self._soappyservice.soapproxy.methodattrs = method_attrs_holder
+      if Utils.BoolTypeConvert(config['wrap_in_tuple']):
+        response = MessageHandler.WrapInTuple(response)
 
-        return response
-      finally:
-        self._lock.release()
+      return response
 
     return CallMethod
 
-  def _ConfigureArgOrder(self, method_name, inputs):
+  def _LookUpMethod(self, method_name):
+    """Returns the metadata of a method, built once per parsed WSDL.
+
+    The metadata is built from the dictionary returned by _GetMethodInfo the
+    first time any service sharing this service's parsed WSDL calls the method.
+
+    Args:
+      method_name: string The name of the method to look up.
+
+    Returns:
+      MethodInfo The immutable metadata of the method.
+    """
+    wsdl = self._soappyservice.wsdl
+    _METHOD_INFOS_LOCK.acquire()
+    try:
+      try:
+        method_infos = _METHOD_INFOS.setdefault(wsdl, {})
+      except TypeError:
+        # The WSDL object cannot be weakly referenced, so it cannot be cached.
+        method_infos = {}
+      method_info = method_infos.get(method_name)
+    finally:
+      _METHOD_INFOS_LOCK.release()
+    if method_info is not None:
+      return method_info
+
+    # Built outside of the lock; concurrent builds of a method are identical,
+    # so the first one stored is kept.
+    method_info = MethodInfo.FromDict(self._GetMethodInfo(method_name))
+    _METHOD_INFOS_LOCK.acquire()
+    try:
+      return method_infos.setdefault(method_name, method_info)
+    finally:
+      _METHOD_INFOS_LOCK.release()
+
+  def _ConfigureArgOrder(self, method_name, arg_order):
     """Ensure that SOAPpy knows what order in which to pack operation arguments.
 
     Even though we're pulling this information out of SOAPpy in the first place,
@@ -430,11 +1107,12 @@ class GenericApiService(object):
 
     Args:
       method_name: str The name of the method to configure.
-      inputs: list The input arguments for the given method.
+      arg_order: tuple The element names of the method's input arguments, in
+                 order.
     """
     if method_name not in self._soappyservice.soapproxy.config.argsOrdering:
-      self._soappyservice.soapproxy.config.argsOrdering[method_name] = [
-          argument[MethodInfoKeys.ELEMENT_NAME] for argument in inputs]
+      self._soappyservice.soapproxy.config.argsOrdering[method_name] = list(
+          arg_order)
 
   def _ManageSoap(self, buf, log_handlers, lib_url, start_time, stop_time,
                   error=None):
@@ -539,85 +1217,149 @@ class GenericApiService(object):
       Error: if the SOAP call is not successful. Most likely this is the result
       of the server sending back an HTTP error, such as a 502.
     """
+    if isinstance(soap_message, unicode):
+      soap_message = soap_message.encode('utf-8')
+    buf = self._buffer_class(
+        xml_parser=self._config['xml_parser'],
+        pretty_xml=Utils.BoolTypeConvert(self._config['pretty_xml']))
+
+    http_header = {
+        'post': self._service_url,
+        'host': Utils.GetNetLocFromUrl(self._op_config['server']),
+        'user_agent': '%s; CallRawMethod' % self.__class__.__name__,
+        'content_type': 'text/xml; charset=\"UTF-8\"',
+        'content_length': '%d' % len(soap_message),
+        'soap_action': ''
+    }
 
-    self._lock.acquire()
-    try:
-      buf = self._buffer_class(
-          xml_parser=self._config['xml_parser'],
-          pretty_xml=Utils.BoolTypeConvert(self._config['pretty_xml']))
-
-      http_header = {
-          'post': self._service_url,
-          'host': Utils.GetNetLocFromUrl(self._op_config['server']),
-          'user_agent': '%s; CallRawMethod' % self.__class__.__name__,
-          'content_type': 'text/xml; charset=\"UTF-8\"',
-          'content_length': '%d' % len(soap_message),
-          'soap_action': ''
-      }
-
-      if self._headers.get('oauth2credentials'):
-        self._headers['oauth2credentials'].apply(http_header)
-
-      self._start_time = time.strftime('%Y-%m-%d %H:%M:%S')
-      buf.write('%s Outgoing HTTP headers %s\nPOST %s\nHost: %s\nUser-Agent: '
-                '%s\nContent-type: %s\nContent-length: %s\nSOAPAction: %s\n' %
-                ('*'*3, '*'*46, http_header['post'], http_header['host'],
-                 http_header['user_agent'], http_header['content_type'],
-                 http_header['content_length'], http_header['soap_action']))
-      if self._headers.get('oauth2credentials'):
-        buf.write('Authorization: ' + http_header['Authorization'] + '\n')
-      buf.write('%s\n%s Outgoing SOAP %s\n%s\n%s\n' %
-                ('*'*72, '*'*3, '*'*54, soap_message, '*'*72))
-
-      if self._op_config['http_proxy']:
-        real_address = self._op_config['http_proxy']
+    if self._headers.get('oauth2credentials'):
+      self._headers['oauth2credentials'].apply(http_header)
+
+    start_time = time.strftime('%Y-%m-%d %H:%M:%S')
+    buf.write('%s Outgoing HTTP headers %s\nPOST %s\nHost: %s\nUser-Agent: '
+              '%s\nContent-type: %s\nContent-length: %s\nSOAPAction: %s\n' %
+              ('*'*3, '*'*46, http_header['post'], http_header['host'],
+               http_header['user_agent'], http_header['content_type'],
+               http_header['content_length'], http_header['soap_action']))
+    if self._headers.get('oauth2credentials'):
+      buf.write('Authorization: ' + http_header['Authorization'] + '\n')
+    buf.write('%s\n%s Outgoing SOAP %s\n%s\n%s\n' %
+              ('*'*72, '*'*3, '*'*54, soap_message, '*'*72))
+
+    headers = [('Host', http_header['host']),
+               ('User-Agent', http_header['user_agent']),
+               ('Content-type', http_header['content_type']),
+               ('Content-length', http_header['content_length']),
+               ('SOAPAction', http_header['soap_action'])]
+    if self._headers.get('oauth2credentials'):
+      headers.append(('Authorization', http_header['Authorization']))
+
+    # Send SOAP message over a pooled connection and get response.
+    connect_timeout, read_timeout, deadline = self._GetTimeouts()
+    status_code, status_message, header, response = (
+        self._connection_pool.Request(
+            'https', http_header['host'], 'POST', http_header['post'],
+            headers, soap_message, self._op_config['http_proxy'],
+            connect_timeout, read_timeout, deadline))
+
+    header = str(header).replace('\r', '')
+    buf.write(('%s Incoming HTTP headers %s\n%s %s\n%s\n%s\n%s Incoming SOAP'
+               ' %s\n%s\n%s\n' % ('*'*3, '*'*46, status_code, status_message,
+                                  header, '*'*72, '*'*3, '*'*54, response,
+                                  '*'*72)))
+    stop_time = time.strftime('%Y-%m-%d %H:%M:%S')
+
+    # Catch local errors prior to going down to the SOAP layer, which may not
+    # exist for this error instance.
+    if not buf.IsHandshakeComplete() or not buf.IsSoap():
+      # The buffer contains non-XML data, most likely an HTML page. This
+      # happens in the case of 502 errors.
+      html_error = Utils.GetErrorFromHtml(buf.GetBufferAsStr())
+      if html_error:
+        msg = html_error
       else:
-        real_address = http_header['host']
-
-      # Construct header and send SOAP message.
-      web_service = httplib.HTTPS(real_address)
-      web_service.putrequest('POST', http_header['post'])
-      web_service.putheader('Host', http_header['host'])
-      web_service.putheader('User-Agent', http_header['user_agent'])
-      web_service.putheader('Content-type', http_header['content_type'])
-      web_service.putheader('Content-length', http_header['content_length'])
-      web_service.putheader('SOAPAction', http_header['soap_action'])
-      if self._headers.get('oauth2credentials'):
-        web_service.putheader('Authorization', http_header['Authorization'])
-      web_service.endheaders()
-      web_service.send(soap_message)
-
-      # Get response.
-      status_code, status_message, header = web_service.getreply()
-      response = web_service.getfile().read()
-
-      header = str(header).replace('\r', '')
-      buf.write(('%s Incoming HTTP headers %s\n%s %s\n%s\n%s\n%s Incoming SOAP'
-                 ' %s\n%s\n%s\n' % ('*'*3, '*'*46, status_code, status_message,
-                                    header, '*'*72, '*'*3, '*'*54, response,
-                                    '*'*72)))
-      self._stop_time = time.strftime('%Y-%m-%d %H:%M:%S')
-
-      # Catch local errors prior to going down to the SOAP layer, which may not
-      # exist for this error instance.
-      if not buf.IsHandshakeComplete() or not buf.IsSoap():
-        # The buffer contains non-XML data, most likely an HTML page. This
-        # happens in the case of 502 errors.
-        html_error = Utils.GetErrorFromHtml(buf.GetBufferAsStr())
-        if html_error:
-          msg = html_error
-        else:
-          msg = 'Unknown error.'
-        raise Error(msg)
+        msg = 'Unknown error.'
+      raise Error(msg)
 
-      self._HandleLogsAndErrors(buf, self._start_time, self._stop_time)
-    finally:
-      self._lock.release()
+    self._HandleLogsAndErrors(buf, start_time, stop_time)
     if self._config['wrap_in_tuple']:
       response = MessageHandler.WrapInTuple(response)
     return response
 
 
+class AsyncServiceProxy(object):
+
+  """Makes a service's calls asynchronously, returning futures."""
+
+  def __init__(self, service, worker_pool):
+    """Inits AsyncServiceProxy.
+
+    Args:
+      service: GenericApiService The service to make calls on.
+      worker_pool: WorkerPool The pool of threads to run the calls on.
+    """
+    self._service = service
+    self._worker_pool = worker_pool
+
+  def __getattr__(self, name):
+    """Returns a function which submits a call to the given method.
+
+    Args:
+      name: string The name of an operation of the service.
+
+    Returns:
+      function A function taking the operation's arguments and returning a
+      WorkerPool.Future of its result.
+
+    Raises:
+      AttributeError: if the service has no operation with the given name.
+    """
+    method = getattr(self._service, name)
+
+    def SubmitCall(*args):
+      """Submit a SOAP call to the worker pool."""
+      return self._worker_pool.Submit(method, *args)
+
+    return SubmitCall
+
+
+class TimeoutServiceProxy(object):
+
+  """Makes a service's calls with timeouts of their own."""
+
+  def __init__(self, service, timeouts):
+    """Inits TimeoutServiceProxy.
+
+    Args:
+      service: GenericApiService The service to make calls on.
+      timeouts: dict The timeouts of the calls, see
+                GenericApiService.GetTimeoutProxy.
+    """
+    self._service = service
+    self._timeouts = timeouts
+
+  def __getattr__(self, name):
+    """Returns a function which calls the given method with the timeouts.
+
+    Args:
+      name: string The name of an operation of the service.
+
+    Returns:
+      function A function taking the operation's arguments and returning its
+      result.
+
+    Raises:
+      AttributeError: if the service has no operation with the given name.
+    """
+    method = getattr(self._service, name)
+
+    def CallWithTimeouts(*args):
+      """Make a SOAP call with the proxy's timeouts."""
+      return self._service._CallWithTimeouts(method, args, self._timeouts)
+
+    return CallWithTimeouts
+
+
 class MethodInfoKeys(object):
   """Static constants holder; keys used to pass method information around."""
 
@@ -627,3 +1369,59 @@ class MethodInfoKeys(object):
   TYPE = 'type'
   OUTPUTS = 'outputs'
   MAX_OCCURS = 'maxOccurs'
+
+
+class ParamInfo(collections.namedtuple(
+    'ParamInfo', 'element_name ns type max_occurs')):
+  """Immutable metadata of an input or output parameter of a SOAP method.
+
+  Attributes:
+    element_name: str The name of the parameter's element.
+    ns: str The namespace of the parameter's type.
+    type: str The name of the parameter's type.
+    max_occurs: str The maxOccurs of the parameter's element.
+  """
+
+  __slots__ = ()
+
+
+class MethodInfo(collections.namedtuple(
+    'MethodInfo', 'inputs outputs arg_order output_types')):
+  """Immutable metadata of a SOAP method, shared by all calls to the method.
+
+  Attributes:
+    inputs: tuple The ParamInfo of each input parameter, in order.
+    outputs: tuple The ParamInfo of each output parameter, in order.
+    arg_order: tuple The element names of the input parameters, in order.
+    output_types: tuple The (namespace, type, maxOccurs) of each output
+                  parameter, as expected by
+                  MessageHandler.RestoreListTypeWithSoappy.
+  """
+
+  __slots__ = ()
+
+  @classmethod
+  def FromDict(cls, method_info):
+    """Builds a MethodInfo from the dictionary returned by _GetMethodInfo.
+
+    Args:
+      method_info: dict A dictionary containing information about a SOAP
+                   method, keyed by MethodInfoKeys.
+
+    Returns:
+      MethodInfo The immutable metadata of the method.
+    """
+    inputs = tuple([ParamInfo(str(param[MethodInfoKeys.ELEMENT_NAME]),
+                              param[MethodInfoKeys.NS],
+                              param[MethodInfoKeys.TYPE],
+                              param[MethodInfoKeys.MAX_OCCURS])
+                    for param in method_info[MethodInfoKeys.INPUTS]])
+    outputs = tuple([ParamInfo(str(param[MethodInfoKeys.ELEMENT_NAME]),
+                               param[MethodInfoKeys.NS],
+                               param[MethodInfoKeys.TYPE],
+                               param[MethodInfoKeys.MAX_OCCURS])
+                     for param in method_info[MethodInfoKeys.OUTPUTS]])
+    return cls(inputs, outputs,
+               tuple([param.element_name for param in inputs]),
+               tuple([(param.ns, param.type, param.max_occurs)
+                      for param in outputs]))
@@ -0,0 +1,249 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Hedging of slow read-only calls with a second, identical request."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import collections
+import thread
+import threading
+import time
+
+from adspygoogle.common import WorkerPool
+
+
+# Default percentile of recent latencies a call may take before it is hedged.
+DEFAULT_PERCENTILE = 95
+# Number of latencies needed before a call's percentile is trusted.
+_MIN_SAMPLES = 20
+# Number of most recent latencies kept per method.
+_MAX_SAMPLES = 200
+
+
+class LatencyTracker(object):
+
+  """Keeps the most recent latencies of a method."""
+
+  def __init__(self, max_samples=_MAX_SAMPLES):
+    """Inits LatencyTracker.
+
+    Args:
+      [optional]
+      max_samples: int Number of most recent latencies to keep.
+    """
+    self._lock = threading.Lock()
+    self._samples = collections.deque(maxlen=max_samples)
+
+  def Add(self, latency):
+    """Records the latency of a successful call.
+
+    Args:
+      latency: float The number of seconds the call took.
+    """
+    self._lock.acquire()
+    try:
+      self._samples.append(latency)
+    finally:
+      self._lock.release()
+
+  def GetPercentile(self, percentile):
+    """Returns a percentile of the recent latencies.
+
+    Args:
+      percentile: float The percentile, between 0 and 100.
+
+    Returns:
+      float The latency, in seconds, or None if too few latencies were
+      recorded yet.
+    """
+    self._lock.acquire()
+    try:
+      if len(self._samples) < _MIN_SAMPLES:
+        return None
+      samples = sorted(self._samples)
+    finally:
+      self._lock.release()
+    return samples[int(round(percentile / 100.0 * (len(samples) - 1)))]
+
+
+class HedgePolicy(object):
+
+  """Sends a second attempt of a call which is slower than usual.
+
+  The calling thread makes the first attempt of a call itself. If it has not
+  completed once the given percentile of its method's recent latencies has
+  passed, an identical attempt is sent from a pool thread and whichever
+  succeeds first is used. An attempt which succeeds first cancels the other
+  one, and the caller only waits for the second attempt when the first one
+  failed. Sending the same call
+  twice is only safe for calls that do not change anything on the server.
+
+  Only second attempts take pool threads, so hedging does not limit how many
+  calls are made at once. A second attempt which is still waiting for a
+  thread when the first attempt completes is not sent.
+  """
+
+  def __init__(self, percentile=DEFAULT_PERCENTILE, worker_pool=None):
+    """Inits HedgePolicy.
+
+    Args:
+      [optional]
+      percentile: float Percentile of a method's latencies after which a call
+                  is hedged.
+      worker_pool: WorkerPool.WorkerPool The pool to send second attempts
+                   from. Defaults to WorkerPool.DEFAULT_POOL.
+    """
+    self._percentile = float(percentile)
+    if worker_pool is None:
+      worker_pool = WorkerPool.DEFAULT_POOL
+    self._worker_pool = worker_pool
+    self._lock = threading.Lock()
+    self._trackers = {}
+    self._stats = {'calls': 0, 'hedged': 0, 'hedge_wins': 0}
+
+  def Call(self, key, attempt, cancel=None):
+    """Makes a call, hedging it if it takes longer than usual.
+
+    Args:
+      key: tuple Identifies the method called. Calls with the same key share
+           their latency statistics.
+      attempt: function Makes one attempt of the call. Takes no arguments and
+               returns a tuple whose second item is the error of the attempt,
+               None if it succeeded. It must not raise.
+      [optional]
+      cancel: function Makes an attempt fail early. Takes the identifier of
+              the thread making it, as returned by thread.get_ident, and is
+              only called while that attempt is in progress. It cancels the
+              first attempt once the second one succeeds, and the second one
+              once the first one succeeds. Attempts which lost are left to
+              complete if None.
+
+    Returns:
+      tuple The tuple returned by the first attempt to succeed or, if all of
+      them failed, by the first attempt.
+    """
+    tracker = self._GetTracker(key)
+    delay = tracker.GetPercentile(self._percentile)
+    self._Count('calls')
+
+    def TimedAttempt():
+      start_time = time.time()
+      outcome = attempt()
+      if outcome[1] is None:
+        tracker.Add(time.time() - start_time)
+      return outcome
+
+    if delay is None:
+      # Not enough is known about the method to tell a slow call yet.
+      return TimedAttempt()
+
+    caller = thread.get_ident()
+    start_time = time.time()
+    # Whether each attempt completed and the thread of the second one, if it
+    # was sent, changed together under the lock.
+    state = {'done': False, 'hedged': False, 'hedge_done': False,
+             'hedge_thread': None}
+    state_lock = threading.Lock()
+    done = threading.Event()
+
+    def Hedge():
+      done.wait(max(0, start_time + delay - time.time()))
+      state_lock.acquire()
+      try:
+        if state['done']:
+          return None
+        state['hedged'] = True
+        state['hedge_thread'] = thread.get_ident()
+      finally:
+        state_lock.release()
+      self._Count('hedged')
+      outcome = TimedAttempt()
+      state_lock.acquire()
+      try:
+        state['hedge_done'] = True
+        if outcome[1] is None and cancel is not None and not state['done']:
+          cancel(caller)
+      finally:
+        state_lock.release()
+      return outcome
+
+    future = self._worker_pool.Submit(Hedge)
+    outcome = None
+    try:
+      outcome = TimedAttempt()
+    finally:
+      state_lock.acquire()
+      try:
+        state['done'] = True
+        hedged = state['hedged']
+        if (hedged and outcome is not None and outcome[1] is None and
+            cancel is not None and not state['hedge_done']):
+          cancel(state['hedge_thread'])
+      finally:
+        state_lock.release()
+      done.set()
+
+    # The second attempt is only waited for when the first one failed.
+    if not hedged or outcome[1] is None:
+      return outcome
+    hedge_outcome = future.Result()
+    if outcome[1] is not None and hedge_outcome[1] is None:
+      self._Count('hedge_wins')
+      return hedge_outcome
+    return outcome
+
+  def GetStats(self):
+    """Returns usage counters of this hedge policy.
+
+    Returns:
+      dict The number of calls made, calls which were hedged and hedged calls
+      whose second attempt won.
+    """
+    self._lock.acquire()
+    try:
+      return self._stats.copy()
+    finally:
+      self._lock.release()
+
+  def _GetTracker(self, key):
+    """Returns the latency tracker of a method, creating it if necessary.
+
+    Args:
+      key: tuple Identifies the method.
+
+    Returns:
+      LatencyTracker The tracker of the method.
+    """
+    self._lock.acquire()
+    try:
+      if key not in self._trackers:
+        self._trackers[key] = LatencyTracker()
+      return self._trackers[key]
+    finally:
+      self._lock.release()
+
+  def _Count(self, counter):
+    """Increments a usage counter.
+
+    Args:
+      counter: str The name of the counter.
+    """
+    self._lock.acquire()
+    try:
+      self._stats[counter] += 1
+    finally:
+      self._lock.release()
@@ -83,7 +83,7 @@ def WrapInTuple(response):
 
 
 def PackForSoappy(obj, xmlns, type_name, soappy_service, wrap_lists,
-                  prefix_function):
+                  prefix_function, serializers=None):
   """Packs a given object into SOAPpy.Type objects for transport.
 
   Args:
@@ -96,6 +96,11 @@ def PackForSoappy(obj, xmlns, type_name, soappy_service, wrap_lists,
     wrap_lists: boolean Whether or not to wrap lists in an additional layer.
     prefix_function: callable Takes in an xml namespace and returns the prefix
                      to use to represent it.
+    [optional]
+    serializers: Serializers.SerializerSet The generated serializers of the
+                 service's types, used to pack dictionaries of those types.
+                 Dictionaries are packed by looking their types up in the
+                 schema if not given.
 
   Returns:
     mixed The given object ready for SOAPpy transport. Depending on the input,
@@ -104,10 +109,10 @@ def PackForSoappy(obj, xmlns, type_name, soappy_service, wrap_lists,
   """
   if isinstance(obj, dict):
     return _PackDictForSoappy(obj, xmlns, type_name, soappy_service, wrap_lists,
-                              prefix_function)
+                              prefix_function, serializers)
   elif isinstance(obj, (list, tuple)):
     return _PackListForSoappy(obj, xmlns, type_name, soappy_service, wrap_lists,
-                              prefix_function)
+                              prefix_function, serializers)
   elif isinstance(obj, str):
     return SOAPpy.Types.untypedType(Utils.HtmlEscape(obj).decode('utf-8'))
   elif isinstance(obj, unicode):
@@ -119,7 +124,7 @@ def PackForSoappy(obj, xmlns, type_name, soappy_service, wrap_lists,
 
 
 def _PackDictForSoappy(obj, xmlns, type_name, soappy_service, wrap_lists,
-                       prefix_function):
+                       prefix_function, serializers):
   """Packs a dictionary into a SOAPpy.Types.structType object for transport.
 
   Args:
@@ -131,6 +136,8 @@ def _PackDictForSoappy(obj, xmlns, type_name, soappy_service, wrap_lists,
     wrap_lists: boolean Whether or not to wrap lists in an additional layer.
     prefix_function: callable Takes in an xml namespace and returns the prefix
                      to use to represent it.
+    serializers: Serializers.SerializerSet The generated serializers of the
+                 service's types, or None.
 
   Returns:
     SOAPpy.Types.structType The given dictionary ready for SOAPpy transport.
@@ -141,6 +148,12 @@ def _PackDictForSoappy(obj, xmlns, type_name, soappy_service, wrap_lists,
   if obj_contained_type:
     type_name = obj_contained_type
 
+  if serializers is not None:
+    serializer = serializers.Get(xmlns, type_name)
+    if serializer is not None:
+      return serializer(obj, type_key, soappy_service, wrap_lists,
+                        prefix_function, serializers)
+
   for key in obj:
     if key == type_key or obj[key] is None:
       continue
@@ -150,7 +163,7 @@ def _PackDictForSoappy(obj, xmlns, type_name, soappy_service, wrap_lists,
         key, type_name, xmlns, soappy_service)
     packed_data[ns_prefix + key] = PackForSoappy(
         obj[key], key_type.getTargetNamespace(), key_type.getName(),
-        soappy_service, wrap_lists, prefix_function)
+        soappy_service, wrap_lists, prefix_function, serializers)
 
   attrs = {(SOAPpy.NS.XSI3, 'type'): prefix_function(xmlns) + type_name}
   packed_object = SOAPpy.Types.structType(packed_data, typed=0, attrs=attrs)
@@ -162,7 +175,8 @@ def _PackDictForSoappy(obj, xmlns, type_name, soappy_service, wrap_lists,
 
 
 def _PackListForSoappy(obj, xmlns, type_name, soappy_service, wrap_lists,
-                       prefix_function, item_element_name='item'):
+                       prefix_function, serializers,
+                       item_element_name='item'):
   """Packs an array input into a form ready for SOAPpy transport.
 
   Args:
@@ -174,6 +188,8 @@ def _PackListForSoappy(obj, xmlns, type_name, soappy_service, wrap_lists,
     wrap_lists: boolean Whether or not to wrap lists in an additional layer.
     prefix_function: callable Takes in an xml namespace and returns the prefix
                      to use to represent it.
+    serializers: Serializers.SerializerSet The generated serializers of the
+                 service's types, or None.
     [optional]
     item_element_name: string The XML element name to wrap items of the list in.
                        Only used if wrap_lists is set to True. Defaults to
@@ -191,7 +207,7 @@ def _PackListForSoappy(obj, xmlns, type_name, soappy_service, wrap_lists,
                                                    soappy_service)
       new_list._addItem(item_element_name, PackForSoappy(
           item, xmlns, item_type, soappy_service, wrap_lists,
-          prefix_function))
+          prefix_function, serializers))
     return new_list
   else:
     new_list = []
@@ -199,7 +215,7 @@ def _PackListForSoappy(obj, xmlns, type_name, soappy_service, wrap_lists,
       item_type = SoappyUtils.GetArrayItemTypeName(type_name, xmlns,
                                                    soappy_service)
       new_list.append(PackForSoappy(item, xmlns, item_type, soappy_service,
-                                    wrap_lists, prefix_function))
+                                    wrap_lists, prefix_function, serializers))
     return new_list
 
 
@@ -0,0 +1,153 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Splits lists of operations into chunks and merges the chunks' results."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import re
+
+
+# Default maximum number of operations sent in one call.
+DEFAULT_MAX_OPERATIONS = 5000
+# Field of a returned object holding a result per operation.
+_VALUE_FIELD = 'value'
+# Matches the index of the operation a field path starts with.
+_FIELD_PATH_INDEX = re.compile(r'^([^.\[]+)\[(\d+)\]')
+
+
+def SplitOperations(operations, max_ops=DEFAULT_MAX_OPERATIONS,
+                    max_bytes=None, sizes=None):
+  """Splits a list of operations into consecutive chunks.
+
+  An operation larger than max_bytes on its own is sent in a chunk of its own.
+
+  Args:
+    operations: list The operations to split.
+    [optional]
+    max_ops: int Maximum number of operations in a chunk.
+    max_bytes: int Maximum size of the operations of a chunk. No limit if None.
+    sizes: list The size of each operation, required with max_bytes.
+
+  Returns:
+    list (index of the first operation, operations) tuples, one per chunk, in
+    order.
+
+  Raises:
+    ValueError: if max_ops is less than 1.
+  """
+  if max_ops < 1:
+    raise ValueError('max_ops must be at least 1.')
+
+  chunks = []
+  start = 0
+  size = 0
+  for i in range(len(operations)):
+    if i > start and (i - start >= max_ops or
+                      (max_bytes is not None and size + sizes[i] > max_bytes)):
+      chunks.append((start, operations[start:i]))
+      start = i
+      size = 0
+    if max_bytes is not None:
+      size += sizes[i]
+  if start < len(operations):
+    chunks.append((start, operations[start:]))
+  return chunks
+
+
+def MergeResults(results, counts, is_list, wrap_in_tuple):
+  """Merges the results of the chunks of a list of operations.
+
+  Methods returning a list of objects have the lists concatenated. Methods
+  returning a single object, such as an AdWords ListReturnValue, have the list
+  fields of the objects concatenated and the other fields taken from the first
+  object which has them set.
+
+  The positions of the operations of failed chunks are filled with None, in
+  the merged list or in the value field of the merged object, so that the
+  merged results line up with the operations.
+
+  Args:
+    results: list The results of the chunks, in order. Chunks which failed
+             have None.
+    counts: list The number of operations of each chunk, in order.
+    is_list: bool Whether the method returns a list of objects.
+    wrap_in_tuple: bool Whether the results are wrapped in tuples.
+
+  Returns:
+    mixed The merged result, wrapped in a tuple like the results are.
+  """
+  if is_list:
+    merged = []
+    for i in range(len(results)):
+      if results[i] is None:
+        merged.extend([None] * counts[i])
+      else:
+        merged.extend(results[i])
+    if wrap_in_tuple:
+      merged = tuple(merged)
+    return merged
+
+  merged = None
+  values = []
+  has_values = False
+  for i in range(len(results)):
+    result = results[i]
+    if wrap_in_tuple and result:
+      result = result[0]
+    if not isinstance(result, dict):
+      values.extend([None] * counts[i])
+      continue
+    if merged is None:
+      merged = {}
+    for key in result:
+      value = result[key]
+      if key == _VALUE_FIELD:
+        continue
+      if isinstance(value, (list, tuple)):
+        merged[key] = list(merged.get(key) or []) + list(value)
+      elif merged.get(key) is None:
+        merged[key] = value
+    value = result.get(_VALUE_FIELD)
+    if isinstance(value, (list, tuple)):
+      values.extend(value)
+      has_values = True
+    else:
+      values.extend([None] * counts[i])
+  if has_values:
+    merged[_VALUE_FIELD] = values
+  if wrap_in_tuple and merged is not None:
+    merged = (merged,)
+  return merged
+
+
+def OffsetFieldPath(field_path, offset):
+  """Shifts the operation index a field path starts with.
+
+  Args:
+    field_path: str A field path, e.g. 'operations[3].operand.name'.
+    offset: int The number to add to the index.
+
+  Returns:
+    str The field path with its first index shifted, e.g.
+    'operations[5003].operand.name' for an offset of 5000. Field paths not
+    starting with an index are returned as is.
+  """
+  match = _FIELD_PATH_INDEX.match(field_path)
+  if match is None:
+    return field_path
+  return '%s[%d]%s' % (match.group(1), int(match.group(2)) + offset,
+                       field_path[match.end():])
@@ -0,0 +1,278 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Adaptive client-side rate limiting of SOAP calls."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import threading
+import time
+
+from adspygoogle.common.Errors import TimeoutError
+
+
+# Scopes a call can be rate limited in. A call is keyed by (scope, value)
+# pairs, e.g. (CUSTOMER, '123-456-7890'), and must get past the bucket of each.
+TOKEN = 'token'
+CUSTOMER = 'customer'
+SERVICE = 'service'
+# Seconds to pause a scope for when the server gave no retry-after hint.
+DEFAULT_RETRY_AFTER = 30
+# A bucket's rate is never lowered below this fraction of its configured rate.
+_MIN_RATE_FRACTION = 0.1
+# Fraction of the configured rate won back by each successful call.
+_RECOVERY_FRACTION = 0.05
+
+
+class TokenBucket(object):
+
+  """Token bucket which slows down after being told it went too fast.
+
+  Each call takes one token. Tokens are added at the bucket's rate, up to its
+  burst size. On a rate limit error the bucket is paused for the server's
+  retry-after delay and its rate is halved; each successful call then raises
+  the rate a little until it is back at the configured rate.
+
+  A bucket without a configured rate never limits calls, but is still paused
+  after a rate limit error.
+  """
+
+  def __init__(self, rate=None, burst=None):
+    """Inits TokenBucket.
+
+    Args:
+      [optional]
+      rate: float Maximum number of calls per second, None for no limit.
+      burst: int Maximum number of calls made back to back. Defaults to one
+             second's worth of calls.
+    """
+    self._lock = threading.Lock()
+    if rate is not None:
+      rate = float(rate)
+    self._max_rate = rate
+    self._rate = rate
+    if burst is None and rate is not None:
+      burst = max(1, rate)
+    self._burst = burst
+    self._tokens = burst
+    self._updated = time.time()
+    self._paused_until = 0
+
+  def Acquire(self, deadline=None):
+    """Blocks until a call may be made and takes a token for it.
+
+    Args:
+      [optional]
+      deadline: float Time, in seconds since the epoch, after which the call
+                may no longer be made. No deadline if None.
+
+    Returns:
+      float Number of seconds spent waiting.
+
+    Raises:
+      TimeoutError: if the call could not be made before the deadline.
+    """
+    waited = 0
+    while True:
+      self._lock.acquire()
+      try:
+        now = time.time()
+        delay = self._paused_until - now
+        if delay <= 0:
+          if self._rate is None:
+            return waited
+          self._Refill(now)
+          if self._tokens >= 1:
+            self._tokens -= 1
+            return waited
+          delay = (1 - self._tokens) / self._rate
+        if deadline is not None and now + delay > deadline:
+          raise TimeoutError('Call could not be made before its deadline: '
+                             'rate limited for %.1f more seconds.' % delay)
+      finally:
+        self._lock.release()
+      time.sleep(delay)
+      waited += delay
+
+  def Backoff(self, retry_after):
+    """Pauses the bucket and lowers its rate after a rate limit error.
+
+    Args:
+      retry_after: float Number of seconds to pause calls for.
+    """
+    self._lock.acquire()
+    try:
+      paused_until = time.time() + retry_after
+      if paused_until > self._paused_until:
+        self._paused_until = paused_until
+      if self._rate is not None:
+        self._rate = max(self._max_rate * _MIN_RATE_FRACTION, self._rate / 2)
+        self._tokens = 0
+        self._updated = self._paused_until
+    finally:
+      self._lock.release()
+
+  def Recover(self):
+    """Raises the rate of the bucket after a successful call."""
+    self._lock.acquire()
+    try:
+      if self._rate is not None and self._rate < self._max_rate:
+        self._rate = min(self._max_rate,
+                         self._rate + self._max_rate * _RECOVERY_FRACTION)
+    finally:
+      self._lock.release()
+
+  def GetRate(self):
+    """Returns the current rate of the bucket.
+
+    Returns:
+      float Maximum number of calls per second, None if there is no limit.
+    """
+    return self._rate
+
+  def _Refill(self, now):
+    """Adds the tokens earned since the last refill. Caller holds the lock.
+
+    Args:
+      now: float The current time.
+    """
+    if now > self._updated:
+      self._tokens = min(self._burst,
+                         self._tokens + (now - self._updated) * self._rate)
+      self._updated = now
+
+
+class RateLimiter(object):
+
+  """Token buckets for every key calls are made with.
+
+  Buckets are created on first use with the rate configured for their scope.
+  A RateLimiter is shared by all services of a client, so that the calls of
+  every service count towards the limits of their developer token and client
+  customer.
+  """
+
+  def __init__(self, rates=None):
+    """Inits RateLimiter.
+
+    Args:
+      [optional]
+      rates: dict Maximum number of calls per second for each scope, e.g.
+             {RateLimiter.CUSTOMER: 5}. Scopes without a rate are not limited,
+             but still back off after a rate limit error.
+    """
+    self._rates = {}
+    for scope, rate in (rates or {}).iteritems():
+      if rate:
+        self._rates[scope] = float(rate)
+    self._lock = threading.Lock()
+    self._buckets = {}
+    self._stats = {'calls': 0, 'throttled': 0, 'wait_time': 0.0,
+                   'backoffs': 0}
+
+  def Acquire(self, keys, deadline=None):
+    """Blocks until a call with the given keys may be made.
+
+    Args:
+      keys: list (scope, value) tuples identifying the call.
+      [optional]
+      deadline: float Time, in seconds since the epoch, after which the call
+                may no longer be made. No deadline if None.
+
+    Returns:
+      float Number of seconds spent waiting.
+
+    Raises:
+      TimeoutError: if the call could not be made before the deadline.
+    """
+    waited = 0
+    for key in keys:
+      waited += self._GetBucket(key).Acquire(deadline)
+    self._lock.acquire()
+    try:
+      self._stats['calls'] += 1
+      if waited:
+        self._stats['throttled'] += 1
+        self._stats['wait_time'] += waited
+    finally:
+      self._lock.release()
+    return waited
+
+  def Backoff(self, keys, retry_after=None, scope=None):
+    """Slows down calls after the server reported a rate limit error.
+
+    Args:
+      keys: list (scope, value) tuples identifying the call which failed.
+      [optional]
+      retry_after: float Number of seconds the server asked to wait for.
+                   Defaults to DEFAULT_RETRY_AFTER.
+      scope: str The scope the limit was exceeded in. Slows down all of the
+             call's scopes if None.
+    """
+    if retry_after is None:
+      retry_after = DEFAULT_RETRY_AFTER
+    for key in keys:
+      if scope is None or key[0] == scope:
+        self._GetBucket(key).Backoff(float(retry_after))
+    self._lock.acquire()
+    try:
+      self._stats['backoffs'] += 1
+    finally:
+      self._lock.release()
+
+  def Recover(self, keys):
+    """Speeds calls back up after a successful call.
+
+    Args:
+      keys: list (scope, value) tuples identifying the call which succeeded.
+    """
+    for key in keys:
+      self._GetBucket(key).Recover()
+
+  def GetStats(self):
+    """Returns usage counters of this rate limiter.
+
+    Returns:
+      dict The number of calls made, calls which had to wait, seconds spent
+      waiting, rate limit errors backed off from and the current rate of each
+      limited key.
+    """
+    self._lock.acquire()
+    try:
+      stats = self._stats.copy()
+      stats['rates'] = dict([(key, bucket.GetRate()) for key, bucket
+                             in self._buckets.iteritems()
+                             if bucket.GetRate() is not None])
+    finally:
+      self._lock.release()
+    return stats
+
+  def _GetBucket(self, key):
+    """Returns the bucket for a key, creating it if necessary.
+
+    Args:
+      key: tuple The (scope, value) tuple of the bucket.
+
+    Returns:
+      TokenBucket The bucket for the key.
+    """
+    self._lock.acquire()
+    try:
+      if key not in self._buckets:
+        self._buckets[key] = TokenBucket(self._rates.get(key[0]))
+      return self._buckets[key]
+    finally:
+      self._lock.release()
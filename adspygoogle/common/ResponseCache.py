@@ -0,0 +1,256 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cache of the responses of read-only calls, bounded by age, count and size."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import collections
+import copy
+import threading
+import time
+
+
+# Default maximum number of responses kept.
+DEFAULT_MAX_ENTRIES = 1000
+# Default maximum total size, in bytes, of the responses kept.
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def IsCacheableMethod(method_name):
+  """Return whether the responses of a SOAP operation may be cached.
+
+  Only the operations reading entities, get, query and get*ByStatement, are
+  cached. Other read-only operations, such as getReportJob, report on state
+  which is expected to change.
+
+  Args:
+    method_name: str Name of the SOAP operation.
+
+  Returns:
+    bool True if the responses of the operation may be cached.
+  """
+  return (method_name in ('get', 'query') or
+          (method_name.startswith('get') and
+           method_name.endswith('ByStatement')))
+
+
+class ResponseCache(object):
+
+  """Keeps the responses of read-only calls for a while.
+
+  Responses expire after the time to live of their service. The least recently
+  used responses are dropped once there are more than max_entries of them, or
+  their total size is over max_bytes. Responses are kept under a scope, the
+  service and customer they were read from, so that a change made through a
+  service can drop what was read from it.
+
+  Responses are copied in and out of the cache, so callers may change them.
+  """
+
+  def __init__(self, default_ttl=0, max_entries=DEFAULT_MAX_ENTRIES,
+               max_bytes=DEFAULT_MAX_BYTES):
+    """Inits ResponseCache.
+
+    Args:
+      [optional]
+      default_ttl: float Seconds the responses of services without a time to
+                   live of their own are kept. 0 to not cache them.
+      max_entries: int Maximum number of responses kept.
+      max_bytes: int Maximum total size of the responses kept. No limit if
+                 None.
+    """
+    self._default_ttl = float(default_ttl)
+    self._max_entries = int(max_entries)
+    self._max_bytes = max_bytes
+    if max_bytes is not None:
+      self._max_bytes = int(max_bytes)
+    self._lock = threading.Lock()
+    self._ttls = {}
+    # Entries, least recently used first, each an (expiry time, scope,
+    # response, size) tuple.
+    self._entries = collections.OrderedDict()
+    self._bytes = 0
+    # Number of invalidations of each (service, customer) scope, None standing
+    # for all services or customers. See GetGeneration.
+    self._generations = {}
+    self._stats = {'hits': 0, 'misses': 0, 'evictions': 0,
+                   'invalidations': 0}
+
+  def SetTtl(self, service_name, ttl):
+    """Sets the time to live of the responses of a service.
+
+    Args:
+      service_name: str The name of the service, e.g. 'CampaignService'.
+      ttl: float Seconds its responses are kept, 0 to not cache them. None to
+           use the default time to live again.
+    """
+    self._lock.acquire()
+    try:
+      if ttl is None:
+        self._ttls.pop(service_name, None)
+      else:
+        self._ttls[service_name] = float(ttl)
+    finally:
+      self._lock.release()
+
+  def GetTtl(self, service_name):
+    """Returns the time to live of the responses of a service.
+
+    Args:
+      service_name: str The name of the service.
+
+    Returns:
+      float Seconds its responses are kept, 0 if they are not cached.
+    """
+    self._lock.acquire()
+    try:
+      return self._ttls.get(service_name, self._default_ttl)
+    finally:
+      self._lock.release()
+
+  def Get(self, key):
+    """Returns a copy of the response kept under a key.
+
+    Args:
+      key: tuple Identifies the call the response was returned by.
+
+    Returns:
+      tuple Whether a response was found, and a copy of the response.
+    """
+    self._lock.acquire()
+    try:
+      entry = self._entries.pop(key, None)
+      if entry is not None and entry[0] <= time.time():
+        self._bytes -= entry[3]
+        entry = None
+      if entry is None:
+        self._stats['misses'] += 1
+        return False, None
+      self._entries[key] = entry
+      self._stats['hits'] += 1
+      response = entry[2]
+    finally:
+      self._lock.release()
+    return True, copy.deepcopy(response)
+
+  def GetGeneration(self, scope):
+    """Returns the number of invalidations of a scope so far.
+
+    A response read while its scope was invalidated may predate the change
+    which caused the invalidation. Taking the generation of the scope before
+    the call and handing it to Put keeps such a response out of the cache.
+    Invalidations of other scopes leave the generation as it is.
+
+    Args:
+      scope: tuple The (service, customer) responses are read from.
+
+    Returns:
+      tuple The number of invalidations of the scope, of its service, of its
+      customer and of every scope so far.
+    """
+    self._lock.acquire()
+    try:
+      return self.__GetGeneration(scope)
+    finally:
+      self._lock.release()
+
+  def __GetGeneration(self, scope):
+    """Returns the generation of a scope, holding the lock.
+
+    Args:
+      scope: tuple The (service, customer) responses are read from.
+
+    Returns:
+      tuple The generation of the scope, see GetGeneration.
+    """
+    service, customer = scope
+    return tuple([self._generations.get(invalidated, 0) for invalidated in
+                  (scope, (service, None), (None, customer), (None, None))])
+
+  def Put(self, key, scope, response, size, ttl, generation=None):
+    """Keeps a copy of a response.
+
+    Args:
+      key: tuple Identifies the call the response was returned by.
+      scope: tuple The (service, customer) the response was read from.
+      response: mixed The response.
+      size: int The size of the response, in bytes.
+      ttl: float Seconds to keep the response for.
+      [optional]
+      generation: tuple The generation of the scope when the call was made.
+                  The response is not kept if the scope was invalidated since.
+    """
+    if ttl <= 0 or (self._max_bytes is not None and size > self._max_bytes):
+      return
+    entry = (time.time() + ttl, scope, copy.deepcopy(response), size)
+    self._lock.acquire()
+    try:
+      if (generation is not None and
+          generation != self.__GetGeneration(scope)):
+        return
+      previous = self._entries.pop(key, None)
+      if previous is not None:
+        self._bytes -= previous[3]
+      self._entries[key] = entry
+      self._bytes += size
+      while (len(self._entries) > self._max_entries or
+             (self._max_bytes is not None and self._bytes > self._max_bytes)):
+        unused_key, evicted = self._entries.popitem(last=False)
+        self._bytes -= evicted[3]
+        self._stats['evictions'] += 1
+    finally:
+      self._lock.release()
+
+  def Invalidate(self, service=None, customer=None):
+    """Drops the responses read from a service, customer, or both.
+
+    Args:
+      [optional]
+      service: str The service whose responses to drop. All services if None.
+      customer: str The customer whose responses to drop. All customers if
+                None.
+    """
+    self._lock.acquire()
+    try:
+      self._generations[(service, customer)] = (
+          self._generations.get((service, customer), 0) + 1)
+      for key, entry in self._entries.items():
+        entry_service, entry_customer = entry[1]
+        if ((service is None or service == entry_service) and
+            (customer is None or customer == entry_customer)):
+          del self._entries[key]
+          self._bytes -= entry[3]
+          self._stats['invalidations'] += 1
+    finally:
+      self._lock.release()
+
+  def GetStats(self):
+    """Returns usage counters of this cache.
+
+    Returns:
+      dict The number of hits, misses, responses evicted to make room and
+      responses invalidated, and the number and total size of the responses
+      kept.
+    """
+    self._lock.acquire()
+    try:
+      stats = self._stats.copy()
+      stats['entries'] = len(self._entries)
+      stats['bytes'] = self._bytes
+      return stats
+    finally:
+      self._lock.release()
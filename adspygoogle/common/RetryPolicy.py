@@ -0,0 +1,194 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Retries of SOAP calls which failed with a transient error."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import random
+import sys
+import threading
+import time
+
+from adspygoogle.common import Utils
+from adspygoogle.common.Errors import Error
+
+
+# Default number of times a call is retried.
+DEFAULT_MAX_RETRIES = 3
+# Default number of seconds the backoff before the first retry is based on.
+DEFAULT_BASE_DELAY = 1
+# The backoff before a retry never exceeds this number of seconds.
+_MAX_DELAY = 60
+
+
+class RetryPolicy(object):
+
+  """Retries calls which failed with a transient error.
+
+  Retries are spaced by exponential backoff with full jitter: before the nth
+  retry the call sleeps for a random time between 0 and base_delay * 2^(n-1)
+  seconds, so that clients which failed together do not retry together.
+
+  Only read-only calls, such as get and query, are retried unless the policy
+  is told to retry mutates as well. A mutate which timed out may have been
+  applied by the server, and sending it again could apply it twice.
+  """
+
+  def __init__(self, max_retries=DEFAULT_MAX_RETRIES,
+               base_delay=DEFAULT_BASE_DELAY, retry_mutates=False):
+    """Inits RetryPolicy.
+
+    Args:
+      [optional]
+      max_retries: int Maximum number of times a call is retried.
+      base_delay: float Number of seconds the backoff is based on.
+      retry_mutates: bool Whether calls which are not read-only are retried.
+    """
+    self._max_retries = int(max_retries)
+    self._base_delay = float(base_delay)
+    self._retry_mutates = retry_mutates
+    self._lock = threading.Lock()
+    self._stats = {'calls': 0, 'retries': 0, 'recovered': 0, 'exhausted': 0}
+
+  def IsRetryable(self, method_name):
+    """Returns whether calls to the given method may be retried.
+
+    Args:
+      method_name: str The name of the SOAP operation.
+
+    Returns:
+      bool True if the method may be retried.
+    """
+    return (self._max_retries > 0 and
+            (self._retry_mutates or Utils.IsReadOnlyMethod(method_name)))
+
+  def GetDelay(self, retry):
+    """Returns the number of seconds to wait for before a retry.
+
+    Args:
+      retry: int The number of retries already made.
+
+    Returns:
+      float The number of seconds to sleep for.
+    """
+    return random.uniform(0, min(_MAX_DELAY, self._base_delay * 2 ** retry))
+
+  def Call(self, method_name, call_function, args, is_transient,
+           deadline=None):
+    """Makes a call, retrying it as long as it fails with a transient error.
+
+    Some calls return an Error rather than raising it. Those are retried the
+    same way. The backoff before a retry is cut short at the deadline, and the
+    call is not retried once the deadline has passed.
+
+    Args:
+      method_name: str The name of the SOAP operation.
+      call_function: function The function making the SOAP call.
+      args: tuple The arguments to pass to the function.
+      is_transient: function A function taking the error of a failed call and
+                    returning whether it is worth retrying.
+      [optional]
+      deadline: float Time, in seconds since the epoch, after which the call is
+                not retried. No deadline if None.
+
+    Returns:
+      mixed The value returned by the last attempt.
+
+    Raises:
+      Exception: the error raised by the last attempt, if any.
+    """
+    retryable = self.IsRetryable(method_name)
+    retry = 0
+    while True:
+      error = None
+      try:
+        response = call_function(*args)
+      except Exception, e:
+        if not self._ShouldRetry(retryable, retry, e, is_transient):
+          raise
+        error = sys.exc_info()
+      else:
+        if not isinstance(response, Error):
+          if retry:
+            self._Count(retry, 'recovered')
+          else:
+            self._Count(retry)
+          return response
+        if not self._ShouldRetry(retryable, retry, response, is_transient):
+          return response
+      delay = self.GetDelay(retry)
+      if deadline is not None:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+          self._Count(retry, 'exhausted')
+          if error is not None:
+            raise error[0], error[1], error[2]
+          return response
+        delay = min(delay, remaining)
+      time.sleep(delay)
+      retry += 1
+
+  def GetStats(self):
+    """Returns usage counters of this retry policy.
+
+    Returns:
+      dict The number of calls made, retries made, calls which succeeded after
+      a retry and calls which still failed once out of retries.
+    """
+    self._lock.acquire()
+    try:
+      return self._stats.copy()
+    finally:
+      self._lock.release()
+
+  def _ShouldRetry(self, retryable, retry, error, is_transient):
+    """Decides whether to retry a failed call, counting it if not.
+
+    Args:
+      retryable: bool Whether the call's method may be retried.
+      retry: int The number of retries already made.
+      error: Exception The error of the failed attempt.
+      is_transient: function Tells whether an error is worth retrying.
+
+    Returns:
+      bool True if the call should be retried.
+    """
+    if not retryable or not is_transient(error):
+      self._Count(retry)
+      return False
+    if retry >= self._max_retries:
+      self._Count(retry, 'exhausted')
+      return False
+    return True
+
+  def _Count(self, retries, outcome=None):
+    """Updates the counters once a call is done.
+
+    Args:
+      retries: int The number of retries made for the call.
+      [optional]
+      outcome: str The counter of the call's outcome, 'recovered' or
+               'exhausted', if any.
+    """
+    self._lock.acquire()
+    try:
+      self._stats['calls'] += 1
+      self._stats['retries'] += retries
+      if outcome:
+        self._stats[outcome] += 1
+    finally:
+      self._lock.release()
@@ -116,7 +116,8 @@ def ValidateTypes(vars_tpl):
     raise ValidationError(msg)
 
 
-def _SoappySanityCheckComplexType(soappy_service, obj, ns, xsi_type):
+def _SoappySanityCheckComplexType(soappy_service, obj, ns, xsi_type,
+                                  validators):
   """Validates a dict representing a complex type against its WSDL definition.
 
   Args:
@@ -126,6 +127,8 @@ def _SoappySanityCheckComplexType(soappy_service, obj, ns, xsi_type):
     ns: string The namespace the given type belongs to.
     xsi_type: A string specifying the name of a complex type defined in the
               WSDL.
+    validators: Validators.ValidatorSet The generated validators of the
+                service's types, or None.
 
   Raises:
     ValidationError: The given object is not an acceptable representation of the
@@ -149,6 +152,12 @@ def _SoappySanityCheckComplexType(soappy_service, obj, ns, xsi_type):
                             '\'%s\'.' % (xsi_type, obj_contained_type))
     xsi_type = obj_contained_type
 
+  if validators is not None:
+    validator = validators.Get(ns, xsi_type)
+    if validator is not None:
+      validator(obj, type_key, soappy_service, validators)
+      return
+
   parameters = SoappyUtils.GenKeyOrderAttrs(soappy_service, ns, xsi_type)
   for key in obj:
     if obj[key] is None or key == type_key:
@@ -165,7 +174,7 @@ def _SoappySanityCheckComplexType(soappy_service, obj, ns, xsi_type):
             for item in obj[key]:
               SoappySanityCheck(soappy_service, item,
                                 param_type.getTargetNamespace(),
-                                param_type.getName())
+                                param_type.getName(), validators=validators)
           else:
             raise ValidationError('Field \'%s\' in complex type \'%s\' should '
                                   'be a list but value \'%s\' is a \'%s\' '
@@ -174,7 +183,7 @@ def _SoappySanityCheckComplexType(soappy_service, obj, ns, xsi_type):
         else:
           SoappySanityCheck(soappy_service, obj[key],
                             param_type.getTargetNamespace(),
-                            param_type.getName())
+                            param_type.getName(), validators=validators)
         break
     if not found:
       raise ValidationError('Field \'%s\' is not in type \'%s\'.'
@@ -200,7 +209,7 @@ def _SoappySanityCheckSimpleType(obj, xsi_type):
                           (xsi_type, obj, type(obj)))
 
 
-def _SoappySanityCheckArray(soappy_service, obj, ns, type_name):
+def _SoappySanityCheckArray(soappy_service, obj, ns, type_name, validators):
   """Validates a list representing an array type against its WSDL definition.
 
   Args:
@@ -211,6 +220,8 @@ def _SoappySanityCheckArray(soappy_service, obj, ns, type_name):
          dictionary, list, or string no matter what WSDL-defined type it is.
     ns: string The namespace the given type belongs to.
     type_name: A string specifying the type name defined in the WSDL.
+    validators: Validators.ValidatorSet The generated validators of the
+                service's types, or None.
 
   Raises:
     ValidationError if the given object is not a valid representation of the
@@ -236,10 +247,12 @@ def _SoappySanityCheckArray(soappy_service, obj, ns, type_name):
       if item is None: continue
       SoappySanityCheck(soappy_service, item, ns,
                         SoappyUtils.GetArrayItemTypeName(type_name, ns,
-                                                         soappy_service))
+                                                         soappy_service),
+                        validators=validators)
 
 
-def SoappySanityCheck(soappy_service, obj, ns, obj_type, max_occurs='1'):
+def SoappySanityCheck(soappy_service, obj, ns, obj_type, max_occurs='1',
+                      validators=None):
   """Validates any given object against its WSDL definition.
 
   This method considers None and the empty string to be a valid representation
@@ -253,6 +266,10 @@ def SoappySanityCheck(soappy_service, obj, ns, obj_type, max_occurs='1'):
     ns: string The namespace the given type belongs to.
     obj_type: A string specifying the type name defined in the WSDL.
     max_occurs: string The maxOccurs attribute for this object.
+    validators: Validators.ValidatorSet The generated validators of the
+                service's types, used to check dictionaries of those types.
+                Dictionaries are checked by looking their fields up in the
+                schema if not given.
 
   Raises:
     ValidationError: The given type has no definition in the WSDL or the given
@@ -276,9 +293,11 @@ def SoappySanityCheck(soappy_service, obj, ns, obj_type, max_occurs='1'):
       elif soap_type == 'complexType':
         if (SoappyUtils.IsAnArrayType(obj_type, ns, soappy_service) or
             not max_occurs.isdigit() or int(max_occurs) > 1):
-          _SoappySanityCheckArray(soappy_service, obj, ns, obj_type)
+          _SoappySanityCheckArray(soappy_service, obj, ns, obj_type,
+                                  validators)
         else:
-          _SoappySanityCheckComplexType(soappy_service, obj, ns, obj_type)
+          _SoappySanityCheckComplexType(soappy_service, obj, ns, obj_type,
+                                        validators)
       else:
         raise ValidationError('Unrecognized type definition tag in WSDL: \'%s\''
                               % soap_type)
@@ -0,0 +1,115 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Coalescing of identical concurrent read-only calls into a single request."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import threading
+
+from adspygoogle.common.Errors import TimeoutError
+
+
+class _Flight(object):
+
+  """A call in progress, waited on by the identical calls made meanwhile."""
+
+  def __init__(self):
+    """Inits _Flight."""
+    self.done = threading.Event()
+    self.outcome = None
+
+
+class SingleFlight(object):
+
+  """Makes one request for identical calls made at the same time.
+
+  The first call made with a key sends its request. Calls made with the same
+  key while it is in progress wait for it and share its outcome, instead of
+  sending requests of their own. Once the request completes, the next call
+  with the key sends a new one. Nothing is cached past the request, which
+  makes this only safe for calls that do not change anything on the server.
+  """
+
+  def __init__(self):
+    """Inits SingleFlight."""
+    self._lock = threading.Lock()
+    self._flights = {}
+    self._stats = {'calls': 0, 'coalesced': 0}
+
+  def Call(self, key, attempt, timeout=None):
+    """Makes a call, or waits for an identical call in progress.
+
+    Args:
+      key: tuple Identifies the call. Calls with equal keys are identical.
+      attempt: function Makes the call. Takes no arguments and returns a tuple
+               holding the outcome of the call. It must not raise.
+      [optional]
+      timeout: float Maximum number of seconds to wait for an identical call in
+               progress. Waits forever if None.
+
+    Returns:
+      tuple The tuple returned by the attempt which was made, followed by
+      whether this call made it. Calls which did not make the attempt share
+      the objects in its tuple and must copy those they may change.
+
+    Raises:
+      TimeoutError: if the identical call in progress did not complete in
+                    time.
+    """
+    self._lock.acquire()
+    try:
+      self._stats['calls'] += 1
+      flight = self._flights.get(key)
+      if flight is None:
+        flight = _Flight()
+        self._flights[key] = flight
+        leader = True
+      else:
+        self._stats['coalesced'] += 1
+        leader = False
+    finally:
+      self._lock.release()
+
+    if not leader:
+      if not flight.done.wait(timeout):
+        raise TimeoutError('Identical call did not complete within %s '
+                           'seconds.' % timeout)
+      return flight.outcome, False
+
+    try:
+      flight.outcome = attempt()
+    finally:
+      self._lock.acquire()
+      try:
+        del self._flights[key]
+      finally:
+        self._lock.release()
+      flight.done.set()
+    return flight.outcome, True
+
+  def GetStats(self):
+    """Returns usage counters of this single flight.
+
+    Returns:
+      dict The number of calls made and calls which waited for an identical
+      call instead of sending a request.
+    """
+    self._lock.acquire()
+    try:
+      return self._stats.copy()
+    finally:
+      self._lock.release()
@@ -299,21 +299,7 @@ class SoapBuffer(Buffer):
     # Remove banners.
     xml_dump = self.GetSoapOut().lstrip('\n').rstrip('\n')
     xml_parts = xml_dump.split('\n')
-
-    # While multiple threads are used, SoapBuffer gets too greedy and tries to
-    # capture all traffic that goes to sys.stdout. The parts that we don't need
-    # should be redirected back to sys.stdout.
-    banner = '%s Outgoing SOAP %s' % ('*' * 3, '*' * 54)
-    begin = 1
-    for index in range(len(xml_parts)):
-      if xml_parts[index] == banner:
-        begin = index + 1
-        break
-    non_xml = '\n'.join(xml_parts[:begin-1])
-    # Send data we don't need back to sys.stdout.
-    if non_xml: print non_xml
-
-    xml_dump = '\n'.join(xml_parts[begin:len(xml_parts)-1])
+    xml_dump = '\n'.join(xml_parts[1:len(xml_parts)-1])
 
     try:
       if self.__xml_parser == PYXML:
@@ -21,8 +21,10 @@ __author__ = 'api.sgrinberg@gmail.com (Stan Grinberg)'
 import codecs
 import csv
 import datetime
+import hashlib
 import htmlentitydefs
 import re
+import socket
 import sys
 import traceback
 import urllib
@@ -176,6 +178,86 @@ def GetErrorFromHtml(data):
   return ''
 
 
+def GetDownloadTimeout(config, op_config=None):
+  """Return the socket timeout of a download made outside of a SOAP call.
+
+  Downloads, such as reports, can legitimately take long, so only the read
+  timeout (or the connect timeout, if no read timeout is set) applies to them,
+  not the total timeout of a call.
+
+  Args:
+    config: dict Dictionary object with populated configuration values.
+    [optional]
+    op_config: dict Dictionary object with additional configuration values for
+               this operation, which take precedence over config.
+
+  Returns:
+    float Seconds to wait for the server on each socket operation, or the
+    default socket timeout if no timeout is set.
+  """
+  for key in ('read_timeout', 'conn_timeout'):
+    for source in (op_config or {}, config):
+      if source.get(key) is not None:
+        return float(source[key])
+  return socket._GLOBAL_DEFAULT_TIMEOUT
+
+
+def IsReadOnlyMethod(method_name):
+  """Return whether a SOAP operation only reads data.
+
+  Read-only operations, such as get and query, can safely be sent again after
+  a failure.
+
+  Args:
+    method_name: str Name of the SOAP operation.
+
+  Returns:
+    bool True if the operation only reads data, False otherwise.
+  """
+  method_name = method_name[:1].lower() + method_name[1:]
+  return method_name.startswith('get') or method_name == 'query'
+
+
+def GetCanonicalDigest(obj):
+  """Return a digest of an object which is equal for objects sent alike.
+
+  Dictionaries are digested with their keys sorted and their None values
+  left out, lists and tuples alike, unicode as UTF-8 and other values as the
+  string they are sent as, so that objects packed into the same XML have the
+  same digest.
+
+  Args:
+    obj: mixed The object to digest, e.g. the arguments of a call.
+
+  Returns:
+    str The hexadecimal SHA-1 digest of the object.
+  """
+  return hashlib.sha1(repr(_Canonicalize(obj))).hexdigest()
+
+
+def _Canonicalize(obj):
+  """Return a canonical form of an object, see GetCanonicalDigest.
+
+  Args:
+    obj: mixed The object to convert.
+
+  Returns:
+    mixed The canonical form of the object, made of tuples and strings.
+  """
+  if isinstance(obj, dict):
+    return ('dict', tuple(sorted([(_Canonicalize(key), _Canonicalize(value))
+                                  for key, value in obj.iteritems()
+                                  if value is not None])))
+  elif isinstance(obj, (list, tuple)):
+    return ('list', tuple([_Canonicalize(item) for item in obj]))
+  elif isinstance(obj, unicode):
+    return obj.encode('utf-8')
+  elif obj is None:
+    return None
+  else:
+    return str(obj)
+
+
 def IsHtml(data):
   """Return True if data is HTML, False otherwise.
 
@@ -423,19 +505,13 @@ def LastStackTrace():
   Returns:
     str Last stack traceback.
   """
-  # Temporarily redirect traceback from STDOUT into a buffer.
   trace_buf = Buffer()
-  old_stdout = sys.stdout
-  sys.stdout = trace_buf
-
   try:
-    traceback.print_exc(file=sys.stdout)
+    traceback.print_exc(file=trace_buf)
   except AttributeError:
     # No exception for traceback exist.
-    print ''
+    pass
 
-  # Restore STDOUT.
-  sys.stdout = old_stdout
   return trace_buf.GetBufferAsStr().strip()
 
 
@@ -0,0 +1,216 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Fixed-size pool of threads running calls which complete as futures."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import Queue
+import threading
+
+from adspygoogle.common.Errors import Error
+
+
+# Default number of threads in a client's worker pool.
+DEFAULT_MAX_WORKERS = 10
+
+
+class Future(object):
+
+  """The pending result of a call submitted to a WorkerPool."""
+
+  def __init__(self):
+    """Inits Future."""
+    self._done = threading.Event()
+    self._lock = threading.Lock()
+    self._callbacks = []
+    self._result = None
+    self._error = None
+
+  def Done(self):
+    """Returns whether the call has completed.
+
+    Returns:
+      bool True if the call has returned or raised an error.
+    """
+    return self._done.isSet()
+
+  def Result(self, timeout=None):
+    """Waits for the call to complete and returns its result.
+
+    Args:
+      [optional]
+      timeout: float Maximum number of seconds to wait. Waits forever if None.
+
+    Returns:
+      mixed The value returned by the call.
+
+    Raises:
+      Error: if the call did not complete within the timeout.
+      Exception: the error raised by the call, if any.
+    """
+    if not self._done.wait(timeout):
+      raise Error('Call did not complete within %s seconds.' % timeout)
+    if self._error is not None:
+      raise self._error
+    return self._result
+
+  def GetError(self, timeout=None):
+    """Waits for the call to complete and returns the error it raised.
+
+    Args:
+      [optional]
+      timeout: float Maximum number of seconds to wait. Waits forever if None.
+
+    Returns:
+      Exception The error raised by the call, None if it succeeded.
+
+    Raises:
+      Error: if the call did not complete within the timeout.
+    """
+    if not self._done.wait(timeout):
+      raise Error('Call did not complete within %s seconds.' % timeout)
+    return self._error
+
+  def AddDoneCallback(self, callback):
+    """Registers a function to call with this future once it completes.
+
+    The callback runs on the worker thread which completed the call, or right
+    away on the calling thread if the call has already completed. Event loops
+    can use it to wake up without blocking a thread on Result().
+
+    Args:
+      callback: function A function taking this Future as its only argument.
+    """
+    self._lock.acquire()
+    try:
+      if not self._done.isSet():
+        self._callbacks.append(callback)
+        return
+    finally:
+      self._lock.release()
+    callback(self)
+
+  def _Complete(self, result, error):
+    """Stores the outcome of the call and runs the registered callbacks.
+
+    Args:
+      result: mixed The value returned by the call.
+      error: Exception The error raised by the call, None if it succeeded.
+    """
+    self._lock.acquire()
+    try:
+      self._result = result
+      self._error = error
+      self._done.set()
+      callbacks = self._callbacks
+      self._callbacks = []
+    finally:
+      self._lock.release()
+    for callback in callbacks:
+      try:
+        callback(self)
+      except Exception:
+        # A failing callback must not take down the worker thread.
+        pass
+
+
+class WorkerPool(object):
+
+  """Runs submitted calls on a fixed number of threads.
+
+  Threads are started as calls are submitted, up to max_workers, and then
+  reused for the life of the process. Calls submitted while all threads are
+  busy wait in a queue, so any number of calls can be pending without each
+  holding a thread of its own.
+  """
+
+  def __init__(self, max_workers=DEFAULT_MAX_WORKERS):
+    """Inits WorkerPool.
+
+    Args:
+      [optional]
+      max_workers: int Maximum number of threads running calls.
+
+    Raises:
+      ValueError: if max_workers is less than 1.
+    """
+    if int(max_workers) < 1:
+      raise ValueError('max_workers must be at least 1.')
+    self._max_workers = int(max_workers)
+    self._pending = Queue.Queue()
+    self._lock = threading.Lock()
+    self._workers = []
+    self._idle_workers = 0
+
+  def GetMaxWorkers(self):
+    """Returns the maximum number of threads running calls.
+
+    Returns:
+      int The size of the pool.
+    """
+    return self._max_workers
+
+  def Submit(self, function, *args):
+    """Schedules a call to run on a worker thread.
+
+    Args:
+      function: function The function to call.
+      args: tuple The arguments to pass to the function.
+
+    Returns:
+      Future The pending result of the call.
+    """
+    future = Future()
+    self._lock.acquire()
+    try:
+      self._pending.put((future, function, args))
+      if (self._idle_workers < self._pending.qsize() and
+          len(self._workers) < self._max_workers):
+        worker = threading.Thread(target=self.__Work)
+        worker.setDaemon(True)
+        self._workers.append(worker)
+        worker.start()
+    finally:
+      self._lock.release()
+    return future
+
+  def __Work(self):
+    """Runs calls from the queue for the life of the process."""
+    while True:
+      self._lock.acquire()
+      try:
+        self._idle_workers += 1
+      finally:
+        self._lock.release()
+      future, function, args = self._pending.get()
+      self._lock.acquire()
+      try:
+        self._idle_workers -= 1
+      finally:
+        self._lock.release()
+
+      result = error = None
+      try:
+        result = function(*args)
+      except Exception, e:
+        error = e
+      future._Complete(result, error)
+
+
+# The pool shared by everything not given a client's worker pool. Its threads
+# are only started once calls are submitted.
+DEFAULT_POOL = WorkerPool()
@@ -0,0 +1,212 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""On-disk cache of WSDLs, revalidated with their ETag and Last-Modified."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import hashlib
+import mimetools
+import os
+import tempfile
+import threading
+import urllib
+
+from adspygoogle.common.Errors import Error
+
+
+# Headers of a cache file, with the keys of the entry they hold.
+_HEADERS = (('URL', 'url'), ('ETag', 'etag'),
+            ('Last-Modified', 'last_modified'))
+
+
+class WsdlCache(object):
+
+  """Keeps the WSDLs of services in a directory across processes.
+
+  Entries are keyed by WSDL URL, which identifies the server, version and
+  service. An entry is revalidated with a conditional request each time it is
+  used, so an unchanged WSDL costs a round trip but no download. In offline
+  mode cached entries are used as they are and nothing is ever requested.
+
+  The WSDL text is cached rather than the parsed WSDL, since the objects built
+  by SOAPpy's WSDL parser cannot be pickled. Other schema documents, such as
+  the XSD of AdWords report definitions, are cached the same way.
+
+  Each entry is a plain text file: the URL, ETag and Last-Modified of the WSDL
+  as RFC 822 headers, a blank line and the WSDL. Nothing in the file is ever
+  executed, so the directory may be shared between users.
+  """
+
+  def __init__(self, directory, offline=False):
+    """Inits WsdlCache.
+
+    Args:
+      directory: str The directory to keep the cached WSDLs in. It is created
+                 if it does not exist.
+      [optional]
+      offline: bool Whether to only use cached WSDLs, without revalidating
+               them or downloading missing ones.
+    """
+    self._directory = directory
+    self._offline = offline
+    self._lock = threading.Lock()
+    self._stats = {'hits': 0, 'revalidated': 0, 'downloads': 0, 'stale': 0}
+    if not os.path.isdir(directory):
+      os.makedirs(directory)
+
+  def Fetch(self, url):
+    """Returns the WSDL at the given URL, from the cache when possible.
+
+    If the server cannot be reached, a cached WSDL is used as it is.
+
+    Args:
+      url: str The URL of the WSDL.
+
+    Returns:
+      str The WSDL.
+
+    Raises:
+      Error: if the WSDL is neither cached nor could be downloaded.
+    """
+    entry = self._Load(url)
+    if self._offline:
+      if entry is None:
+        raise Error('The WSDL at \'%s\' is not cached, and the WSDL cache is '
+                    'in offline mode.' % url)
+      self._Count('hits')
+      return entry['wsdl']
+
+    opener = urllib.URLopener()
+    if entry is not None:
+      if entry['etag']:
+        opener.addheader('If-None-Match', entry['etag'])
+      if entry['last_modified']:
+        opener.addheader('If-Modified-Since', entry['last_modified'])
+    try:
+      stream = opener.open(url)
+      try:
+        wsdl = stream.read()
+        headers = stream.info()
+      finally:
+        stream.close()
+    except IOError, e:
+      if entry is None:
+        raise Error('Unable to download the WSDL at \'%s\': %s' % (url, e))
+      # A 304 response is raised as ('http error', 304, msg, headers).
+      if len(e.args) > 1 and e.args[1] == 304:
+        self._Count('revalidated')
+      else:
+        self._Count('stale')
+      return entry['wsdl']
+
+    self._Store(url, {'url': url, 'etag': headers.getheader('ETag'),
+                      'last_modified': headers.getheader('Last-Modified'),
+                      'wsdl': wsdl})
+    self._Count('downloads')
+    return wsdl
+
+  def GetStats(self):
+    """Returns usage counters of this cache.
+
+    Returns:
+      dict The number of WSDLs served from the cache in offline mode
+      ('hits'), revalidated as unchanged ('revalidated'), downloaded
+      ('downloads') and served from the cache because the server could not be
+      reached ('stale').
+    """
+    self._lock.acquire()
+    try:
+      return self._stats.copy()
+    finally:
+      self._lock.release()
+
+  def _GetPath(self, url):
+    """Returns the path of the cache file of a URL.
+
+    Args:
+      url: str The URL of the WSDL.
+
+    Returns:
+      str The path of the file.
+    """
+    return os.path.join(self._directory,
+                        hashlib.sha1(url).hexdigest() + '.wsdl')
+
+  def _Load(self, url):
+    """Reads the cache entry of a URL.
+
+    Args:
+      url: str The URL of the WSDL.
+
+    Returns:
+      dict The entry, or None if the URL is not cached or its file is
+      unreadable.
+    """
+    try:
+      cache_file = open(self._GetPath(url), 'rb')
+    except IOError:
+      return None
+    try:
+      headers = mimetools.Message(cache_file)
+      wsdl = cache_file.read()
+    finally:
+      cache_file.close()
+    if headers.getheader('URL') != url:
+      return None
+    return {'url': url, 'etag': headers.getheader('ETag'),
+            'last_modified': headers.getheader('Last-Modified'),
+            'wsdl': wsdl}
+
+  def _Store(self, url, entry):
+    """Writes the cache entry of a URL.
+
+    The entry is written to a temporary file which is then renamed, so that
+    other processes never read a partly written entry.
+
+    Args:
+      url: str The URL of the WSDL.
+      entry: dict The entry to write.
+    """
+    fd, temp_path = tempfile.mkstemp(dir=self._directory, suffix='.tmp')
+    try:
+      temp_file = os.fdopen(fd, 'wb')
+      try:
+        for header, key in _HEADERS:
+          # A value spanning lines would end the headers early.
+          if entry[key] and '\n' not in entry[key] and '\r' not in entry[key]:
+            temp_file.write('%s: %s\r\n' % (header, entry[key]))
+        temp_file.write('\r\n')
+        temp_file.write(entry['wsdl'])
+      finally:
+        temp_file.close()
+      os.rename(temp_path, self._GetPath(url))
+    except (IOError, OSError):
+      # The cache is only an optimization; failing to write it is harmless.
+      if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+  def _Count(self, counter):
+    """Increments a usage counter.
+
+    Args:
+      counter: str The name of the counter.
+    """
+    self._lock.acquire()
+    try:
+      self._stats[counter] += 1
+    finally:
+      self._lock.release()
@@ -0,0 +1,199 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Process-wide registry of parsed WSDLs shared by all services."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import StringIO
+import threading
+
+from adspygoogle import SOAPpy
+from adspygoogle.common import WsdlSnapshot
+
+
+class WsdlProxyView(SOAPpy.WSDL.Proxy):
+
+  """A SOAPpy.WSDL.Proxy sharing its parsed WSDL with other services.
+
+  The parsed WSDL and the call information of its methods belong to the
+  registry and must not be changed. Only the SOAPpy proxy, which holds the
+  service's SOAPConfig, headers and method attributes, is the view's own.
+  """
+
+  def __init__(self, parsed_proxy, config, **kw):
+    """Inits WsdlProxyView.
+
+    Args:
+      parsed_proxy: SOAPpy.WSDL.Proxy The proxy the WSDL was parsed by.
+      config: SOAPpy.SOAPConfig The SOAP config of this view.
+      **kw: dict Keyword arguments for the view's SOAPpy.SOAPProxy.
+    """
+    self.wsdl = parsed_proxy.wsdl
+    self.methods = parsed_proxy.methods
+    self.soapproxy = SOAPpy.SOAPProxy('http://localhost/dummy.webservice',
+                                      config=config, **kw)
+
+
+class WsdlRegistry(object):
+
+  """Parses the WSDL of each service URL once and hands out views of it.
+
+  A service URL identifies the server, version and service, so every service
+  created for the same URL, by any client, shares one parsed WSDL. Services
+  asking for a WSDL which is being parsed wait for that parse instead of
+  starting their own.
+
+  WSDLs are read from the snapshots added to the registry when they have the
+  service's version, and downloaded otherwise. A snapshot serves any server,
+  since the parsed WSDL's methods are pointed at the service's URL.
+  """
+
+  def __init__(self):
+    """Inits WsdlRegistry."""
+    self._lock = threading.Lock()
+    self._parsed = {}
+    self._url_locks = {}
+    self._snapshot = {}
+    self._stats = {'parses': 0, 'hits': 0, 'snapshot_parses': 0}
+
+  def GetProxy(self, service_url, config, wsdl_cache=None, snapshot_key=None,
+               **kw):
+    """Returns a view of the WSDL of a service, parsing it if necessary.
+
+    Args:
+      service_url: str The URL of the service. Its WSDL is read from the URL
+                   followed by '?wsdl'.
+      config: SOAPpy.SOAPConfig The SOAP config of the view.
+      [optional]
+      wsdl_cache: WsdlCache.WsdlCache The on-disk cache to read the WSDL
+                  through, if any.
+      snapshot_key: tuple The product's package, version and name of the
+                    service, under which its WSDL may be in a snapshot.
+      **kw: dict Keyword arguments for the view's SOAPpy.SOAPProxy.
+
+    Returns:
+      WsdlProxyView A view of the parsed WSDL.
+
+    Raises:
+      WSDLError: if the WSDL could not be parsed.
+      Error: if the WSDL cache could not provide the WSDL.
+    """
+    return WsdlProxyView(
+        self._GetParsedProxy(service_url, wsdl_cache, snapshot_key), config,
+        **kw)
+
+  def AddSnapshot(self, package, wsdls):
+    """Adds bundled WSDLs for the registry to read instead of downloading.
+
+    Args:
+      package: str The product's package, e.g. 'adspygoogle.adwords'.
+      wsdls: dict Compressed WSDLs keyed by (version, service name), see
+             WsdlSnapshot.
+    """
+    self._lock.acquire()
+    try:
+      for (version, service_name), data in wsdls.iteritems():
+        self._snapshot[(package, version, service_name)] = data
+    finally:
+      self._lock.release()
+
+  def Clear(self):
+    """Forgets all parsed WSDLs, so that they are parsed again when needed."""
+    self._lock.acquire()
+    try:
+      self._parsed.clear()
+    finally:
+      self._lock.release()
+
+  def GetStats(self):
+    """Returns usage counters of this registry.
+
+    Returns:
+      dict The number of WSDLs parsed ('parses'), of those read from a
+      snapshot ('snapshot_parses') and of views created from an already
+      parsed WSDL ('hits').
+    """
+    self._lock.acquire()
+    try:
+      return self._stats.copy()
+    finally:
+      self._lock.release()
+
+  def _GetParsedProxy(self, service_url, wsdl_cache, snapshot_key):
+    """Returns the proxy the WSDL of a service was parsed by, parsing it once.
+
+    Args:
+      service_url: str The URL of the service.
+      wsdl_cache: WsdlCache.WsdlCache The on-disk cache to read the WSDL
+                  through, or None.
+      snapshot_key: tuple The key of the service's WSDL in the snapshots, or
+                    None.
+
+    Returns:
+      SOAPpy.WSDL.Proxy The proxy holding the parsed WSDL.
+    """
+    self._lock.acquire()
+    try:
+      if service_url in self._parsed:
+        self._stats['hits'] += 1
+        return self._parsed[service_url]
+      if service_url not in self._url_locks:
+        self._url_locks[service_url] = threading.Lock()
+      url_lock = self._url_locks[service_url]
+    finally:
+      self._lock.release()
+
+    url_lock.acquire()
+    try:
+      # Another thread may have parsed the WSDL while this one waited.
+      self._lock.acquire()
+      try:
+        if service_url in self._parsed:
+          self._stats['hits'] += 1
+          return self._parsed[service_url]
+      finally:
+        self._lock.release()
+
+      wsdl_url = service_url + '?wsdl'
+      wsdl_source = wsdl_url
+      snapshot_data = self._snapshot.get(snapshot_key)
+      if snapshot_data is not None:
+        wsdl_source = StringIO.StringIO(WsdlSnapshot.Decode(snapshot_data))
+      elif wsdl_cache:
+        wsdl_source = StringIO.StringIO(wsdl_cache.Fetch(wsdl_url))
+      if wsdl_source is not wsdl_url:
+        # Relative imports in the WSDL are resolved against the stream's name.
+        wsdl_source.name = wsdl_url
+      parsed_proxy = SOAPpy.WSDL.Proxy(wsdl_source, noroot=1)
+      for method_key in parsed_proxy.methods:
+        parsed_proxy.methods[method_key].location = service_url
+
+      self._lock.acquire()
+      try:
+        self._parsed[service_url] = parsed_proxy
+        self._stats['parses'] += 1
+        if snapshot_data is not None:
+          self._stats['snapshot_parses'] += 1
+      finally:
+        self._lock.release()
+      return parsed_proxy
+    finally:
+      url_lock.release()
+
+
+# The registry shared by all services of the process.
+REGISTRY = WsdlRegistry()
@@ -0,0 +1,105 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Snapshots of service WSDLs bundled with the library at build time.
+
+A snapshot is a generated module, WsdlSnapshotData, in a product's package. It
+maps the version and name of each service of each supported version to its
+compressed WSDL, so that services can be created without downloading their
+WSDL, whichever server they are created for. The module is written by
+scripts/adspygoogle/common/generate_wsdl_snapshot.py, which pack_it.py runs
+when given --snapshot.
+"""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import base64
+import pprint
+import zlib
+
+
+# Name of the generated module in a product's package.
+MODULE_NAME = 'WsdlSnapshotData'
+
+_MODULE_TEMPLATE = '''#!/usr/bin/python
+#
+# Generated by generate_wsdl_snapshot.py. Do not edit.
+
+"""WSDLs of the services of %s, see adspygoogle.common.WsdlSnapshot."""
+
+WSDLS = %s
+'''
+
+
+def Encode(wsdl):
+  """Compresses a WSDL for storage in a snapshot.
+
+  Args:
+    wsdl: str The WSDL.
+
+  Returns:
+    str The compressed WSDL, in base64.
+  """
+  return base64.b64encode(zlib.compress(wsdl, 9))
+
+
+def Decode(data):
+  """Restores a WSDL stored in a snapshot.
+
+  Args:
+    data: str The compressed WSDL, in base64.
+
+  Returns:
+    str The WSDL.
+  """
+  return zlib.decompress(base64.b64decode(data))
+
+
+def Load(package):
+  """Returns the snapshot of a product, if it has one.
+
+  Args:
+    package: str The product's package, e.g. 'adspygoogle.adwords'.
+
+  Returns:
+    dict The compressed WSDLs, keyed by (version, service name). Empty if the
+    product has no snapshot.
+  """
+  try:
+    module = __import__('%s.%s' % (package, MODULE_NAME), {}, {},
+                        [MODULE_NAME])
+  except ImportError:
+    return {}
+  return module.WSDLS
+
+
+def Write(path, package, wsdls):
+  """Writes the snapshot module of a product.
+
+  Args:
+    path: str The path of the module to write.
+    package: str The product's package, e.g. 'adspygoogle.adwords'.
+    wsdls: dict The WSDLs to store, keyed by (version, service name).
+  """
+  encoded = {}
+  for key in wsdls:
+    encoded[key] = Encode(wsdls[key])
+  snapshot_file = open(path, 'w')
+  try:
+    snapshot_file.write(_MODULE_TEMPLATE % (package,
+                                            pprint.pformat(encoded, width=80)))
+  finally:
+    snapshot_file.close()
@@ -20,9 +20,9 @@ __author__ = 'api.sgrinberg@gmail.com (Stan Grinberg)'
 
 import sys
 
-VERSION = '3.1.1'
+VERSION = '3.2.0'
 
-MIN_PY_VERSION = '2.4.4'
+MIN_PY_VERSION = '2.7'
 PYXML_NAME = 'PyXML'
 ETREE_NAME = 'ElementTree'
 MIN_PYXML_VERSION = '0.8.3'
@@ -55,6 +55,18 @@ def GetCurrentCertsFile():
   return _ca_certs_file
 
 
+def GetHttpsConnectionClass():
+  """Returns the HTTPS connection class to use for new connections.
+
+  Returns:
+    class The certificate validating _SslAwareHttpsConnection if a trusted
+    certificates file is set, httplib.HTTPSConnection otherwise.
+  """
+  if _ca_certs_file is None:
+    return httplib.HTTPSConnection
+  return _SslAwareHttpsConnection
+
+
 class _SslAwareHttps(httplib.HTTPS):
   """Overridden HTTPS class which can handle SSL certificate verification."""
 
@@ -82,7 +94,7 @@ class _SslAwareHttpsConnection(httplib.HTTPSConnection):
 
   def connect(self):
     """Creates a socket and validates SSL certificates."""
-    sock = socket.create_connection((self.host, self.port))
+    sock = socket.create_connection((self.host, self.port), self.timeout)
     try:
       self.sock = ssl.wrap_socket(sock, keyfile=self.key_file,
                                   certfile=self.cert_file,
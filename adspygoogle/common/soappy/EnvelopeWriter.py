@@ -0,0 +1,393 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Writes the parameters of SOAP requests as XML, without SOAPpy objects.
+
+MessageHandler.PackForSoappy turns every dictionary, list and string of a
+request into a SOAPpy object, which SOAPpy's builder then walks to write the
+XML. EnvelopeWriter writes the same XML straight from the dictionaries and
+lists, taking the order, namespaces and types of each type's fields from the
+SoappyUtils.TypeIndex.
+
+The XML is written as UTF-8 strs. Names taken from the WSDL, which SOAPpy
+parses as unicode, are encoded as they are first used, so that text which is
+not ASCII can be joined with them.
+
+SOAPpy still writes the envelope, with its headers and the method element, for
+a call made without arguments. The transport splices the written parameters
+into the method element with SpliceBody, or streams them between the halves of
+the envelope returned by SplitEnvelope.
+"""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+from adspygoogle import SOAPpy
+from adspygoogle.common import Utils
+from adspygoogle.common.soappy import SoappyUtils
+
+
+# Prefix of the XML schema instance namespace in written parameters, declared
+# on the method element by SplitEnvelope.
+_XSI_PREFIX = 'xsi'
+_XSI_DECLARATION = ' xmlns:%s="%s"' % (_XSI_PREFIX, SOAPpy.NS.XSI3)
+
+
+class EnvelopeWriter(object):
+
+  """Writes the parameters of SOAP requests like SOAPpy writes packed ones."""
+
+  def __init__(self, soappy_service, wrap_lists, prefix_function):
+    """Inits EnvelopeWriter.
+
+    Args:
+      soappy_service: SOAPpy.WSDL.Proxy The SOAPpy service object encapsulating
+                      the WSDL definitions.
+      wrap_lists: bool Whether or not to wrap lists in an additional layer.
+      prefix_function: callable Takes in an xml namespace and returns the prefix
+                       to use to represent it.
+
+    Raises:
+      ValueError: if the WSDL cannot be indexed.
+    """
+    self._soappy_service = soappy_service
+    self._type_index = SoappyUtils.GetTypeIndex(soappy_service)
+    if self._type_index is None:
+      raise ValueError('The WSDL cannot be indexed.')
+    self._wrap_lists = wrap_lists
+    self._prefix_function = prefix_function
+    self._prefixes = {}
+    self._names = {}
+
+  def WriteParameters(self, args, inputs):
+    """Writes the parameters of a call as XML.
+
+    Args:
+      args: tuple The arguments of the call, in order.
+      inputs: tuple The GenericApiService.ParamInfo of each input parameter of
+              the method, in order.
+
+    Returns:
+      list The chunks of XML, to be joined.
+
+    Raises:
+      TypeError: if a dictionary has a key which is not a field of its type.
+      ValueError: if an argument cannot be written directly, in which case it
+                  must be packed for SOAPpy instead.
+    """
+    return list(self.GenerateParameters(args, inputs))
+
+  def StreamParameters(self, args, inputs):
+    """Returns the parameters of a call as a stream of XML chunks.
+
+    The parameters are written anew each time the stream is iterated, a
+    parameter or item of a list parameter at a time, so only one of them is
+    held in memory at once. They are checked by writing them out once first,
+    so that iterating the stream cannot fail.
+
+    Args:
+      args: tuple The arguments of the call, in order.
+      inputs: tuple The GenericApiService.ParamInfo of each input parameter of
+              the method, in order.
+
+    Returns:
+      ParameterStream The stream of the parameters' XML.
+
+    Raises:
+      TypeError: if a dictionary has a key which is not a field of its type.
+      ValueError: if an argument cannot be written directly, in which case it
+                  must be packed for SOAPpy instead.
+    """
+    for chunk in self.GenerateParameters(args, inputs):
+      pass
+    return ParameterStream(self, args, inputs)
+
+  def GenerateParameters(self, args, inputs):
+    """Yields the XML of the parameters of a call.
+
+    Each chunk holds a parameter, or an item of a list parameter.
+
+    Args:
+      args: tuple The arguments of the call, in order.
+      inputs: tuple The GenericApiService.ParamInfo of each input parameter of
+              the method, in order.
+
+    Yields:
+      str The next chunk of XML.
+
+    Raises:
+      TypeError: if a dictionary has a key which is not a field of its type.
+      ValueError: if an argument cannot be written directly, in which case it
+                  must be packed for SOAPpy instead.
+    """
+    for i in range(len(inputs)):
+      param = inputs[i]
+      if args[i] is None:
+        raise ValueError('Parameter \'%s\' is not set.' % param.element_name)
+      if isinstance(args[i], (list, tuple)):
+        for chunk in self._GenerateList(self._GetName(param.element_name),
+                                        args[i], param.ns, param.type):
+          yield chunk
+      else:
+        chunks = []
+        self._WriteValue(chunks.append, self._GetName(param.element_name),
+                         args[i], param.ns, param.type)
+        yield ''.join(chunks)
+
+  def _GetPrefix(self, ns):
+    """Returns the prefix of a namespace, asking the prefix function once.
+
+    Args:
+      ns: str The namespace.
+
+    Returns:
+      str The prefix of the namespace, encoded as UTF-8.
+    """
+    prefix = self._prefixes.get(ns)
+    if prefix is None:
+      prefix = _EncodeName(self._prefix_function(ns))
+      self._prefixes[ns] = prefix
+    return prefix
+
+  def _GetName(self, name):
+    """Returns a name taken from the WSDL, encoded as UTF-8 once.
+
+    Args:
+      name: str The name of an element or type, unicode as parsed by SOAPpy.
+
+    Returns:
+      str The name, encoded as UTF-8.
+    """
+    encoded = self._names.get(name)
+    if encoded is None:
+      encoded = _EncodeName(name)
+      self._names[name] = encoded
+    return encoded
+
+  def _WriteValue(self, write, tag, obj, xmlns, type_name):
+    """Writes an element holding an object, as PackForSoappy would pack it.
+
+    Args:
+      write: callable Takes a chunk of XML.
+      tag: str The name of the element.
+      obj: mixed The object to write.
+      xmlns: str The namespace that the object's type belongs to.
+      type_name: str The name of the SOAP type the object represents.
+
+    Raises:
+      TypeError: if a dictionary has a key which is not a field of its type.
+      ValueError: if the object cannot be written directly.
+    """
+    if isinstance(obj, dict):
+      self._WriteDict(write, tag, obj, xmlns, type_name)
+    elif isinstance(obj, (list, tuple)):
+      self._WriteList(write, tag, obj, xmlns, type_name)
+    elif isinstance(obj, str):
+      text = Utils.HtmlEscape(obj)
+      # Fails on text which is not UTF-8, as packing does.
+      text.decode('utf-8')
+      write('<%s>%s</%s>\n' % (tag, text, tag))
+    elif isinstance(obj, unicode):
+      write('<%s>%s</%s>\n' % (tag, Utils.HtmlEscape(obj).encode('utf-8'),
+                                tag))
+    else:
+      # SOAPpy objects are sent as they are, and packing refuses other values.
+      raise ValueError('Objects of type \'%s\' are left to SOAPpy.'
+                       % type(obj))
+
+  def _WriteDict(self, write, tag, obj, xmlns, type_name):
+    """Writes an element holding a dictionary, with its fields in order.
+
+    Args:
+      write: callable Takes a chunk of XML.
+      tag: str The name of the element.
+      obj: dict The dictionary to write.
+      xmlns: str The namespace that the dictionary's type belongs to.
+      type_name: str The name of the SOAP type the dictionary represents.
+
+    Raises:
+      TypeError: if the dictionary has a key which is not a field of its type.
+      ValueError: if the fields of the type are not fully known.
+    """
+    obj_contained_type, type_key = SoappyUtils.GetExplicitType(
+        obj, type_name, xmlns, self._soappy_service)
+    if obj_contained_type:
+      type_name = obj_contained_type
+
+    info = self._type_index.GetTypeInfo(xmlns, type_name)
+    if info is None or info.key_order_attrs is None:
+      raise ValueError('The fields of type \'%s\' are not indexed.'
+                       % type_name)
+    for key in obj:
+      if key == type_key or obj[key] is None:
+        continue
+      if key not in info.field_types:
+        raise TypeError('There is no field with the name %s in complex type '
+                        '%s.' % (key, type_name))
+      if key not in info.field_namespaces:
+        raise ValueError('The namespace of field \'%s\' is not indexed.'
+                         % key)
+
+    write('<%s %s:type="%s%s">\n' % (tag, _XSI_PREFIX, self._GetPrefix(xmlns),
+                                     self._GetName(type_name)))
+    written = set()
+    for attributes in info.key_order_attrs:
+      field = str(attributes['name'])
+      if field in written:
+        continue
+      written.add(field)
+      value = obj.get(field)
+      if value is None or field == type_key:
+        continue
+      field_type = info.field_types[field]
+      self._WriteValue(
+          write, self._GetPrefix(info.field_namespaces[field]) + field, value,
+          field_type.getTargetNamespace(), field_type.getName())
+    write('</%s>\n' % tag)
+
+  def _WriteList(self, write, tag, obj, xmlns, type_name):
+    """Writes a list, as repeated elements or wrapped in an element.
+
+    Args:
+      write: callable Takes a chunk of XML.
+      tag: str The name of the element.
+      obj: list The list to write.
+      xmlns: str The namespace that the list's type belongs to.
+      type_name: str The name of the SOAP type the list represents.
+
+    Raises:
+      TypeError: if a dictionary has a key which is not a field of its type.
+      ValueError: if the list cannot be written directly.
+    """
+    for chunk in self._GenerateList(tag, obj, xmlns, type_name):
+      write(chunk)
+
+  def _GenerateList(self, tag, obj, xmlns, type_name):
+    """Yields the XML of a list, an item at a time.
+
+    Args:
+      tag: str The name of the element.
+      obj: list The list to write.
+      xmlns: str The namespace that the list's type belongs to.
+      type_name: str The name of the SOAP type the list represents.
+
+    Yields:
+      str The XML of the next item, or of the element wrapping the list.
+
+    Raises:
+      TypeError: if a dictionary has a key which is not a field of its type.
+      ValueError: if the list cannot be written directly.
+    """
+    item_type = SoappyUtils.GetArrayItemTypeName(type_name, xmlns,
+                                                 self._soappy_service)
+    if self._wrap_lists:
+      item_tag = 'item'
+      yield '<%s>\n' % tag
+    else:
+      item_tag = tag
+      if not obj:
+        raise ValueError('Empty lists are left to SOAPpy.')
+    for item in obj:
+      if not self._wrap_lists and isinstance(item, (list, tuple)):
+        raise ValueError('Nested lists are left to SOAPpy.')
+      chunks = []
+      self._WriteValue(chunks.append, item_tag, item, xmlns, item_type)
+      yield ''.join(chunks)
+    if self._wrap_lists:
+      yield '</%s>\n' % tag
+
+
+class ParameterStream(object):
+
+  """The XML of the parameters of a call, written anew on each iteration."""
+
+  def __init__(self, writer, args, inputs):
+    """Inits ParameterStream.
+
+    Args:
+      writer: EnvelopeWriter The writer of the parameters.
+      args: tuple The arguments of the call, in order.
+      inputs: tuple The GenericApiService.ParamInfo of each input parameter of
+              the method, in order.
+    """
+    self._writer = writer
+    self._args = args
+    self._inputs = inputs
+
+  def __iter__(self):
+    """Returns a new iterator over the chunks of the parameters' XML."""
+    return self._writer.GenerateParameters(self._args, self._inputs)
+
+
+def _EncodeName(name):
+  """Encodes a name as UTF-8, unless it already is a str.
+
+  Args:
+    name: str The name, either a str or unicode.
+
+  Returns:
+    str The name, encoded as UTF-8.
+  """
+  if isinstance(name, unicode):
+    return name.encode('utf-8')
+  return name
+
+
+def SplitEnvelope(envelope):
+  """Splits an envelope built without arguments inside its method element.
+
+  Args:
+    envelope: str The SOAP XML request written by SOAPpy for a call without
+              arguments.
+
+  Returns:
+    tuple The XML up to and including the method's start tag, and the XML from
+    the method's end tag on. Written parameters go in between.
+
+  Raises:
+    ValueError: if the envelope has no method element to split.
+  """
+  body_close = envelope.rfind('</', 0, envelope.rfind(':Body>'))
+  method_close = envelope.rfind('</', 0, body_close)
+  method_open = envelope.rfind('>', 0, method_close)
+  if body_close < 0 or method_close < 0 or method_open < 0:
+    raise ValueError('The envelope has no method element.')
+  start_tag = envelope[envelope.rfind('<', 0, method_open):method_open]
+  if _XSI_DECLARATION in start_tag:
+    head = envelope[:method_open]
+  elif ' xmlns:%s=' % _XSI_PREFIX in start_tag:
+    raise ValueError('The method element binds the prefix \'%s\'.'
+                     % _XSI_PREFIX)
+  else:
+    head = envelope[:method_open] + _XSI_DECLARATION
+  return head + '>\n', envelope[method_close:]
+
+
+def SpliceBody(envelope, chunks):
+  """Splices written parameters into an envelope built without arguments.
+
+  Args:
+    envelope: str The SOAP XML request written by SOAPpy for a call without
+              arguments.
+    chunks: list The chunks of XML written by EnvelopeWriter.WriteParameters.
+
+  Returns:
+    str The SOAP XML request with the parameters inside its method element.
+
+  Raises:
+    ValueError: if the envelope has no method element to splice into.
+  """
+  head, tail = SplitEnvelope(envelope)
+  return ''.join([head] + list(chunks) + [tail])
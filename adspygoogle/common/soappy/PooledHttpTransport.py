@@ -0,0 +1,292 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""SOAPpy HTTP transport which sends requests over pooled connections."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import base64
+import gzip
+import StringIO
+import threading
+import zlib
+
+from adspygoogle import SOAPpy
+from adspygoogle.common.soappy import EnvelopeWriter
+
+
+# Size of the pieces a streamed request body is sent in, before chunk framing.
+_STREAM_CHUNK_SIZE = 65536
+# Placeholder for the parameters of a streamed request in the debug dumps.
+_STREAMED_PARAMETERS = '<!-- Parameters streamed, not captured. -->\n'
+
+
+class PooledHttpTransport(SOAPpy.Client.HTTPTransport):
+
+  """Replacement for SOAPpy's HTTPTransport using a ConnectionPool.
+
+  SOAPpy's transport opens a new httplib.HTTPS connection for every request.
+  This transport behaves the same way, including gzip support, but keeps
+  connections alive between requests.
+
+  A transport is shared by every thread calling its service, so per-call state
+  is kept thread-local. BeginCall sets, for the calling thread, the buffer to
+  capture SOAPpy-format debug dumps into (instead of SOAPpy's sys.stdout), the
+  extra HTTP headers to send and whether to compress the request and response.
+  It may also set the parameters of the request, written by an
+  EnvelopeWriter.EnvelopeWriter, to splice into the envelope SOAPpy builds for
+  a call without arguments. Parameters may also be streamed: the request is
+  then sent with chunked transfer encoding and gzipped as it is sent, so it is
+  never held in memory whole.
+  """
+
+  def __init__(self, connection_pool, additional_headers=None):
+    """Inits PooledHttpTransport.
+
+    Args:
+      connection_pool: ConnectionPool The pool to take connections from.
+      [optional]
+      additional_headers: dict HTTP headers to add to every request.
+    """
+    SOAPpy.Client.HTTPTransport.__init__(self, additional_headers)
+    self._connection_pool = connection_pool
+    self._local = threading.local()
+
+  def BeginCall(self, buf, http_headers=None, send_compressed=None,
+                accept_compressed=None, connect_timeout=None,
+                read_timeout=None, deadline=None, request_body=None,
+                stream_body=False):
+    """Sets the state of the calling thread's next requests.
+
+    Args:
+      buf: Buffer The buffer to capture the debug dumps into.
+      [optional]
+      http_headers: dict HTTP headers to add to the requests.
+      send_compressed: bool Whether to gzip the requests. Defaults to the value
+                       in the SOAPpy.SOAPConfig passed to call().
+      accept_compressed: bool Whether to accept gzipped responses. Defaults to
+                         the value in the SOAPpy.SOAPConfig passed to call().
+      connect_timeout: float Seconds to wait for a new connection.
+      read_timeout: float Seconds to wait on each send or receive.
+      deadline: float Time by which the response must have arrived.
+      request_body: iterable The chunks of XML of the request's parameters,
+                    to splice into the method element of the request.
+      stream_body: bool Whether to stream the request instead of sending it
+                   whole. Only used with a request_body, which is then
+                   iterated again each time the request is sent.
+    """
+    self._local.buffer = buf
+    self._local.http_headers = http_headers or {}
+    self._local.send_compressed = send_compressed
+    self._local.accept_compressed = accept_compressed
+    self._local.timeouts = (connect_timeout, read_timeout, deadline)
+    self._local.request_body = request_body
+    self._local.stream_body = stream_body
+
+  def EndCall(self):
+    """Clears the state set by BeginCall for the calling thread."""
+    self._local.buffer = None
+    self._local.http_headers = {}
+    self._local.send_compressed = None
+    self._local.accept_compressed = None
+    self._local.timeouts = (None, None, None)
+    self._local.request_body = None
+    self._local.stream_body = False
+
+  def call(self, addr, data, namespace, soapaction=None, encoding=None,
+           http_proxy=None, config=None):
+    """Sends a SOAP request and returns the response.
+
+    Args:
+      addr: mixed The SOAPpy.Client.SOAPAddress or URL to send the request to.
+      data: str The SOAP XML request.
+      namespace: str The namespace of the called method.
+      [optional]
+      soapaction: str The SOAPAction HTTP header value.
+      encoding: str The character encoding of the request.
+      http_proxy: str HTTP proxy to send the request through.
+      config: SOAPpy.SOAPConfig The configuration of the calling proxy.
+
+    Returns:
+      tuple The SOAP XML response and the namespace it uses.
+
+    Raises:
+      SOAPpy.Errors.HTTPError: if the server did not answer with a SOAP message.
+      TimeoutError: if the server did not answer in time.
+    """
+    if config is None:
+      config = SOAPpy.SOAPConfig()
+    request_body = getattr(self._local, 'request_body', None)
+    stream_body = (request_body is not None and
+                   getattr(self._local, 'stream_body', False))
+    if request_body is not None and not stream_body:
+      data = EnvelopeWriter.SpliceBody(data, request_body)
+    if not isinstance(addr, SOAPpy.Client.SOAPAddress):
+      addr = SOAPpy.Client.SOAPAddress(addr, config)
+
+    http_headers = dict(self.additional_headers)
+    http_headers.update(getattr(self._local, 'http_headers', {}))
+    send_compressed = getattr(self._local, 'send_compressed', None)
+    if send_compressed is None:
+      send_compressed = config.send_compressed
+    accept_compressed = getattr(self._local, 'accept_compressed', None)
+    if accept_compressed is None:
+      accept_compressed = config.accept_compressed
+
+    if isinstance(data, unicode):
+      data = data.encode('utf-8')
+    if stream_body:
+      if send_compressed:
+        http_headers['Content-Encoding'] = 'gzip'
+      head, tail = EnvelopeWriter.SplitEnvelope(data)
+      transport_data = _RequestStream(head, request_body, tail,
+                                      send_compressed)
+      data = head + _STREAMED_PARAMETERS + tail
+    elif send_compressed:
+      http_headers['Content-Encoding'] = 'gzip'
+      buf = StringIO.StringIO()
+      gzip_file = gzip.GzipFile(mode='wb', fileobj=buf)
+      gzip_file.write(data)
+      gzip_file.close()
+      transport_data = buf.getvalue()
+    else:
+      transport_data = data
+
+    if accept_compressed:
+      http_headers['Accept-Encoding'] = 'gzip'
+
+    if http_proxy:
+      real_path = addr.proto + '://' + addr.host + addr.path
+    else:
+      real_path = addr.path
+
+    content_type = 'text/xml'
+    if encoding is not None:
+      content_type += '; charset="%s"' % encoding
+    headers = [('Host', addr.host),
+               ('User-agent', SOAPpy.Client.SOAPUserAgent()),
+               ('Content-type', content_type)]
+    if stream_body:
+      headers.append(('Transfer-Encoding', 'chunked'))
+    else:
+      headers.append(('Content-length', str(len(transport_data))))
+    if addr.user is not None:
+      val = base64.encodestring(addr.user)
+      headers.append(('Authorization', 'Basic ' + val.replace('\012', '')))
+    headers.extend(http_headers.items())
+    if soapaction:
+      headers.append(('SOAPAction', '"%s"' % soapaction))
+    else:
+      headers.append(('SOAPAction', ''))
+
+    if config.dumpHeadersOut:
+      self._Dump('Outgoing HTTP headers', '\n'.join(
+          ['POST %s HTTP/1.1' % real_path] +
+          ['%s:%s' % header for header in headers]))
+    if config.dumpSOAPOut:
+      self._Dump('Outgoing SOAP', data)
+
+    connect_timeout, read_timeout, deadline = getattr(
+        self._local, 'timeouts', (None, None, None))
+    code, msg, response_headers, data = self._connection_pool.Request(
+        addr.proto, addr.host, 'POST', real_path, headers, transport_data,
+        http_proxy, connect_timeout, read_timeout, deadline, stream_body)
+
+    if response_headers.get('content-encoding', None) == 'gzip':
+      data = gzip.GzipFile(fileobj=StringIO.StringIO(data), mode='rb').read()
+
+    if config.dumpHeadersIn:
+      self._Dump('Incoming HTTP headers', '\n'.join(
+          ['HTTP/1.? %d %s' % (code, msg)] +
+          [line.strip() for line in response_headers.headers]))
+
+    content_type = response_headers.get('content-type', 'text/xml')
+    if code == 500 and not (content_type.startswith('text/xml') and data):
+      raise SOAPpy.Errors.HTTPError(code, msg)
+
+    if config.dumpSOAPIn:
+      self._Dump('Incoming SOAP', data)
+
+    if code not in (200, 500):
+      raise SOAPpy.Errors.HTTPError(code, msg)
+
+    if namespace is None:
+      new_ns = None
+    else:
+      new_ns = self.getNS(namespace, data)
+    return data, new_ns
+
+  def _Dump(self, title, text):
+    """Writes a debug dump, in SOAPpy's format, to the capturing buffer.
+
+    Args:
+      title: str The title of the dump, e.g. 'Outgoing SOAP'.
+      text: str The content of the dump.
+    """
+    buf = getattr(self._local, 'buffer', None)
+    if buf is None:
+      return
+    banner = '*** %s ' % title
+    if text and not text.endswith('\n'):
+      text += '\n'
+    buf.write('%s%s\n%s%s\n' % (banner, '*' * (72 - len(banner)), text,
+                                 '*' * 72))
+
+
+class _RequestStream(object):
+
+  """The body of a streamed request, optionally gzipped as it is sent."""
+
+  def __init__(self, head, parameters, tail, compress):
+    """Inits _RequestStream.
+
+    Args:
+      head: str The envelope up to the method's parameters.
+      parameters: iterable The chunks of XML of the parameters, iterated anew
+                  each time the body is.
+      tail: str The envelope from the end of the method's parameters on.
+      compress: bool Whether to gzip the body.
+    """
+    self._head = head
+    self._parameters = parameters
+    self._tail = tail
+    self._compress = compress
+
+  def __iter__(self):
+    """Yields the body in pieces of about _STREAM_CHUNK_SIZE bytes."""
+    compressor = None
+    if self._compress:
+      # A window size offset by 16 makes zlib write a gzip header and trailer.
+      compressor = zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    pending = []
+    size = 0
+    for chunks in ([self._head], self._parameters, [self._tail]):
+      for chunk in chunks:
+        if isinstance(chunk, unicode):
+          chunk = chunk.encode('utf-8')
+        if compressor is not None:
+          chunk = compressor.compress(chunk)
+        if not chunk:
+          continue
+        pending.append(chunk)
+        size += len(chunk)
+        if size >= _STREAM_CHUNK_SIZE:
+          yield ''.join(pending)
+          pending = []
+          size = 0
+    if compressor is not None:
+      pending.append(compressor.flush())
+    yield ''.join(pending)
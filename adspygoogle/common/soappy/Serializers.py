@@ -0,0 +1,218 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Generated serializers packing the complex types of a WSDL for SOAPpy.
+
+MessageHandler.PackForSoappy packs a dictionary by looking up the namespace and
+type of each of its keys in the schema, then orders the packed fields by
+comparing the type's fields with the attributes of the packed object. A
+serializer does the same for one type with all of these facts written into its
+code: the fields in order, their namespaces and types, and the keys which may
+name an explicit type.
+
+The serializers of a WSDL are generated as the source of a Python module, which
+is compiled once per parsed WSDL by GetSerializerSet. The source may also be
+written out with GenerateSource.
+"""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import threading
+import weakref
+
+from adspygoogle.common.soappy import SoappyUtils
+
+
+# Serializer sets already compiled, keyed by the parsed WSDL they pack for.
+_SERIALIZER_SETS = weakref.WeakKeyDictionary()
+_SERIALIZER_SETS_LOCK = threading.Lock()
+# Header of the generated module. The serializers call back into
+# MessageHandler.PackForSoappy to pack the value of each field.
+_MODULE_HEADER = '''"""Serializers generated for the complex types of a WSDL."""
+
+from adspygoogle import SOAPpy
+from adspygoogle.common.MessageHandler import PackForSoappy
+from adspygoogle.common.Utils import HtmlEscape
+
+_XSI_TYPE = (SOAPpy.NS.XSI3, 'type')
+_STRUCT_TYPE = SOAPpy.Types.structType
+_UNTYPED_TYPE = SOAPpy.Types.untypedType
+'''
+
+
+class SerializerSet(object):
+
+  """The compiled serializers of the complex types of a WSDL."""
+
+  def __init__(self, soappy_service):
+    """Inits SerializerSet, generating and compiling the serializers.
+
+    Args:
+      soappy_service: SOAPpy.WSDL.Proxy The SOAPpy service object encapsulating
+                      the WSDL definitions.
+    """
+    module = {}
+    exec compile(GenerateSource(soappy_service), '<serializers>',
+                 'exec') in module
+    self._serializers = module['SERIALIZERS']
+
+  def Get(self, ns, type_name):
+    """Returns the serializer of a type.
+
+    A serializer takes the dictionary to pack, the key of the dictionary naming
+    its explicit type, if any, and the soappy_service, wrap_lists,
+    prefix_function and serializers arguments of PackForSoappy. It returns the
+    dictionary packed as a SOAPpy.Types.structType.
+
+    Args:
+      ns: string The namespace the type belongs to.
+      type_name: string The name of the type.
+
+    Returns:
+      function The serializer of the type, or None if it has none.
+    """
+    return self._serializers.get((ns, type_name))
+
+
+def GetSerializerSet(soappy_service):
+  """Returns the serializers of a service's WSDL, compiling them once.
+
+  Services sharing a parsed WSDL share its serializers.
+
+  Args:
+    soappy_service: SOAPpy.WSDL.Proxy The SOAPpy service object encapsulating
+                    the WSDL definitions.
+
+  Returns:
+    SerializerSet The serializers of the WSDL's types, or None if the WSDL
+    cannot be indexed.
+  """
+  if SoappyUtils.GetTypeIndex(soappy_service) is None:
+    return None
+  wsdl = soappy_service.wsdl
+  _SERIALIZER_SETS_LOCK.acquire()
+  try:
+    serializer_set = _SERIALIZER_SETS.get(wsdl)
+    if serializer_set is None:
+      serializer_set = SerializerSet(soappy_service)
+      _SERIALIZER_SETS[wsdl] = serializer_set
+    return serializer_set
+  finally:
+    _SERIALIZER_SETS_LOCK.release()
+
+
+def GenerateSource(soappy_service):
+  """Generates the source of a module serializing the types of a WSDL.
+
+  The module defines a SERIALIZERS dictionary, mapping the (namespace, name) of
+  each complex type to its serializer.
+
+  Args:
+    soappy_service: SOAPpy.WSDL.Proxy The SOAPpy service object encapsulating
+                    the WSDL definitions.
+
+  Returns:
+    str The source of the module.
+  """
+  lines = [_MODULE_HEADER]
+  entries = []
+  for info in SoappyUtils.GetTypeIndex(soappy_service).GetTypeInfos():
+    function_name = '_Pack%d' % len(entries)
+    function_lines = _GenerateSerializer(function_name, info)
+    if function_lines is not None:
+      lines.extend(function_lines)
+      entries.append('    (%r, %r): %s,' % (str(info.ns), str(info.name),
+                                             function_name))
+  lines.append('')
+  lines.append('SERIALIZERS = {')
+  lines.extend(entries)
+  lines.append('}')
+  return '\n'.join(lines) + '\n'
+
+
+def _GenerateSerializer(function_name, info):
+  """Generates the source of the serializer of a complex type.
+
+  Args:
+    function_name: str The name of the function to generate.
+    info: SoappyUtils.TypeInfo The facts about the type.
+
+  Returns:
+    list The lines of the function's source, or None if the type's fields
+    are not fully known, in which case its objects are packed generically.
+  """
+  if info.key_order_attrs is None:
+    return None
+  fields = [str(attributes['name']) for attributes in info.key_order_attrs]
+  if len(set(fields)) != len(fields):
+    return None
+  for field in fields:
+    if field not in info.field_namespaces:
+      return None
+
+  namespaces = [str(info.ns)]
+  for field in fields:
+    field_ns = str(info.field_namespaces[field])
+    if field_ns not in namespaces:
+      namespaces.append(field_ns)
+
+  lines = [
+      '',
+      '',
+      'def %s(obj, type_key, soappy_service, wrap_lists, prefix_function,'
+      % function_name,
+      '    serializers):',
+      '  # %s of %s' % (str(info.name), str(info.ns)),
+      '  fields = %r' % (frozenset(fields),),
+      '  for key in obj:',
+      '    if (key not in fields and key != type_key and',
+      '        obj[key] is not None):',
+      '      raise TypeError(\'There is no field with the name %%s in complex '
+      'type %%s.\' %% (key, %r))' % str(info.name),
+  ]
+  for i in range(len(namespaces)):
+    lines.append('  prefix%d = prefix_function(%r)' % (i, namespaces[i]))
+  lines.append('  data = {}')
+  lines.append('  keyord = []')
+  for field in fields:
+    field_type = info.field_types[field]
+    field_prefix = 'prefix%d' % namespaces.index(
+        str(info.field_namespaces[field]))
+    condition = 'value is not None'
+    if field == 'type' or '.Type' in field or '_Type' in field:
+      # The field may hold the explicit type, which is not sent as a field.
+      condition += ' and type_key != %r' % field
+    lines.extend([
+        '  value = obj.get(%r)' % field,
+        '  if %s:' % condition,
+        '    key = %s + %r' % (field_prefix, field),
+        '    if isinstance(value, str):',
+        '      data[key] = _UNTYPED_TYPE(HtmlEscape(value).decode(\'utf-8\'))',
+        '    else:',
+        '      data[key] = PackForSoappy(',
+        '          value, %r, %r, soappy_service, wrap_lists,' % (
+            str(field_type.getTargetNamespace()), str(field_type.getName())),
+        '          prefix_function, serializers)',
+        '    keyord.append(key)',
+    ])
+  lines.extend([
+      '  packed_object = _STRUCT_TYPE(',
+      '      data, typed=0, attrs={_XSI_TYPE: prefix0 + %r})' % str(info.name),
+      '  packed_object._typename = %r' % str(info.name),
+      '  packed_object._keyord = keyord',
+      '  return packed_object',
+  ])
+  return lines
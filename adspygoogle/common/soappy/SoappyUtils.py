@@ -18,6 +18,228 @@
 
 __author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
 
+import threading
+import weakref
+
+
+# Type indexes already built, keyed by the parsed WSDL they describe.
+_TYPE_INDEXES = weakref.WeakKeyDictionary()
+_TYPE_INDEXES_LOCK = threading.Lock()
+
+
+class TypeInfo(object):
+
+  """Precomputed facts about a WSDL-defined type.
+
+  Attributes which could not be computed for the type, for instance the fields
+  of a simple type, are None.
+  """
+
+  def __init__(self, ns, name):
+    """Inits TypeInfo.
+
+    Args:
+      ns: string The namespace the type belongs to.
+      name: string The name of the type.
+    """
+    self.ns = ns
+    self.name = name
+    # Attributes of the fields of the type, inherited ones first, in order.
+    self.key_order_attrs = None
+    # Type and defining namespace of each field, by field name.
+    self.field_types = None
+    self.field_namespaces = None
+    self.is_array = None
+    self.array_item_type = None
+    self.has_native_type = None
+    self.is_abstract = None
+    # Names of the type and of every type it derives from, within ns.
+    self.ancestors = None
+    # Names of the types which may be sent where this type is expected, that is
+    # this type and the types deriving from it, leaving out abstract ones.
+    self.concrete_subtypes = None
+
+
+class TypeIndex(object):
+
+  """A flat index of the types of a WSDL, keyed by (namespace, type name).
+
+  Looking up a type's fields, array item type and the like otherwise walks the
+  type's derivation chain through SOAPpy's schema objects each time. The index
+  walks every type once, when built, so that packing and validating objects
+  only does dictionary lookups. This includes subtype checks, which look the
+  supertype up in the precomputed ancestors of the subtype.
+  """
+
+  def __init__(self, soappy_service):
+    """Inits TypeIndex, indexing every type of a WSDL.
+
+    Args:
+      soappy_service: SOAPpy.WSDL.Proxy The SOAPpy service object encapsulating
+                      the WSDL definitions.
+    """
+    self._types = {}
+    for ns in soappy_service.wsdl.types.keys():
+      for name in soappy_service.wsdl.types[ns].types.keys():
+        self._types[(ns, name)] = _BuildTypeInfo(soappy_service, ns, name)
+
+    concrete_subtypes = {}
+    for (ns, name), info in self._types.iteritems():
+      if info.ancestors is None or info.is_abstract is not False:
+        continue
+      for ancestor in info.ancestors:
+        concrete_subtypes.setdefault((ns, ancestor), set()).add(name)
+    for key, info in self._types.iteritems():
+      info.concrete_subtypes = frozenset(concrete_subtypes.get(key, ()))
+
+  def GetTypeInfo(self, ns, name):
+    """Returns what is known about a type.
+
+    Args:
+      ns: string The namespace the type belongs to.
+      name: string The name of the type.
+
+    Returns:
+      TypeInfo The facts about the type, or None if the WSDL does not define
+      it.
+    """
+    return self._types.get((ns, name))
+
+  def GetTypeInfos(self):
+    """Returns what is known about every type of the WSDL.
+
+    Returns:
+      list The TypeInfo of each type, ordered by namespace and name.
+    """
+    return [self._types[key] for key in sorted(self._types)]
+
+  def GetAncestors(self, ns, name):
+    """Returns a type and the types it derives from.
+
+    Args:
+      ns: string The namespace the type belongs to.
+      name: string The name of the type.
+
+    Returns:
+      frozenset The names of the type and of its ancestors, or None if they are
+      not indexed.
+    """
+    info = self._types.get((ns, name))
+    if info is None:
+      return None
+    return info.ancestors
+
+  def GetConcreteSubTypes(self, ns, name):
+    """Returns the non-abstract types which may be sent in place of a type.
+
+    Args:
+      ns: string The namespace the type belongs to.
+      name: string The name of the type.
+
+    Returns:
+      frozenset The names of the type, unless it is abstract, and of the
+      non-abstract types deriving from it, or None if the type is not indexed.
+    """
+    info = self._types.get((ns, name))
+    if info is None:
+      return None
+    return info.concrete_subtypes
+
+
+def GetTypeIndex(soappy_service):
+  """Returns the type index of a service's WSDL, building it once.
+
+  Services sharing a parsed WSDL share its index.
+
+  Args:
+    soappy_service: SOAPpy.WSDL.Proxy The SOAPpy service object encapsulating
+                    the WSDL definitions.
+
+  Returns:
+    TypeIndex The index of the WSDL's types, or None if the WSDL cannot be
+    indexed.
+  """
+  wsdl = getattr(soappy_service, 'wsdl', None)
+  if wsdl is None:
+    return None
+  _TYPE_INDEXES_LOCK.acquire()
+  try:
+    try:
+      type_index = _TYPE_INDEXES.get(wsdl)
+      if type_index is None:
+        type_index = TypeIndex(soappy_service)
+        _TYPE_INDEXES[wsdl] = type_index
+      return type_index
+    except TypeError:
+      # The WSDL object cannot be weakly referenced, so it cannot be cached.
+      return None
+  finally:
+    _TYPE_INDEXES_LOCK.release()
+
+
+def _GetTypeInfo(type_name, ns, soappy_service):
+  """Returns the indexed facts about a type, if any.
+
+  Args:
+    type_name: string The name of the WSDL-defined type.
+    ns: string The namespace this WSDL-defined type belongs to.
+    soappy_service: SOAPpy.WSDL.Proxy The SOAPpy service object encapsulating
+                    the WSDL definitions.
+
+  Returns:
+    TypeInfo The facts about the type, or None if it is not indexed.
+  """
+  type_index = GetTypeIndex(soappy_service)
+  if type_index is None:
+    return None
+  return type_index.GetTypeInfo(ns, type_name)
+
+
+def _BuildTypeInfo(soappy_service, ns, name):
+  """Walks a type's definition to gather the facts the index keeps about it.
+
+  Args:
+    soappy_service: SOAPpy.WSDL.Proxy The SOAPpy service object encapsulating
+                    the WSDL definitions.
+    ns: string The namespace the type belongs to.
+    name: string The name of the type.
+
+  Returns:
+    TypeInfo The facts about the type.
+  """
+  info = TypeInfo(ns, name)
+  info.array_item_type = _WalkArrayItemTypeName(name, ns, soappy_service)
+  try:
+    info.is_array = _WalkIsAnArrayType(name, ns, soappy_service)
+  except Exception:
+    pass
+  try:
+    info.ancestors = frozenset(_WalkAncestors(soappy_service, ns, name))
+    type_def = GetTypeFromSoappyService(name, ns, soappy_service)
+    abstract = type_def.attributes.get('abstract')
+    info.is_abstract = str(abstract).lower() in ('true', '1')
+  except Exception:
+    pass
+  try:
+    key_order_attrs = tuple(_WalkKeyOrderAttrs(soappy_service, ns, name))
+  except Exception:
+    # Types without fields, such as simple types, are left to the walkers.
+    return info
+  info.key_order_attrs = key_order_attrs
+  info.field_types = {}
+  info.field_namespaces = {}
+  for attributes in key_order_attrs:
+    field = attributes['name']
+    info.field_types.setdefault(field, attributes['type'])
+    if field not in info.field_namespaces:
+      try:
+        info.field_namespaces[field] = _WalkFieldNamespace(
+            field, name, ns, soappy_service)
+      except Exception:
+        pass
+  info.has_native_type = 'type' in info.field_types
+  return info
+
 
 def GetArrayItemTypeName(type_name, ns, soappy_service):
   """Returns the name of the SOAP type which the items in an array represent.
@@ -29,6 +251,24 @@ def GetArrayItemTypeName(type_name, ns, soappy_service):
   where the type_name given is not a SOAP encoded array, the type_name given is
   the one that will be returned.
 
+  Args:
+    type_name: string The name of the WSDL-defined type of the array.
+    ns: string The namespace this WSDL-defined type belongs to.
+    soappy_service: SOAPpy.WSDL.proxy The SOAPpy service object which contains
+                    the WSDL definitions.
+
+  Returns:
+    string The type name of the array's contents.
+  """
+  info = _GetTypeInfo(type_name, ns, soappy_service)
+  if info is not None:
+    return info.array_item_type
+  return _WalkArrayItemTypeName(type_name, ns, soappy_service)
+
+
+def _WalkArrayItemTypeName(type_name, ns, soappy_service):
+  """Finds the type of an array's items in the WSDL, see GetArrayItemTypeName.
+
   Args:
     type_name: string The name of the WSDL-defined type of the array.
     ns: string The namespace this WSDL-defined type belongs to.
@@ -71,18 +311,56 @@ def IsASuperType(soappy_service, sub_type, ns, super_type):
   """
   if sub_type == super_type: return True
 
+  info = _GetTypeInfo(sub_type, ns, soappy_service)
+  if info is not None and info.ancestors is not None:
+    return super_type in info.ancestors
+  return super_type in _WalkAncestors(soappy_service, ns, sub_type)
+
+
+def GetConcreteSubTypes(type_name, ns, soappy_service):
+  """Returns the non-abstract types which may be sent in place of a type.
+
+  Args:
+    type_name: string The name of the WSDL-defined type.
+    ns: string The namespace this WSDL-defined type belongs to.
+    soappy_service: SOAPpy.WSDL.proxy The SOAPpy service object which contains
+                    the WSDL definitions.
+
+  Returns:
+    frozenset The names of the given type, unless it is abstract, and of the
+    non-abstract types deriving from it.
+  """
+  type_index = GetTypeIndex(soappy_service)
+  if type_index is None:
+    # The WSDL cannot be cached, so index its types for this lookup only.
+    type_index = TypeIndex(soappy_service)
+  return type_index.GetConcreteSubTypes(ns, type_name) or frozenset()
+
+
+def _WalkAncestors(soappy_service, ns, type_name):
+  """Walks a type's derivation chain to list the types it derives from.
+
+  Any base type which is not defined in the WSDL ends the chain.
+
+  Args:
+    soappy_service: SOAPpy.WSDL.proxy The SOAPpy service object which contains
+                    the WSDL definitions.
+    ns: string The namespace the type and its ancestors belong to.
+    type_name: string The name of the WSDL-defined type.
+
+  Returns:
+    list The names of the given type and of its ancestors, nearest first.
+  """
+  ancestors = [type_name]
   try:
-    if IsASubType(sub_type, ns, soappy_service):
-      complex_type = GetTypeFromSoappyService(sub_type, ns, soappy_service)
-      return IsASuperType(
-          soappy_service,
-          complex_type.content.derivation.attributes['base'].getName(), ns,
-          super_type)
-    else:
-      return False
+    while IsASubType(type_name, ns, soappy_service):
+      complex_type = GetTypeFromSoappyService(type_name, ns, soappy_service)
+      type_name = complex_type.content.derivation.attributes['base'].getName()
+      ancestors.append(type_name)
   except KeyError:
-    # The given sub_type does not exist in the WSDL definitions.
-    return False
+    # The type does not exist in the WSDL definitions.
+    pass
+  return ancestors
 
 
 def IsASubType(type_name, ns, soappy_service):
@@ -104,6 +382,26 @@ def IsASubType(type_name, ns, soappy_service):
 def IsAnArrayType(type_name, ns, soappy_service):
   """Determines if a complex type represents a SOAP-encoded array.
 
+  Args:
+    type_name: string The name of the WSDL-defined type.
+    ns: string The namespace this WSDL-defined type belongs to.
+    soappy_service: SOAPpy.WSDL.proxy The SOAPpy service object which contains
+                    the WSDL definitions.
+
+  Returns:
+    boolean Whether the given type represents an array.
+  """
+  if type_name == 'Array':
+    return True
+  info = _GetTypeInfo(type_name, ns, soappy_service)
+  if info is not None and info.is_array is not None:
+    return info.is_array
+  return _WalkIsAnArrayType(type_name, ns, soappy_service)
+
+
+def _WalkIsAnArrayType(type_name, ns, soappy_service):
+  """Walks a type's derivation chain to tell if it is an array.
+
   Args:
     type_name: string The name of the WSDL-defined type.
     ns: string The namespace this WSDL-defined type belongs to.
@@ -119,7 +417,7 @@ def IsAnArrayType(type_name, ns, soappy_service):
     wsdl_type_def = GetTypeFromSoappyService(type_name, ns, soappy_service)
     if hasattr(wsdl_type_def.content, 'derivation'):
       # This is an extension of another type.
-      return IsAnArrayType(
+      return _WalkIsAnArrayType(
           wsdl_type_def.content.derivation.attributes['base'].getName(),
           wsdl_type_def.content.derivation.attributes[
               'base'].getTargetNamespace(), soappy_service)
@@ -149,6 +447,25 @@ def GetTypeFromSoappyService(type_name, ns, soappy_service):
 def GenKeyOrderAttrs(soappy_service, ns, type_name):
   """Generates the order and attributes of keys in a complex type.
 
+  Args:
+    soappy_service: SOAPpy.WSDL.Proxy The SOAPpy service object encapsulating
+                    the information stored in the WSDL.
+    ns: string The namespace the given WSDL-defined type belongs to.
+    type_name: string The name of the WSDL-defined type to search for.
+
+  Returns:
+    tuple Dictionaries containing the attributes of keys within a complex
+    type, in order. The dictionaries are shared and must not be changed.
+  """
+  info = _GetTypeInfo(type_name, ns, soappy_service)
+  if info is not None and info.key_order_attrs is not None:
+    return info.key_order_attrs
+  return tuple(_WalkKeyOrderAttrs(soappy_service, ns, type_name))
+
+
+def _WalkKeyOrderAttrs(soappy_service, ns, type_name):
+  """Walks a type's derivation chain to gather the attributes of its keys.
+
   Args:
     soappy_service: SOAPpy.WSDL.Proxy The SOAPpy service object encapsulating
                     the information stored in the WSDL.
@@ -163,7 +480,7 @@ def GenKeyOrderAttrs(soappy_service, ns, type_name):
 
   if IsASubType(type_name, ns, soappy_service):
     # This is an extension of another type.
-    key_order = GenKeyOrderAttrs(
+    key_order = _WalkKeyOrderAttrs(
         soappy_service,
         complex_type.content.derivation.attributes['base'].getTargetNamespace(),
         complex_type.content.derivation.attributes['base'].getName())
@@ -230,9 +547,14 @@ def GetComplexFieldTypeByFieldName(key, type_name, ns, soappy_service):
   Raises:
     TypeError: if the given key is not within the given complex type.
   """
-  for param in GenKeyOrderAttrs(soappy_service, ns, type_name):
-    if param['name'] == key:
-      return param['type']
+  info = _GetTypeInfo(type_name, ns, soappy_service)
+  if info is not None and info.field_types is not None:
+    if key in info.field_types:
+      return info.field_types[key]
+  else:
+    for param in GenKeyOrderAttrs(soappy_service, ns, type_name):
+      if param['name'] == key:
+        return param['type']
   raise TypeError('There is no field with the name %s in complex type %s.'
                   % (key, type_name))
 
@@ -240,6 +562,30 @@ def GetComplexFieldTypeByFieldName(key, type_name, ns, soappy_service):
 def GetComplexFieldNamespaceByFieldName(field, type_name, ns, soappy_service):
   """Returns the namespace of the type which defines a field in a hierarchy.
 
+  Args:
+    field: string The name of the field within the given complex type whose
+           namespace is being looked up.
+    type_name: string The name of the encapsulating complex type.
+    ns: string The namespace the encapsulating compelx type belongs to.
+    soappy_service: SOAPpy.WSDL.Proxy The SOAPpy service object containing the
+                    descriptions of these types.
+
+  Returns:
+    string The URL of the namespace this field was defined within.
+
+  Raises:
+    TypeError: if the given field is not within the given complex type.
+  """
+  info = _GetTypeInfo(type_name, ns, soappy_service)
+  if info is not None and info.field_namespaces is not None:
+    if field in info.field_namespaces:
+      return info.field_namespaces[field]
+  return _WalkFieldNamespace(field, type_name, ns, soappy_service)
+
+
+def _WalkFieldNamespace(field, type_name, ns, soappy_service):
+  """Walks a type's derivation chain to find the namespace defining a field.
+
   Args:
     field: string The name of the field within the given complex type whose
            namespace is being looked up.
@@ -261,7 +607,7 @@ def GetComplexFieldNamespaceByFieldName(field, type_name, ns, soappy_service):
       for element in type_obj.content.derivation.content.content:
         if element.attributes['name'] == field: return ns
     try:
-      return GetComplexFieldNamespaceByFieldName(
+      return _WalkFieldNamespace(
           field,
           type_obj.content.derivation.attributes['base'].getName(),
           type_obj.content.derivation.attributes['base'].getTargetNamespace(),
@@ -314,6 +660,9 @@ def _HasNativeType(type_name, ns, soappy_service):
   Returns:
     bool Whether or not the given type has a field named 'type'.
   """
+  info = _GetTypeInfo(type_name, ns, soappy_service)
+  if info is not None and info.has_native_type is not None:
+    return info.has_native_type
   params = GenKeyOrderAttrs(soappy_service, ns, type_name)
   for param in params:
     if param['name'] == 'type': return True
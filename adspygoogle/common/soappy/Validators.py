@@ -0,0 +1,239 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Generated validators checking the fields of the complex types of a WSDL.
+
+In strict mode, SanityCheck.SoappySanityCheck checks every key of a dictionary
+by scanning the fields of its type for the key. A validator checks the keys of
+one type with a dictionary from field name to a generated check of the field's
+value, so each key costs one lookup. String fields are checked inline, other
+fields are handed back to SoappySanityCheck. The error messages are those of
+SanityCheck.
+"""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import threading
+import weakref
+
+from adspygoogle.common import Utils
+from adspygoogle.common.soappy import SoappyUtils
+
+
+# Validator sets already compiled, keyed by the parsed WSDL they check against.
+_VALIDATOR_SETS = weakref.WeakKeyDictionary()
+_VALIDATOR_SETS_LOCK = threading.Lock()
+# Header of the generated module.
+_MODULE_HEADER = '''"""Validators generated for the complex types of a WSDL."""
+
+from adspygoogle.common.Errors import ValidationError
+from adspygoogle.common.SanityCheck import SoappySanityCheck
+'''
+
+
+class ValidatorSet(object):
+
+  """The compiled validators of the complex types of a WSDL."""
+
+  def __init__(self, soappy_service):
+    """Inits ValidatorSet, generating and compiling the validators.
+
+    Args:
+      soappy_service: SOAPpy.WSDL.Proxy The SOAPpy service object encapsulating
+                      the WSDL definitions.
+    """
+    module = {}
+    exec compile(GenerateSource(soappy_service), '<validators>',
+                 'exec') in module
+    self._validators = module['VALIDATORS']
+
+  def Get(self, ns, type_name):
+    """Returns the validator of a type.
+
+    A validator takes the dictionary to check, the key of the dictionary naming
+    its explicit type, if any, the SOAPpy service and this ValidatorSet. It
+    raises a ValidationError if a key of the dictionary is not a field of the
+    type, or its value does not match the field.
+
+    Args:
+      ns: string The namespace the type belongs to.
+      type_name: string The name of the type.
+
+    Returns:
+      function The validator of the type, or None if it has none.
+    """
+    return self._validators.get((ns, type_name))
+
+
+def GetValidatorSet(soappy_service):
+  """Returns the validators of a service's WSDL, compiling them once.
+
+  Services sharing a parsed WSDL share its validators.
+
+  Args:
+    soappy_service: SOAPpy.WSDL.Proxy The SOAPpy service object encapsulating
+                    the WSDL definitions.
+
+  Returns:
+    ValidatorSet The validators of the WSDL's types, or None if the WSDL cannot
+    be indexed.
+  """
+  if SoappyUtils.GetTypeIndex(soappy_service) is None:
+    return None
+  wsdl = soappy_service.wsdl
+  _VALIDATOR_SETS_LOCK.acquire()
+  try:
+    validator_set = _VALIDATOR_SETS.get(wsdl)
+    if validator_set is None:
+      validator_set = ValidatorSet(soappy_service)
+      _VALIDATOR_SETS[wsdl] = validator_set
+    return validator_set
+  finally:
+    _VALIDATOR_SETS_LOCK.release()
+
+
+def GenerateSource(soappy_service):
+  """Generates the source of a module validating the types of a WSDL.
+
+  The module defines a VALIDATORS dictionary, mapping the (namespace, name) of
+  each complex type to its validator.
+
+  Args:
+    soappy_service: SOAPpy.WSDL.Proxy The SOAPpy service object encapsulating
+                    the WSDL definitions.
+
+  Returns:
+    str The source of the module.
+  """
+  lines = [_MODULE_HEADER]
+  # Checks of field values, shared by all fields of the same type, keyed by
+  # (namespace, type name, whether the field is a list).
+  checks = {}
+  entries = []
+  for info in SoappyUtils.GetTypeIndex(soappy_service).GetTypeInfos():
+    if info.key_order_attrs is None:
+      continue
+    if [attributes for attributes in info.key_order_attrs
+        if 'maxOccurs' not in attributes]:
+      # Left to SanityCheck, which reports such schemas as it always has.
+      continue
+    field_checks = {}
+    for attributes in info.key_order_attrs:
+      field = str(attributes['name'])
+      if field in field_checks:
+        # The first field of a name is the one checked.
+        continue
+      max_occurs = attributes['maxOccurs']
+      field_checks[field] = _GenerateFieldCheck(
+          lines, checks, str(attributes['type'].getTargetNamespace()),
+          str(attributes['type'].getName()),
+          not max_occurs.isdigit() or int(max_occurs) > 1)
+
+    function_name = '_Check%d' % len(entries)
+    lines.extend([
+        '',
+        '',
+        '_FIELDS%d = {' % len(entries),
+    ])
+    for field in sorted(field_checks):
+      lines.append('    %r: %s,' % (field, field_checks[field]))
+    lines.extend([
+        '}',
+        '',
+        '',
+        'def %s(obj, type_key, soappy_service, validators):' % function_name,
+        '  # %s of %s' % (str(info.name), str(info.ns)),
+        '  for key in obj:',
+        '    value = obj[key]',
+        '    if value is None or key == type_key:',
+        '      continue',
+        '    check = _FIELDS%d.get(key)' % len(entries),
+        '    if check is None:',
+        '      raise ValidationError(\'Field \\\'%%s\\\' is not in type '
+        '\\\'%%s\\\'.\' %% (key, %r))' % str(info.name),
+        '    check(value, key, %r, soappy_service, validators)'
+        % str(info.name),
+    ])
+    entries.append('    (%r, %r): %s,' % (str(info.ns), str(info.name),
+                                           function_name))
+  lines.append('')
+  lines.append('VALIDATORS = {')
+  lines.extend(entries)
+  lines.append('}')
+  return '\n'.join(lines) + '\n'
+
+
+def _GenerateFieldCheck(lines, checks, ns, type_name, is_list):
+  """Generates the check of the values of fields of a type, unless it exists.
+
+  A check takes the value of the field, the field's name, the name of the
+  complex type holding the field, the SOAPpy service and the ValidatorSet.
+
+  Args:
+    lines: list The lines of the module, to which the check is added.
+    checks: dict The name of each check already generated, by (ns, type_name,
+            is_list).
+    ns: str The namespace of the field's type.
+    type_name: str The name of the field's type.
+    is_list: bool Whether the field holds a list of values.
+
+  Returns:
+    str The name of the check.
+  """
+  key = (ns, type_name, is_list)
+  if key in checks:
+    return checks[key]
+
+  if is_list:
+    item_check = _GenerateFieldCheck(lines, checks, ns, type_name, False)
+    function_name = '_List%d' % len(checks)
+    body = [
+        '  if not isinstance(value, (list, tuple)):',
+        '    raise ValidationError(\'Field \\\'%s\\\' in complex type '
+        '\\\'%s\\\' should be a list but value \\\'%s\\\' is a \\\'%s\\\' '
+        'instead.\' % (key, type_name, value, type(value)))',
+        '  for item in value:',
+        '    %s(item, key, type_name, soappy_service, validators)'
+        % item_check,
+    ]
+  elif Utils.IsBaseSoapType(type_name):
+    function_name = '_Value%d' % len(checks)
+    body = [
+        '  if value not in (None, \'\') and not isinstance(value, '
+        '(str, unicode)):',
+        '    raise ValidationError(\'Objects of type \\\'%%s\\\' should be a '
+        'string but value \\\'%%s\\\' is a \\\'%%s\\\' instead.\' %% '
+        '(%r, value, type(value)))' % type_name,
+    ]
+  else:
+    function_name = '_Value%d' % len(checks)
+    body = [
+        '  SoappySanityCheck(soappy_service, value, %r, %r, \'1\', validators)'
+        % (ns, type_name),
+    ]
+  checks[key] = function_name
+  description = type_name
+  if is_list:
+    description += '[]'
+  lines.extend([
+      '',
+      '',
+      'def %s(value, key, type_name, soappy_service, validators):'
+      % function_name,
+      '  # %s of %s' % (description, ns),
+  ])
+  lines.extend(body)
+  return function_name
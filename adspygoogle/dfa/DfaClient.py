@@ -114,6 +114,9 @@ class DfaClient(Client):
     # Validate XML parser to use.
     SanityCheck.ValidateConfigXmlParser(self._config['xml_parser'])
 
+    # Initialize resources shared by all services of this client.
+    self._SetUpSharedResources()
+
     # Only load from the pickle if 'headers' wasn't specified.
     if headers is None:
       self._headers = self.__LoadAuthCredentials()
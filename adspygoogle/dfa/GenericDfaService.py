@@ -22,6 +22,8 @@ import warnings
 
 from adspygoogle import SOAPpy
 from adspygoogle.common import Utils
+from adspygoogle.common import WsdlRegistry
+from adspygoogle.common import WsdlSnapshot
 from adspygoogle.common.Errors import Error
 from adspygoogle.common.GenericApiService import GenericApiService
 from adspygoogle.common.GenericApiService import MethodInfoKeys
@@ -38,6 +40,10 @@ _DEPRECATION_WARNING = ('Legacy DFA passwords are deprecated. Please use '
                         'OAuth 2.0')
 warnings.filterwarnings('always', _DEPRECATION_WARNING, DeprecationWarning)
 
+# Services read the WSDLs bundled with the library, if any, before downloading.
+WsdlRegistry.REGISTRY.AddSnapshot(
+    'adspygoogle.dfa', WsdlSnapshot.Load('adspygoogle.dfa'))
+
 
 class GenericDfaService(GenericApiService):
 
@@ -49,6 +55,8 @@ class GenericDfaService(GenericApiService):
   # The _BUFFER_CLASS is the subclass of SoapBuffer that should be used to track
   # all SOAP interactions.
   _BUFFER_CLASS = DfaSoapBuffer
+  # The _PACKAGE is the package whose WSDL snapshot the services read.
+  _PACKAGE = 'adspygoogle.dfa'
   # The _TOKEN_EXPIRED_ERROR_MESSAGE is returned by the DFA API when a DFA token
   # needs to be refreshed.
   _TOKEN_EXPIRED_ERROR_MESSAGE = 'Authentication token has expired.'
@@ -62,7 +70,8 @@ class GenericDfaService(GenericApiService):
       config: dict Dictionary object with populated configuration values.
       op_config: dict Dictionary object with additional configuration values for
                  this operation.
-      lock: threading.RLock Thread lock to use to synchronize requests.
+      lock: threading.RLock Thread lock guarding the authentication token
+            shared with the client's other services.
       logger: Logger Instance of Logger to use for logging.
       service_name: string The name of this service.
     """
@@ -77,11 +86,16 @@ class GenericDfaService(GenericApiService):
         GenericDfaService._WRAP_LISTS, GenericDfaService._BUFFER_CLASS,
         namespace, namespace_extractor)
 
-    # DFA-specific changes to the SOAPpy.WSDL.Proxy
+  def _SetUpSoappyService(self, soappyservice):
+    """Sets the DFA-specific method attributes of the SOAPpy proxy.
+
+    Args:
+      soappyservice: SOAPpy.WSDL.Proxy The SOAPpy proxy of this service.
+    """
     methodattrs = {
         'xmlns:dfa': self._namespace
     }
-    self._soappyservice.soapproxy.methodattrs = methodattrs
+    soappyservice.soapproxy.methodattrs = methodattrs
 
   def _WrapSoapCall(self, soap_call_function):
     """Gives the service a chance to wrap a call in a product-specific function.
@@ -98,11 +112,18 @@ class GenericDfaService(GenericApiService):
     """
 
     def RefreshTokenIfExpired(*args, **kargs):
+      token = self._headers.get('AuthToken')
       try:
         return soap_call_function(*args, **kargs)
       except DfaAuthenticationError, e:
         if e.message == self._TOKEN_EXPIRED_ERROR_MESSAGE:
-          self._GenerateToken()
+          # Only generate a new token if no other call has done so already.
+          self._lock.acquire()
+          try:
+            if self._headers.get('AuthToken') == token:
+              self._GenerateToken()
+          finally:
+            self._lock.release()
           return soap_call_function(*args, **kargs)
         else:
           raise e
@@ -110,16 +131,26 @@ class GenericDfaService(GenericApiService):
     return RefreshTokenIfExpired
 
   def _SetHeaders(self):
-    """Sets the SOAP headers for this service's requests."""
+    """Builds the SOAP headers for a request made by this service.
+
+    Returns:
+      SOAPpy.Types.headerType The SOAP headers to send.
+    """
     soap_headers = SOAPpy.Types.headerType()
     if self._service_name != 'login':
-      if 'AuthToken' not in self._headers or not self._headers['AuthToken']:
-        self._GenerateToken()
+      self._lock.acquire()
+      try:
+        if 'AuthToken' not in self._headers or not self._headers['AuthToken']:
+          self._GenerateToken()
+        username = self._headers['Username']
+        token = self._headers['AuthToken']
+      finally:
+        self._lock.release()
       wsse_header = SOAPpy.Types.structType(
           data={
               'UsernameToken': {
-                  'Username': self._headers['Username'],
-                  'Password': self._headers['AuthToken']
+                  'Username': username,
+                  'Password': token
               }
           },
           name='Security', typed=0, attrs={'xmlns': WSSE_NS})
@@ -128,16 +159,20 @@ class GenericDfaService(GenericApiService):
         data={'applicationName': ' '.join([self._config['app_name'], LIB_SIG])},
         name='RequestHeader', typed=0)
     soap_headers.RequestHeader = request_header
-    self._soappyservice.soapproxy.header = soap_headers
+    return soap_headers
 
   def _ReadyOAuth(self):
-    """If OAuth is on, sets the transport handler to add OAuth2 HTTP header.
+    """If OAuth is on, returns the OAuth2 HTTP header to send with a request.
 
     DFA overrides the default implementation because only the login service
     should have this header.
+
+    Returns:
+      dict The HTTP headers to add to the request.
     """
     if self._service_name == 'login':
-      super(GenericDfaService, self)._ReadyOAuth()
+      return super(GenericDfaService, self)._ReadyOAuth()
+    return {}
 
   def _GetMethodInfo(self, method_name):
     """Pulls all of the relevant data about a method from a SOAPpy service.
@@ -204,14 +239,17 @@ class GenericDfaService(GenericApiService):
     return args
 
   def _ReadyCompression(self):
-    """Sets whether the HTTP transport layer should use compression.
+    """Determines whether the HTTP transport layer should use compression.
 
     Overloaded for DFA because the DFA servers do not accept compressed
     messages. They do support returning compressed messages.
+
+    Returns:
+      tuple Whether to compress the request and whether to accept a compressed
+      response.
     """
     compress = Utils.BoolTypeConvert(self._config['compress'])
-    self._soappyservice.soapproxy.config.send_compressed = False
-    self._soappyservice.soapproxy.config.accept_compressed = compress
+    return False, compress
 
   def _HandleLogsAndErrors(self, buf, start_time, stop_time, error=None):
     """Manage SOAP XML message.
@@ -259,6 +297,8 @@ class GenericDfaService(GenericApiService):
   def _GenerateToken(self):
     """Attempts to generate a token for the WSSE security header.
 
+    Callers should hold the client's lock, which is reentrant for DFA.
+
     Raises:
       DfaAuthenticationError: if there are not enough credentials to generate a
                               token or if the given credentials are invalid.
@@ -267,18 +307,16 @@ class GenericDfaService(GenericApiService):
         ('Password' in self._headers or 'oauth2credentials' in self._headers)):
       if not self._headers.get('oauth2credentials'):
         warnings.warn(_DEPRECATION_WARNING, DeprecationWarning, stacklevel=5)
-      # Ensure the 'raw_response' config value is off while generating tokens.
-      old_raw_response = self._config['raw_response']
-      self._config['raw_response'] = 'n'
-      try:
-        login_service = GenericDfaService(
-            self._headers, self._config, self._op_config, self._lock,
-            self._logger, 'login')
-        self._headers['AuthToken'] = login_service.authenticate(
-            self._headers['Username'],
-            self._headers.get('Password'))[0]['token']
-      finally:
-        self._config['raw_response'] = old_raw_response
+      # Ensure the 'raw_response' config value is off while generating tokens,
+      # without changing it for calls made concurrently by other services.
+      login_config = self._config.copy()
+      login_config['raw_response'] = 'n'
+      login_service = GenericDfaService(
+          self._headers, login_config, self._op_config, self._lock,
+          self._logger, 'login')
+      self._headers['AuthToken'] = login_service.authenticate(
+          self._headers['Username'],
+          self._headers.get('Password'))[0]['token']
     else:
       fault = {
           'faultstring': ('Authentication data, username/password or username/'
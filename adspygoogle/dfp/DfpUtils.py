@@ -20,12 +20,14 @@ __author__ = 'api.sgrinberg@gmail.com (Stan Grinberg)'
 
 import gzip
 import os
+import socket
 import StringIO
 import time
-import urllib
+import urllib2
 
 from adspygoogle.common import SanityCheck
 from adspygoogle.common import Utils
+from adspygoogle.common.Errors import TimeoutError
 from adspygoogle.common.Errors import ValidationError
 from adspygoogle.dfp import DEFAULT_API_VERSION
 from adspygoogle.dfp import LIB_HOME
@@ -149,6 +151,9 @@ def DownloadReport(report_job_id, export_format, service):
 
   Returns:
     str Report data or empty string if report failed.
+
+  Raises:
+    TimeoutError: if the download did not answer within the read timeout.
   """
   SanityCheck.ValidateTypes(((report_job_id, (str, unicode)),))
 
@@ -172,6 +177,14 @@ def DownloadReport(report_job_id, export_format, service):
   report_url = service.GetReportDownloadURL(report_job_id, export_format)[0]
 
   # Download report.
-  data = urllib.urlopen(report_url).read()
+  try:
+    data = urllib2.urlopen(report_url, None, Utils.GetDownloadTimeout(
+        service._config, service._op_config)).read()
+  except socket.timeout, e:
+    raise TimeoutError('Report download timed out: %s' % e)
+  except urllib2.URLError, e:
+    if isinstance(e.reason, socket.timeout):
+      raise TimeoutError('Report download timed out: %s' % e.reason)
+    raise
   data = gzip.GzipFile(fileobj=StringIO.StringIO(data)).read()
   return data
@@ -21,7 +21,10 @@ __author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
 import time
 
 from adspygoogle import SOAPpy
+from adspygoogle.common import RateLimiter
 from adspygoogle.common import Utils
+from adspygoogle.common import WsdlRegistry
+from adspygoogle.common import WsdlSnapshot
 from adspygoogle.common.Errors import Error
 from adspygoogle.common.Errors import ValidationError
 from adspygoogle.common.GenericApiService import GenericApiService
@@ -36,6 +39,11 @@ from adspygoogle.dfp.DfpErrors import ERRORS
 from adspygoogle.dfp.DfpSoapBuffer import DfpSoapBuffer
 
 
+# Services read the WSDLs bundled with the library, if any, before downloading.
+WsdlRegistry.REGISTRY.AddSnapshot(
+    'adspygoogle.dfp', WsdlSnapshot.Load('adspygoogle.dfp'))
+
+
 class GenericDfpService(GenericApiService):
 
   """Wrapper for any DFP web service."""
@@ -50,6 +58,14 @@ class GenericDfpService(GenericApiService):
   # The _BUFFER_CLASS is the subclass of SoapBuffer that should be used to track
   # all SOAP interactions
   _BUFFER_CLASS = DfpSoapBuffer
+  # The _PACKAGE is the package whose WSDL snapshot the services read.
+  _PACKAGE = 'adspygoogle.dfp'
+  # Seconds to slow down for after a QuotaError, which gives no retry-after
+  # hint.
+  _QUOTA_RETRY_AFTER = 5
+  # The _TRANSIENT_ERROR_TYPES are the ApiError types of failures which may
+  # succeed when retried.
+  _TRANSIENT_ERROR_TYPES = ('InternalApiError', 'QuotaError', 'ServerError')
 
   def __init__(self, headers, config, op_config, lock, logger, service_name):
     """Inits GenericDfpService.
@@ -60,7 +76,8 @@ class GenericDfpService(GenericApiService):
       config: dict Dictionary object with populated configuration values.
       op_config: dict Dictionary object with additional configuration values for
                  this operation.
-      lock: thread.lock Thread lock to use to synchronize requests.
+      lock: thread.lock Thread lock guarding the authentication token shared
+            with the client's other services.
       logger: Logger Instance of Logger to use for logging.
       service_name: string The name of this service.
     """
@@ -75,50 +92,64 @@ class GenericDfpService(GenericApiService):
         GenericDfpService._WRAP_LISTS, GenericDfpService._BUFFER_CLASS,
         namespace, namespace_extractor)
 
-    # DFP-specific changes to the SOAPpy.WSDL.Proxy
+  def _SetUpSoappyService(self, soappyservice):
+    """Sets the DFP-specific method attributes of the SOAPpy proxy.
+
+    Args:
+      soappyservice: SOAPpy.WSDL.Proxy The SOAPpy proxy of this service.
+    """
     methodattrs = {
         'xmlns:dfp': self._namespace,
         'xmlns': self._namespace
     }
-    self._soappyservice.soapproxy.methodattrs = methodattrs
+    soappyservice.soapproxy.methodattrs = methodattrs
 
   def _SetHeaders(self):
-    """Sets the SOAP headers for this service's requests."""
-    now = time.time()
-    if ((('authToken' not in self._headers and
-          'auth_token_epoch' not in self._config) or
-         int(now - self._config['auth_token_epoch']) >= AUTH_TOKEN_EXPIRE) and
-        not self._headers.get('oauth2credentials')):
-      if ('email' not in self._headers or not self._headers['email'] or
-          'password' not in self._headers or not self._headers['password']):
-        raise ValidationError('Required authentication headers, \'email\' and '
-                              '\'password\', are missing. Unable to regenerate '
-                              'authentication token.')
-      self._headers['authToken'] = Utils.GetAuthToken(
-          self._headers['email'], self._headers['password'], AUTH_TOKEN_SERVICE,
-          LIB_SIG, self._config['proxy'])
-      self._config['auth_token_epoch'] = time.time()
-
-    # Apply headers to the SOAPpy service.
+    """Builds the SOAP headers for a request made by this service.
+
+    Returns:
+      SOAPpy.Types.headerType The SOAP headers to send.
+    """
+    self._lock.acquire()
+    try:
+      now = time.time()
+      if ((('authToken' not in self._headers and
+            'auth_token_epoch' not in self._config) or
+           int(now - self._config['auth_token_epoch']) >= AUTH_TOKEN_EXPIRE) and
+          not self._headers.get('oauth2credentials')):
+        if ('email' not in self._headers or not self._headers['email'] or
+            'password' not in self._headers or not self._headers['password']):
+          raise ValidationError('Required authentication headers, \'email\' '
+                                'and \'password\', are missing. Unable to '
+                                'regenerate authentication token.')
+        self._headers['authToken'] = Utils.GetAuthToken(
+            self._headers['email'], self._headers['password'],
+            AUTH_TOKEN_SERVICE, LIB_SIG, self._config['proxy'])
+        self._config['auth_token_epoch'] = time.time()
+      headers = self._headers.copy()
+    finally:
+      self._lock.release()
+
+    # Build the SOAPpy headers from this call's snapshot of the headers.
     soap_headers = SOAPpy.Types.headerType(attrs={'xmlns': self._namespace})
     request_header_data = {}
-    if 'authToken' in self._headers:
+    if 'authToken' in headers:
       authentication_block = SOAPpy.Types.structType(
-          data={'token': self._headers['authToken']},
+          data={'token': headers['authToken']},
           name='authentication', typed=0,
           attrs={(SOAPpy.NS.XSI3, 'type'): 'ClientLogin'})
       request_header_data['authentication'] = authentication_block
-    for key in self._headers:
+    for key in headers:
       if (key in GenericDfpService._IGNORED_HEADER_VALUES or
-          not self._headers[key]):
+          not headers[key]):
         continue
-      request_header_data[key] = SOAPpy.Types.stringType(self._headers[key])
+      request_header_data[key] = SOAPpy.Types.stringType(headers[key])
     request_header = SOAPpy.Types.structType(
         data=request_header_data, name='RequestHeader', typed=0)
     soap_headers.RequestHeader = request_header
-    if 'authToken' in self._headers:
+    if 'authToken' in headers:
       soap_headers.RequestHeader._keyord = ['applicationName', 'authentication']
-    self._soappyservice.soapproxy.header = soap_headers
+    return soap_headers
 
   def _GetMethodInfo(self, method_name):
     """Pulls all of the relevant data about a method from a SOAPpy service.
@@ -164,6 +195,49 @@ class GenericDfpService(GenericApiService):
       rval[MethodInfoKeys.OUTPUTS].append(outparam)
     return rval
 
+  def _GetRateLimitKeys(self):
+    """Returns the keys a call made by this service is rate limited by.
+
+    Returns:
+      list (scope, value) tuples, see RateLimiter.RateLimiter.Acquire.
+    """
+    keys = super(GenericDfpService, self)._GetRateLimitKeys()
+    if self._headers.get('networkCode'):
+      keys.append((RateLimiter.CUSTOMER, self._headers['networkCode']))
+    return keys
+
+  def _GetRateLimitBackoff(self, error):
+    """Tells whether an error is a QuotaError.
+
+    Args:
+      error: Exception The error raised by a call.
+
+    Returns:
+      tuple None, to slow down all of the call's scopes, and the number of
+      seconds to wait for, or None if the error is not a quota error.
+    """
+    if isinstance(error, DfpApiError):
+      for detail in error.errors:
+        if getattr(detail, 'type', None) == 'QuotaError':
+          return None, GenericDfpService._QUOTA_RETRY_AFTER
+    return None
+
+  def _IsTransientError(self, error):
+    """Tells whether a call failed with an error worth retrying.
+
+    Args:
+      error: Exception The error raised or returned by the call.
+
+    Returns:
+      bool True if the call may succeed when retried.
+    """
+    if isinstance(error, DfpApiError):
+      for detail in error.errors:
+        if (getattr(detail, 'type', None) in
+            GenericDfpService._TRANSIENT_ERROR_TYPES):
+          return True
+    return super(GenericDfpService, self)._IsTransientError(error)
+
   def _HandleLogsAndErrors(self, buf, start_time, stop_time, error=None):
     """Manage SOAP XML message.
 
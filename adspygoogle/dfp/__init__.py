@@ -34,8 +34,8 @@ LIB_NAME = 'DFP API Python Client Library'
 LIB_SHORT_NAME = 'DfpApi-Python'
 LIB_URL = 'http://code.google.com/p/google-api-ads-python'
 LIB_AUTHOR = 'Vincent Tsao'
-LIB_VERSION = '9.8.0'
-LIB_MIN_COMMON_VERSION = '3.1.0'
+LIB_VERSION = '9.9.0'
+LIB_MIN_COMMON_VERSION = '3.2.0'
 LIB_SIG = GenerateLibSig(LIB_SHORT_NAME, LIB_VERSION)
 
 if VERSION < LIB_MIN_COMMON_VERSION:
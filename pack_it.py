@@ -18,6 +18,9 @@
 
 Usage:
   $ python pack_it.py adwords
+
+Pass --snapshot to bundle the WSDLs of the product's services, so that the
+packed library creates services without downloading their WSDL.
 """
 
 __author__ = 'api.kwinter@gmail.com (Kevin Winter)'
@@ -70,6 +73,19 @@ def UpdateSOAPpy():
   os.chdir(cur_dir)
 
 
+def UpdateWsdlSnapshot(source_dir, target):
+  """Runs generate_wsdl_snapshot.py to bundle the WSDLs of a product.
+
+  Args:
+    source_dir: str Absolute path of the client library's source.
+    target: str The product to bundle the WSDLs of, e.g. 'adwords'.
+  """
+  cur_dir = os.path.abspath(os.curdir)
+  os.chdir(os.path.join(source_dir, 'scripts', 'adspygoogle', 'common'))
+  _ = subprocess.call(['python', 'generate_wsdl_snapshot.py', target])
+  os.chdir(cur_dir)
+
+
 def Main(argv):
   """Builds a gzipped tarball containing the api library you specified.
 
@@ -80,6 +96,9 @@ def Main(argv):
   if '--test' in argv:
     release_tests = os.path.abspath('releasetests.sh')
     argv.remove('--test')
+  snapshot = '--snapshot' in argv
+  if snapshot:
+    argv.remove('--snapshot')
 
   if not argv or len(argv) != 1 or argv[0] not in LIBS:
     print ('Nothing was done. Make sure to pass in the right argument: %s'
@@ -97,6 +116,8 @@ def Main(argv):
   lib_tag = '%s_api_python_%s' % (actual_target, LIB_VERSION)
   source_dir = os.path.abspath('.')
   UpdateSOAPpy()
+  if snapshot:
+    UpdateWsdlSnapshot(source_dir, effective_target)
   target_dir = '%s/%s' % (TARGET_DIR_BASE, lib_tag)
   # If temp base dir exists, remove it so we start fresh
   if os.path.exists(target_dir):
@@ -222,7 +243,8 @@ def Main(argv):
   os.system('find docs \( -not -name \'docs\' -and -not -name \'README\' \) | '
             'xargs rm')
   os.system('epydoc -q --name "%s" --url "%s" --html adspygoogle '
-            '--exclude=_services -o docs' % (LIB_NAME, LIB_URL))
+            '--exclude=_services --exclude=WsdlSnapshotData -o docs'
+            % (LIB_NAME, LIB_URL))
   os.system('perl -pi -e \'s/Generated by Epydoc (\d+\.\d+\.\d+) .*/Generated '
             'by Epydoc $1/\' docs/*')
 
@@ -0,0 +1,115 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Script to bundle the WSDLs of a product's services with the library.
+
+Downloads the WSDL of every service of every supported version of a product
+and writes them to the product's WsdlSnapshotData module, from which services
+are then created without downloading their WSDL. See
+adspygoogle.common.WsdlSnapshot.
+
+Usage:
+  $ python generate_wsdl_snapshot.py adwords
+"""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import os
+import sys
+sys.path.insert(0, os.path.join('..', '..', '..'))
+import urllib
+
+from adspygoogle.common import WsdlSnapshot
+from adspygoogle.common.Errors import ValidationError
+
+
+PRODUCTS = ['adwords', 'dfa', 'dfp']
+# Headers which pass each product's header validation. Creating a service
+# makes no request, so they are never sent.
+HEADERS = {
+    'adwords': {'authToken': ' ', 'userAgent': ' ', 'developerToken': ' '},
+    'dfa': {'Username': ' ', 'AuthToken': ' '},
+    'dfp': {'authToken': ' ', 'applicationName': ' '}
+}
+CLIENTS = {
+    'adwords': 'AdWordsClient',
+    'dfa': 'DfaClient',
+    'dfp': 'DfpClient'
+}
+
+
+def GetServices(product):
+  """Returns all services of all supported versions of a product.
+
+  Args:
+    product: str The product, e.g. 'adwords'.
+
+  Returns:
+    dict The URLs of the services on the product's default server, keyed by
+    (version, service name).
+  """
+  package = 'adspygoogle.%s' % product
+  api_versions = __import__(package, {}, {}, ['API_VERSIONS']).API_VERSIONS
+  client_module = __import__('%s.%s' % (package, CLIENTS[product]), {}, {},
+                             [CLIENTS[product]])
+  client = getattr(client_module, CLIENTS[product])(
+      headers=HEADERS[product], config={'xml_log': 'n', 'request_log': 'n'})
+
+  services = {}
+  for name in dir(client):
+    if not name.startswith('Get') or not name.endswith('Service'):
+      continue
+    if name == 'GetService':
+      continue
+    for version in api_versions:
+      try:
+        service = getattr(client, name)(version=version)
+      except ValidationError:
+        # The service is not available in this version.
+        continue
+      services[(version, service._service_name)] = service._service_url
+  return services
+
+
+def main(product):
+  """Writes the WSDL snapshot of a product.
+
+  Args:
+    product: str The product, e.g. 'adwords'.
+  """
+  wsdls = {}
+  services = GetServices(product)
+  for key, service_url in services.iteritems():
+    try:
+      wsdl_file = urllib.URLopener().open(service_url + '?wsdl')
+      try:
+        wsdls[key] = wsdl_file.read()
+      finally:
+        wsdl_file.close()
+    except IOError, e:
+      # Services of older versions may have been retired.
+      print 'Skipping %s: %s' % (service_url, e)
+  path = os.path.join('..', '..', '..', 'adspygoogle', product,
+                      WsdlSnapshot.MODULE_NAME + '.py')
+  WsdlSnapshot.Write(path, 'adspygoogle.%s' % product, wsdls)
+  print 'Wrote %d WSDLs to %s.' % (len(wsdls), path)
+
+
+if __name__ == '__main__':
+  if len(sys.argv) != 2 or sys.argv[1] not in PRODUCTS:
+    print 'Usage: python generate_wsdl_snapshot.py %s' % '|'.join(PRODUCTS)
+  else:
+    main(sys.argv[1])
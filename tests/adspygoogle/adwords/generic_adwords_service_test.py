@@ -27,6 +27,9 @@ import mock
 
 from adspygoogle.adwords.AdWordsErrors import AdWordsError
 from adspygoogle.adwords.GenericAdWordsService import GenericAdWordsService
+from adspygoogle.common.Errors import MutateAllError
+from adspygoogle.common.GenericApiService import MethodInfo
+from adspygoogle.common.GenericApiService import ParamInfo
 
 
 class UtilsTest(unittest.TestCase):
@@ -73,6 +76,56 @@ class UtilsTest(unittest.TestCase):
     self.assertRaises(AdWordsError, service._HandleLogsAndErrors,
                       buffer_, '', '', {'data': 'datum'})
 
+  def testMutateAll(self):
+    """Tests that merged chunk results line up with the operations."""
+    with mock.patch('adspygoogle.SOAPpy.WSDL.Proxy'):
+      service = GenericAdWordsService(
+          {}, {'access': '', 'units': '0', 'xml_log': 'n', 'request_log': 'n',
+               'debug': 'n', 'raw_response': 'n', 'wrap_in_tuple': 'y'},
+          {'group': 'cm', 'server': '', 'version': '', 'http_proxy': ''},
+          object(), object(), 'CampaignService')
+    service._LookUpMethod = mock.Mock(return_value=MethodInfo(
+        (ParamInfo('operations', 'ns', 'CampaignOperation', 'unbounded'),),
+        (ParamInfo('rval', 'ns', 'CampaignReturnValue', '1'),),
+        ('operations',), (('ns', 'CampaignReturnValue', '1'),)))
+
+    def Mutate(operations):
+      if operations[0] == 2:
+        raise AdWordsError('Chunk failed.')
+      return ({'value': [{'id': operation} for operation in operations],
+               'partialFailureErrors': [{'fieldPath': 'operations[1].operand'}],
+               'ListReturnValue.Type': 'CampaignReturnValue'},)
+    service.mutate = Mutate
+
+    try:
+      service.MutateAll(range(6), max_ops=2, workers=3)
+      self.fail('MutateAllError was not raised.')
+    except MutateAllError, e:
+      self.assertEqual(1, len(e.chunk_errors))
+      self.assertEqual((2, 2), e.chunk_errors[0][:2])
+      result = e.result[0]
+      self.assertEqual([{'id': 0}, {'id': 1}, None, None, {'id': 4},
+                        {'id': 5}], result['value'])
+      self.assertEqual(['operations[1].operand', 'operations[5].operand'],
+                       [error['fieldPath']
+                        for error in result['partialFailureErrors']])
+      self.assertEqual('CampaignReturnValue', result['ListReturnValue.Type'])
+
+  def testGetWsdlSnapshotKey(self):
+    """Tests that limited access versions do not read bundled WSDLs."""
+    config = {'access': '', 'units': '0', 'xml_log': 'n', 'request_log': 'n',
+              'debug': 'n', 'raw_response': 'n'}
+    op_config = {'group': 'cm', 'server': 'https://adwords.google.com',
+                 'version': 'v201309', 'http_proxy': ''}
+    service = GenericAdWordsService({}, config, op_config, object(), object(),
+                                    'CampaignService')
+    self.assertEqual(('adspygoogle.adwords', 'v201309', 'CampaignService'),
+                     service._GetWsdlSnapshotKey())
+
+    config['access'] = 'a'
+    service = GenericAdWordsService({}, config, op_config, object(), object(),
+                                    'CampaignService')
+    self.assertEqual(None, service._GetWsdlSnapshotKey())
 
 if __name__ == '__main__':
   unittest.main()
@@ -229,7 +229,10 @@ class AdWordsIntegrationTest(unittest.TestCase):
     wsdl_data = open(WSDL_FILE_LOCATION).read() % {'version': DEFAULT_API_VERSION}
     with mock.patch('urllib.urlopen') as mock_urlopen:
       mock_urlopen.return_value = StringIO.StringIO(wsdl_data)
-      return client.GetCampaignService()
+      campaign_service = client.GetCampaignService()
+      # Services load their WSDL on first use; load it while it is mocked.
+      campaign_service.LoadWsdl()
+      return campaign_service
 
   def _MakeSoapRequest(self, campaign_service):
     """Makes a "get" request against the AdWords CampaignService.
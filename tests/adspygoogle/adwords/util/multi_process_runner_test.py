@@ -0,0 +1,97 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests to cover MultiProcessRunner."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import os
+import sys
+import threading
+import unittest
+sys.path.insert(0, os.path.join('..', '..', '..', '..'))
+
+import mock
+
+from adspygoogle.adwords.util import MultiProcessRunner
+from adspygoogle.common.Errors import Error
+
+
+class FakeClient(object):
+
+  """Stands in for an AdWordsClient in the worker processes."""
+
+  def __init__(self):
+    self.client_customer_id = None
+
+  def SetClientCustomerId(self, client_customer_id):
+    self.client_customer_id = client_customer_id
+
+
+class FakeClientSpec(MultiProcessRunner.ClientSpec):
+
+  """A ClientSpec whose workers use a FakeClient."""
+
+  def CreateClient(self):
+    return FakeClient()
+
+
+class UnpicklableError(Exception):
+
+  """An error which fails to unpickle because of its constructor."""
+
+  def __init__(self, first, second):
+    Exception.__init__(self, first + second)
+
+
+def EchoTask(client, customer_id, server, version):
+  if customer_id == 'fail':
+    raise UnpicklableError('a', 'b')
+  return client.client_customer_id, server, version
+
+
+class MultiProcessRunnerTest(unittest.TestCase):
+
+  """Tests for the adspygoogle.adwords.util.MultiProcessRunner module."""
+
+  def testClientSpec_dropsLiveObjects(self):
+    """Tests that live objects are kept out of the spec."""
+    credentials = mock.Mock()
+    credentials.to_json.return_value = '{}'
+    spec = MultiProcessRunner.ClientSpec(
+        {'oauth2credentials': credentials, 'developerToken': 'token'},
+        {'debug': 'n', 'lock': threading.Lock()}, version='v201306')
+
+    self.assertEqual({'developerToken': 'token'}, spec.headers)
+    self.assertEqual('{}', spec.oauth2credentials_json)
+    self.assertEqual({'debug': 'n'}, spec.config)
+    self.assertEqual('v201306', spec.version)
+
+  def testRunForCustomers(self):
+    """Tests that each customer's outcome is streamed back."""
+    spec = FakeClientSpec({}, server='https://server', version='v1')
+    outcomes = sorted(MultiProcessRunner.RunForCustomers(
+        spec, EchoTask, ['1', '2', 'fail'], processes=2))
+
+    self.assertEqual(('1', ('1', 'https://server', 'v1'), None), outcomes[0])
+    self.assertEqual(('2', ('2', 'https://server', 'v1'), None), outcomes[1])
+    self.assertEqual('fail', outcomes[2][0])
+    self.assertEqual(None, outcomes[2][1])
+    self.assertTrue(isinstance(outcomes[2][2], Error))
+
+
+if __name__ == '__main__':
+  unittest.main()
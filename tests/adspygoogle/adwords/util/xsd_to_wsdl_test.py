@@ -0,0 +1,66 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests to cover XsdToWsdl."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.join('..', '..', '..', '..'))
+
+import mock
+
+from adspygoogle.adwords.util import XsdToWsdl
+
+
+XSD_URL = ('https://adwords.google.com/api/adwords/reportdownload/v201306/'
+           'reportDefinition.xsd')
+
+
+class XsdToWsdlTest(unittest.TestCase):
+
+  """Tests for the adspygoogle.adwords.util.XsdToWsdl module."""
+
+  def setUp(self):
+    XsdToWsdl._PROXIES.clear()
+
+  def testCreateWsdlFromXsdUrl_parsedOnce(self):
+    """Tests that the XSD of a server and version is parsed once."""
+    with mock.patch('urllib.urlopen') as urlopen:
+      urlopen.return_value.read.return_value = '<xsd/>'
+      with mock.patch('adspygoogle.SOAPpy.wstools.WSDLTools.WSDLReader'):
+        first = XsdToWsdl.CreateWsdlFromXsdUrl(XSD_URL)
+        second = XsdToWsdl.CreateWsdlFromXsdUrl(XSD_URL)
+
+    self.assertTrue(first is second)
+    urlopen.assert_called_once_with(XSD_URL)
+
+  def testCreateWsdlFromXsdUrl_wsdlCache(self):
+    """Tests that the XSD is read through the on-disk cache when given."""
+    wsdl_cache = mock.Mock()
+    wsdl_cache.Fetch.return_value = '<xsd/>'
+    with mock.patch('urllib.urlopen') as urlopen:
+      with mock.patch('adspygoogle.SOAPpy.wstools.WSDLTools.WSDLReader'):
+        XsdToWsdl.CreateWsdlFromXsdUrl(XSD_URL, wsdl_cache)
+
+    wsdl_cache.Fetch.assert_called_once_with(XSD_URL)
+    self.assertFalse(urlopen.called)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,119 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests to cover BatchExecutor."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import os
+import sys
+import threading
+import time
+import unittest
+sys.path.insert(0, os.path.join('..', '..', '..'))
+
+import mock
+
+from adspygoogle.common import BatchExecutor
+from adspygoogle.common.Errors import Error
+from adspygoogle.common.Errors import MalformedBufferError
+from adspygoogle.common.WorkerPool import WorkerPool
+
+
+class BatchExecutorTest(unittest.TestCase):
+
+  """Tests for the adspygoogle.common.BatchExecutor module."""
+
+  def testExecuteConcurrently_orderAndErrors(self):
+    """Tests results come back in input order with errors kept per call."""
+    service = mock.Mock()
+    service.get.side_effect = lambda value: (value,)
+    service.mutate.side_effect = Error('Failed.')
+    service.GetLastBuffer.return_value = None
+
+    results = BatchExecutor.ExecuteConcurrently(
+        [(service, 'get', (1,)), (service, 'mutate', [[]]),
+         (service, 'get', (3,))], max_workers=2)
+
+    self.assertEqual([(1,), None, (3,)], [result.result for result in results])
+    self.assertEqual([True, False, True],
+                     [result.IsSuccess() for result in results])
+    self.assertTrue(isinstance(results[1].error, Error))
+    for result in results:
+      self.assertTrue(result.latency >= 0)
+
+  def testExecuteConcurrently_boundedWorkers(self):
+    """Tests that no more than max_workers calls run at the same time."""
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+
+    def Call():
+      lock.acquire()
+      try:
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+      finally:
+        lock.release()
+      time.sleep(0.01)
+      lock.acquire()
+      try:
+        running[0] -= 1
+      finally:
+        lock.release()
+
+    service = mock.Mock()
+    service.get.side_effect = Call
+    service.GetLastBuffer.return_value = None
+    BatchExecutor.ExecuteConcurrently([(service, 'get', ())] * 12,
+                                      max_workers=3)
+    self.assertTrue(peak[0] <= 3)
+
+  def testExecuteConcurrently_fromBusyPool(self):
+    """Tests that a batch run from the only thread of its pool completes."""
+    service = mock.Mock()
+    service.get.side_effect = lambda value: value
+    service.GetLastBuffer.return_value = None
+    pool = WorkerPool(1)
+
+    future = pool.Submit(BatchExecutor.ExecuteConcurrently,
+                         [(service, 'get', (i,)) for i in range(5)], None,
+                         pool)
+    self.assertEqual(range(5), [result.result for result in future.Result(5)])
+
+  def testExecuteConcurrently_units(self):
+    """Tests that units and operations are read from the call's buffer."""
+    buf = mock.Mock()
+    buf.GetCallUnits.return_value = '5'
+    buf.GetCallOperations.return_value = '2'
+    service = mock.Mock()
+    service.GetLastBuffer.return_value = buf
+
+    result = BatchExecutor.ExecuteConcurrently([(service, 'get', ())])[0]
+    self.assertEqual(5, result.units)
+    self.assertEqual(2, result.operations)
+
+    buf.GetCallUnits.side_effect = MalformedBufferError('No response.')
+    result = BatchExecutor.ExecuteConcurrently([(service, 'get', ())])[0]
+    self.assertEqual(None, result.units)
+
+  def testExecuteConcurrently_invalidMaxWorkers(self):
+    """Tests that max_workers must be positive."""
+    self.assertRaises(ValueError, BatchExecutor.ExecuteConcurrently, [], 0)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -26,6 +26,7 @@ import unittest
 
 sys.path.insert(0, os.path.join('..', '..', '..'))
 
+import mock
 
 from adspygoogle.common.Client import _DEFAULT_CONFIG
 from adspygoogle.common.Client import Client
@@ -157,6 +158,25 @@ class ClientTest(unittest.TestCase):
     self.assertEqual(self.client._SetMissingDefaultConfigValues(partial_config),
                      expected_config)
 
+  def testPrefetch(self):
+    """Tests that Prefetch loads the WSDLs of services on the worker pool."""
+    self.client._config = self.client._SetMissingDefaultConfigValues()
+    self.client._SetUpSharedResources()
+    self.client.GetCampaignService = mock.Mock()
+    self.client.GetService = mock.Mock()
+
+    futures = self.client.Prefetch(['CampaignService', 'LabelService'],
+                                   version='v201309')
+
+    self.assertEqual([self.client.GetCampaignService.return_value,
+                      self.client.GetService.return_value],
+                     [future.Result() for future in futures])
+    self.client.GetCampaignService.assert_called_once_with(version='v201309')
+    self.client.GetService.assert_called_once_with('LabelService',
+                                                   version='v201309')
+    service = self.client.GetCampaignService.return_value
+    service.LoadWsdl.assert_called_once_with()
+
 
 if __name__ == '__main__':
   unittest.main()
@@ -0,0 +1,208 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests to cover ConnectionPool."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import httplib
+import os
+import socket
+import sys
+import thread
+import threading
+import time
+import unittest
+sys.path.insert(0, os.path.join('..', '..', '..'))
+
+import mock
+
+from adspygoogle.common.ConnectionPool import ConnectionPool
+from adspygoogle.common.Errors import Error
+from adspygoogle.common.Errors import TimeoutError
+
+
+class ConnectionPoolTest(unittest.TestCase):
+
+  """Tests for the adspygoogle.common.ConnectionPool module."""
+
+  def setUp(self):
+    self.pool = ConnectionPool(max_connections=1, idle_timeout=60)
+
+  def _MockResponse(self, connection, will_close=False):
+    response = mock.Mock()
+    response.configure_mock(**{
+        'status': 200,
+        'reason': 'OK',
+        'msg': {},
+        'will_close': will_close,
+        'read.return_value': 'data'
+    })
+    connection.getresponse.return_value = response
+
+  def testRequest_reusesConnection(self):
+    """Tests that a kept-alive connection serves the next request."""
+    with mock.patch('httplib.HTTPSConnection') as https_:
+      self._MockResponse(https_.return_value)
+      self.assertEqual((200, 'OK', {}, 'data'), self.pool.Request(
+          'https', 'host', 'POST', '/path', [('Host', 'host')], 'body'))
+      self.pool.Request('https', 'host', 'POST', '/path', [], 'body')
+
+      https_.assert_called_once_with('host')
+      stats = self.pool.GetStats()
+      self.assertEqual(1, stats['hits'])
+      self.assertEqual(1, stats['misses'])
+      self.assertEqual(1, stats['idle'])
+
+  def testRequest_closesConnectionOnServerClose(self):
+    """Tests that a connection the server is closing is not pooled."""
+    with mock.patch('httplib.HTTPConnection') as http_:
+      self._MockResponse(http_.return_value, will_close=True)
+      self.pool.Request('http', 'host', 'GET', '/path', [], '')
+
+      http_.return_value.close.assert_called_once_with()
+      self.assertEqual(0, self.pool.GetStats()['idle'])
+
+  def testRequest_retriesStaleConnection(self):
+    """Tests that a request failing on a reused connection is sent again."""
+    stale = mock.Mock()
+    stale.getresponse.side_effect = httplib.BadStatusLine('')
+    fresh = mock.Mock()
+    self._MockResponse(fresh)
+    with mock.patch('httplib.HTTPSConnection') as https_:
+      https_.side_effect = [stale, fresh]
+      self.pool.Release(self.pool.Acquire('https', 'host'))
+
+      self.assertEqual((200, 'OK', {}, 'data'), self.pool.Request(
+          'https', 'host', 'POST', '/path', [], 'body'))
+      stale.close.assert_called_once_with()
+
+  def testRequest_resetStaleConnectionIsRaised(self):
+    """Tests that a request the server may have received is not resent."""
+    stale = mock.Mock()
+    stale.getresponse.side_effect = socket.error('Connection reset by peer.')
+    with mock.patch('httplib.HTTPSConnection') as https_:
+      https_.return_value = stale
+      self.pool.Release(self.pool.Acquire('https', 'host'))
+
+      self.assertRaises(socket.error, self.pool.Request, 'https', 'host',
+                        'POST', '/path', [], 'body')
+      self.assertEqual(1, stale.send.call_count)
+
+  def testRequest_chunkedBody(self):
+    """Tests that an iterable body is sent with chunked transfer encoding."""
+    with mock.patch('httplib.HTTPSConnection') as https_:
+      self._MockResponse(https_.return_value)
+      self.pool.Request('https', 'host', 'POST', '/path',
+                        [('Transfer-Encoding', 'chunked')],
+                        ['<a>', '', 'text</a>'], stream=True)
+
+      self.assertEqual(
+          [mock.call('3\r\n<a>\r\n'), mock.call('8\r\ntext</a>\r\n'),
+           mock.call('0\r\n\r\n')],
+          https_.return_value.send.call_args_list)
+
+  def testRequest_unicodeBody(self):
+    """Tests that a unicode body is sent whole, encoded as UTF-8."""
+    with mock.patch('httplib.HTTPSConnection') as https_:
+      self._MockResponse(https_.return_value)
+      self.pool.Request('https', 'host', 'POST', '/path',
+                        [('Content-length', '12')], u'<a>h\xe9</a>')
+
+      https_.return_value.send.assert_called_once_with('<a>h\xc3\xa9</a>')
+
+  def testRequest_newConnectionErrorIsRaised(self):
+    """Tests that a failure on a new connection is not retried."""
+    with mock.patch('httplib.HTTPSConnection') as https_:
+      https_.return_value.getresponse.side_effect = httplib.BadStatusLine('')
+      self.assertRaises(httplib.BadStatusLine, self.pool.Request, 'https',
+                        'host', 'POST', '/path', [], 'body')
+      self.assertEqual(1, https_.call_count)
+
+  def testAbort(self):
+    """Tests that an aborted request fails without being sent again."""
+    def Abort():
+      self.pool.Abort(thread.get_ident())
+      raise socket.error('Connection reset by peer.')
+
+    with mock.patch('httplib.HTTPSConnection') as https_:
+      https_.return_value.getresponse.side_effect = Abort
+      self.pool.Release(self.pool.Acquire('https', 'host'))
+      self.assertRaises(Error, self.pool.Request, 'https', 'host', 'POST',
+                        '/path', [], 'body')
+
+      self.assertEqual(1, https_.call_count)
+      https_.return_value.sock.shutdown.assert_called_once_with(
+          socket.SHUT_RDWR)
+      self.assertEqual(0, self.pool.GetStats()['idle'])
+    # Aborting a thread which is not sending a request does nothing.
+    self.pool.Abort(thread.get_ident())
+
+  def testAcquire_waitsForConnection(self):
+    """Tests that no more than max_connections are open at once."""
+    with mock.patch('httplib.HTTPConnection'):
+      first = self.pool.Acquire('http', 'host')
+      self.assertRaises(TimeoutError, self.pool.Acquire, 'http', 'host',
+                        timeout=0.01)
+      # Other addresses have connections of their own.
+      self.pool.Discard(self.pool.Acquire('http', 'other', timeout=0.01))
+
+      releaser = threading.Timer(0.05, self.pool.Release, (first,))
+      releaser.start()
+      second = self.pool.Acquire('http', 'host', timeout=5)
+      releaser.join()
+      self.assertTrue(second is first)
+      self.assertTrue(second.reused)
+
+      self.pool.Discard(second)
+      self.pool.Discard(self.pool.Acquire('http', 'host', timeout=0.01))
+      stats = self.pool.GetStats()
+      self.assertEqual(3, stats['opened'])
+      self.assertEqual(2, stats['waits'])
+
+  def testEvictIdleConnections(self):
+    """Tests that connections idle for too long are closed."""
+    with mock.patch('httplib.HTTPConnection'):
+      pooled = self.pool.Acquire('http', 'host')
+      self.pool.Release(pooled)
+      pooled.last_used -= 120
+      self.pool.EvictIdleConnections()
+
+      pooled.connection.close.assert_called_once_with()
+      self.assertEqual(1, self.pool.GetStats()['evicted'])
+      self.assertEqual(0, self.pool.GetStats()['idle'])
+
+  def testRequest_timeouts(self):
+    """Tests that a server which never answers raises a TimeoutError."""
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen(1)
+    address = '127.0.0.1:%d' % server.getsockname()[1]
+    try:
+      self.assertRaises(TimeoutError, self.pool.Request, 'http', address,
+                        'POST', '/path', [], 'body', read_timeout=0.05)
+      self.assertRaises(TimeoutError, self.pool.Request, 'http', address,
+                        'POST', '/path', [], 'body',
+                        deadline=time.time() + 0.05)
+      self.assertRaises(TimeoutError, self.pool.Request, 'http', address,
+                        'POST', '/path', [], 'body', deadline=time.time() - 1)
+      self.assertEqual(0, self.pool.GetStats()['idle'])
+    finally:
+      server.close()
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,167 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests to cover EnvelopeWriter."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import os
+import StringIO
+import sys
+import unittest
+from xml.dom import minidom
+sys.path.insert(0, os.path.join('..', '..', '..'))
+
+from adspygoogle import SOAPpy
+from adspygoogle.common import MessageHandler
+from adspygoogle.common.GenericApiService import ParamInfo
+from adspygoogle.common.soappy import EnvelopeWriter
+
+
+# Location of a cached WSDL to write parameters for.
+WSDL_FILE_LOCATION = os.path.join('..', 'adwords', 'data',
+                                  'campaign_service.wsdl')
+VERSION = 'v201306'
+NS = 'https://adwords.google.com/api/adwords/cm/' + VERSION
+# SOAPpy binds the prefix ns1 to the namespace of the method element.
+PREFIX_FUNCTION = lambda ns: 'ns1:'
+OPERATIONS = ParamInfo('operations', NS, 'CampaignOperation', 'unbounded')
+SOAP_CONFIG = SOAPpy.SOAPConfig(typed=0, namespaceStyle='2001')
+
+
+def _Canonicalize(xml):
+  """Returns the elements of an XML document, leaving out prefixes.
+
+  Args:
+    xml: str The XML document.
+
+  Returns:
+    tuple The namespace, name, attributes, text and children of the root
+    element, recursively. Namespace declarations are left out.
+  """
+  return _CanonicalizeElement(minidom.parseString(xml).documentElement)
+
+
+def _CanonicalizeElement(element):
+  """Returns an element, its attributes, text and children, recursively."""
+  attributes = []
+  for i in range(element.attributes.length):
+    attribute = element.attributes.item(i)
+    if attribute.name != 'xmlns' and not attribute.name.startswith('xmlns:'):
+      attributes.append((attribute.namespaceURI, attribute.localName,
+                         attribute.value))
+  attributes.sort()
+  text = ''.join([node.data for node in element.childNodes
+                  if node.nodeType == node.TEXT_NODE]).strip()
+  children = [_CanonicalizeElement(node) for node in element.childNodes
+              if node.nodeType == node.ELEMENT_NODE]
+  return (element.namespaceURI, element.localName, attributes, text, children)
+
+
+class EnvelopeWriterTest(unittest.TestCase):
+
+  """Tests for the adspygoogle.common.soappy.EnvelopeWriter module."""
+
+  def setUp(self):
+    wsdl_data = open(WSDL_FILE_LOCATION).read() % {'version': VERSION}
+    self.service = SOAPpy.WSDL.Proxy(StringIO.StringIO(wsdl_data))
+    self.writer = EnvelopeWriter.EnvelopeWriter(self.service, False,
+                                                PREFIX_FUNCTION)
+
+  def _BuildPacked(self, operations):
+    """Builds a mutate request by packing the operations for SOAPpy."""
+    packed = MessageHandler.PackForSoappy(
+        operations, NS, 'CampaignOperation', self.service, False,
+        PREFIX_FUNCTION)
+    return SOAPpy.buildSOAP(kw={'operations': packed}, method='mutate',
+                            namespace=NS, config=SOAP_CONFIG)
+
+  def _BuildDirect(self, operations):
+    """Builds a mutate request with parameters written by the writer."""
+    chunks = self.writer.WriteParameters((operations,), (OPERATIONS,))
+    for chunk in chunks:
+      self.assertTrue(isinstance(chunk, str))
+    return EnvelopeWriter.SpliceBody(
+        SOAPpy.buildSOAP(kw={}, method='mutate', namespace=NS,
+                         config=SOAP_CONFIG), chunks)
+
+  def testWriteParameters(self):
+    """Tests that parameters are written as SOAPpy writes them packed."""
+    operations = [{
+        'operator': 'ADD',
+        'operand': {
+            'status': 'PAUSED',
+            'name': 'Cruise & Co',
+            'id': None,
+            'budget': {'budgetId': '5'},
+            'settings': [{'xsi_type': 'KeywordMatchSetting', 'optIn': 'false'}]
+        }
+    }]
+    self.assertEqual(_Canonicalize(self._BuildPacked(operations)),
+                     _Canonicalize(self._BuildDirect(operations)))
+
+  def testWriteParameters_notAscii(self):
+    """Tests that text which is not ASCII is written as UTF-8."""
+    operations = [{'operator': 'SET',
+                   'operand': {'id': u'1', 'name': 'Caf\xc3\xa9 \xc3\xa0'}},
+                  {'operator': 'SET',
+                   'operand': {'id': '2', 'name': u'Caf\xe9 \u2603'}}]
+    direct = self._BuildDirect(operations)
+    self.assertTrue(u'<ns1:name>Caf\xe9 \u2603</ns1:name>'.encode('utf-8')
+                    in direct)
+    self.assertEqual(_Canonicalize(self._BuildPacked(operations)),
+                     _Canonicalize(direct))
+
+  def testWriteParameters_unknownField(self):
+    """Tests that a key which is not a field of the type is rejected."""
+    self.assertRaises(TypeError, self.writer.WriteParameters,
+                      ([{'operand': {'nmae': 'Campaign #1'}}],), (OPERATIONS,))
+
+  def testWriteParameters_leftToSoappy(self):
+    """Tests that objects which cannot be written directly are refused."""
+    self.assertRaises(ValueError, self.writer.WriteParameters, (None,),
+                      (OPERATIONS,))
+    self.assertRaises(ValueError, self.writer.WriteParameters, ([],),
+                      (OPERATIONS,))
+    self.assertRaises(ValueError, self.writer.WriteParameters,
+                      ([{'operand': {'id': 1}}],), (OPERATIONS,))
+
+  def testStreamParameters(self):
+    """Tests that a stream yields an operation at a time, on every pass."""
+    operations = [{'operator': 'REMOVE', 'operand': {'id': '1'}},
+                  {'operator': 'REMOVE', 'operand': {'id': '2'}}]
+    stream = self.writer.StreamParameters((operations,), (OPERATIONS,))
+    chunks = list(stream)
+    self.assertEqual(2, len(chunks))
+    self.assertTrue('<ns1:id>2</ns1:id>' in chunks[1])
+    self.assertEqual(chunks, list(stream))
+    self.assertRaises(TypeError, self.writer.StreamParameters,
+                      ([{'operand': {'nmae': 'Campaign #1'}}],), (OPERATIONS,))
+
+  def testSpliceBody(self):
+    """Tests that parameters are spliced into the method element."""
+    envelope = ('<SOAP-ENV:Envelope><SOAP-ENV:Body>'
+                '<mutate xmlns="%s"></mutate>\n'
+                '</SOAP-ENV:Body></SOAP-ENV:Envelope>' % NS)
+    self.assertEqual(
+        '<SOAP-ENV:Envelope><SOAP-ENV:Body>'
+        '<mutate xmlns="%s" xmlns:xsi="%s">\n<operations/>\n</mutate>\n'
+        '</SOAP-ENV:Body></SOAP-ENV:Envelope>' % (NS, SOAPpy.NS.XSI3),
+        EnvelopeWriter.SpliceBody(envelope, ['<operations/>\n']))
+
+
+if __name__ == '__main__':
+  unittest.main()
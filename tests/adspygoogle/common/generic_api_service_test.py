@@ -20,14 +20,25 @@ __author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
 
 import datetime
 import os
+import socket
 import sys
+import threading
+import time
 import unittest
 sys.path.insert(0, os.path.join('..', '..', '..'))
 
 import mock
 from oauth2client.client import OAuth2Credentials
 
+from adspygoogle.common import RateLimiter
+from adspygoogle.common.Errors import Error
+from adspygoogle.common.Errors import TimeoutError
 from adspygoogle.common.GenericApiService import GenericApiService
+from adspygoogle.common.GenericApiService import MethodInfo
+from adspygoogle.common.GenericApiService import MethodInfoKeys
+from adspygoogle.common.ResponseCache import ResponseCache
+from adspygoogle.common.RetryPolicy import RetryPolicy
+from adspygoogle.common.SingleFlight import SingleFlight
 from adspygoogle.common.SoapBuffer import SoapBuffer
 
 
@@ -40,6 +51,39 @@ class ConcreteGenericApiService(GenericApiService):
     pass
 
 
+class RateLimitedService(ConcreteGenericApiService):
+
+  """A service whose server answers every call with a rate limit error."""
+
+  def _SetHeaders(self):
+    """Dummy implementation of an abstract method in GenericApiService."""
+    return None
+
+  def _HandleLogsAndErrors(self, unused_buf, unused_start, unused_stop,
+                           error=None):
+    """Fails every call the way a product reports a RateExceededError."""
+    raise Error('RateExceededError')
+
+  def _GetRateLimitBackoff(self, error):
+    """Asks for a 30 second pause of the service's calls."""
+    return RateLimiter.SERVICE, 30
+
+
+def CreateService(config, service_class=ConcreteGenericApiService):
+  """Returns a service of the given config whose WSDL is never loaded."""
+  full_config = {
+      'xml_parser': '2', 'pretty_xml': 'y', 'wrap_in_tuple': 'n',
+      'raw_response': 'n', 'raw_debug': 'n', 'debug': 'n', 'strict': 'n',
+      'compress': 'n'
+  }
+  full_config.update(config)
+  return service_class(
+      {}, full_config, {'http_proxy': None, 'server': 'www.myurl.com'},
+      mock.Mock(), mock.Mock(), 'CampaignService',
+      'https://www.myurl.com/CampaignService', True, mock.Mock, '',
+      lambda x: x)
+
+
 class GenericApiServiceTest(unittest.TestCase):
 
   """Tests for the adspygoogle.common.GenericApiService module."""
@@ -88,15 +132,18 @@ class GenericApiServiceTest(unittest.TestCase):
         '</soapenv:Body>\n'
         '</soapenv:Envelope>\n')
 
-    with mock.patch('httplib.HTTPS') as https_:
+    with mock.patch('httplib.HTTPSConnection') as https_:
       mock_https = https_(op_config['server'])
       mock_response = mock.Mock()
       rvals = {
-          'getreply.return_value': (200, 'OK', {}),
-          'getfile.return_value': mock_response
+          'getresponse.return_value': mock_response
       }
       mock_https.configure_mock(**rvals)
       response_rvals = {
+          'status': 200,
+          'reason': 'OK',
+          'msg': '',
+          'will_close': False,
           'read.return_value': response
       }
       mock_response.configure_mock(**response_rvals)
@@ -104,7 +151,8 @@ class GenericApiServiceTest(unittest.TestCase):
       output = service.CallRawMethod(message)
       self.assertEqual((response,), output)
 
-      mock_https.putrequest.assert_called_with('POST', service_url)
+      mock_https.putrequest.assert_called_with(
+          'POST', service_url, skip_host=True, skip_accept_encoding=True)
 
       expected_http_headers = [
           mock.call('Host', ''),
@@ -193,6 +241,186 @@ class GenericApiServiceTest(unittest.TestCase):
 
     self.assertFalse(credentials.refresh.called)
 
+  def testLookUpMethod_sharedByWsdl(self):
+    """Tests that method metadata is built once per parsed WSDL."""
+    wsdl = mock.Mock()
+    method_info = {
+        MethodInfoKeys.INPUTS: [{
+            MethodInfoKeys.ELEMENT_NAME: u'selector',
+            MethodInfoKeys.NS: 'ns',
+            MethodInfoKeys.TYPE: 'Selector',
+            MethodInfoKeys.MAX_OCCURS: '1'
+        }],
+        MethodInfoKeys.OUTPUTS: [{
+            MethodInfoKeys.ELEMENT_NAME: u'rval',
+            MethodInfoKeys.NS: 'ns',
+            MethodInfoKeys.TYPE: 'Page',
+            MethodInfoKeys.MAX_OCCURS: '1'
+        }]
+    }
+    services = []
+    for _ in range(2):
+      service = ConcreteGenericApiService(
+          {}, {'xml_parser': '2', 'pretty_xml': 'y', 'wrap_in_tuple': 'y'},
+          {'http_proxy': None, 'server': 'www.myurl.com'}, mock.Mock(),
+          mock.Mock(), '', '', True, '', '', '')
+      service._wsdl_proxy = mock.Mock()
+      service._wsdl_proxy.wsdl = wsdl
+      service._GetMethodInfo = mock.Mock(return_value=method_info)
+      services.append(service)
+
+    first = services[0]._LookUpMethod('get')
+    second = services[1]._LookUpMethod('get')
+
+    self.assertTrue(first is second)
+    self.assertEqual(1, services[0]._GetMethodInfo.call_count)
+    self.assertFalse(services[1]._GetMethodInfo.called)
+    self.assertEqual(('selector',), first.arg_order)
+    self.assertEqual((('ns', 'Page', '1'),), first.output_types)
+    self.assertEqual('Selector', first.inputs[0].type)
+
+  def testCall_mutateInvalidatesCachedReads(self):
+    """Tests that a read is cached until a mutate of the service succeeds."""
+    service = CreateService({'response_cache': ResponseCache(60)})
+    calls = []
+
+    def CreateMethod(method_name):
+      def CallMethod(*args):
+        calls.append(method_name)
+        return {'entries': [{'id': str(len(calls))}]}
+      return CallMethod
+
+    with mock.patch.object(service, '_CreateMethod', CreateMethod):
+      first = service.get({'fields': ['Id']})
+      self.assertEqual(first, service.get({'fields': ['Id']}))
+      service.mutate([{'operator': 'ADD'}])
+      self.assertNotEqual(first, service.get({'fields': ['Id']}))
+    self.assertEqual(['get', 'mutate', 'get'], calls)
+
+  def testCall_coalescedWaitersGetCopies(self):
+    """Tests that calls coalesced into one each get their own response."""
+    single_flight = SingleFlight()
+    service = CreateService({'single_flight': single_flight})
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+    responses = []
+
+    def CreateMethod(unused_method_name):
+      def CallMethod(*unused_args):
+        calls.append(None)
+        started.set()
+        release.wait(5)
+        return {'entries': [{'id': '1'}]}
+      return CallMethod
+
+    def Get():
+      responses.append(service.get({'fields': ['Id']}))
+
+    with mock.patch.object(service, '_CreateMethod', CreateMethod):
+      leader = threading.Thread(target=Get)
+      leader.start()
+      started.wait(5)
+      follower = threading.Thread(target=Get)
+      follower.start()
+      while single_flight.GetStats()['calls'] < 2:
+        time.sleep(0.01)
+      release.set()
+      leader.join(5)
+      follower.join(5)
+
+    self.assertEqual(1, len(calls))
+    self.assertEqual(responses[0], responses[1])
+    self.assertFalse(responses[0] is responses[1])
+    self.assertFalse(responses[0]['entries'] is responses[1]['entries'])
+
+  def testCall_transientErrorRetriedForReadsOnly(self):
+    """Tests that a returned transient Error is retried, but not for mutates."""
+    service = CreateService({'retry_policy': RetryPolicy(2, 0)})
+    calls = []
+
+    def CreateMethod(method_name):
+      def CallMethod(*unused_args):
+        calls.append(method_name)
+        if len(calls) == 1 or method_name == 'mutate':
+          service._last_call.transport_error = socket.error('Reset.')
+          return Error('Connection reset.')
+        return {'entries': []}
+      return CallMethod
+
+    with mock.patch.object(service, '_CreateMethod', CreateMethod):
+      self.assertEqual({'entries': []}, service.get({}))
+      self.assertTrue(isinstance(service.mutate([]), Error))
+    self.assertEqual(['get', 'get', 'mutate'], calls)
+
+  def testCall_deadlineCoversRetries(self):
+    """Tests that every attempt of a call shares the call's deadline."""
+    service = CreateService({'retry_policy': RetryPolicy(3, 0),
+                             'call_timeout': 5})
+    deadlines = []
+
+    def CreateMethod(unused_method_name):
+      def CallMethod(*unused_args):
+        deadlines.append(service._GetTimeouts()[2])
+        if len(deadlines) < 3:
+          service._last_call.transport_error = socket.error('Reset.')
+          return Error('Connection reset.')
+        return {'entries': []}
+      return CallMethod
+
+    start_time = time.time()
+    with mock.patch.object(service, '_CreateMethod', CreateMethod):
+      self.assertEqual({'entries': []}, service.get({}))
+    stop_time = time.time()
+
+    self.assertEqual(3, len(deadlines))
+    self.assertEqual(1, len(set(deadlines)))
+    self.assertTrue(start_time + 5 <= deadlines[0] <= stop_time + 5)
+    self.assertEqual(None, service._call_timeouts.deadline)
+
+  def testCall_deadlineStopsRetries(self):
+    """Tests that a call is not retried past its deadline."""
+    service = CreateService({'retry_policy': RetryPolicy(10, 60),
+                             'call_timeout': 0.2})
+
+    def CreateMethod(unused_method_name):
+      def CallMethod(*unused_args):
+        service._last_call.transport_error = socket.error('Reset.')
+        return Error('Connection reset.')
+      return CallMethod
+
+    start_time = time.time()
+    with mock.patch.object(service, '_CreateMethod', CreateMethod):
+      self.assertTrue(isinstance(service.get({}), Error))
+    self.assertTrue(time.time() - start_time < 5)
+
+  def testCall_rateExceededBacksOff(self):
+    """Tests that a rate limit error pauses the rate limiter's keys."""
+    rate_limiter = mock.Mock()
+    service = CreateService({'rate_limiter': rate_limiter}, RateLimitedService)
+    service._LookUpMethod = mock.Mock(return_value=MethodInfo((), (), (), ()))
+
+    with mock.patch.object(RateLimitedService, '_soappyservice', mock.Mock()):
+      self.assertRaises(Error, service.get)
+
+    keys = [(RateLimiter.SERVICE, 'CampaignService')]
+    rate_limiter.Acquire.assert_called_once_with(keys, None)
+    rate_limiter.Backoff.assert_called_once_with(keys, 30, RateLimiter.SERVICE)
+    self.assertFalse(rate_limiter.Recover.called)
+
+  def testCall_rateLimitWaitBoundedByDeadline(self):
+    """Tests that a call does not wait for the rate limiter past its timeout."""
+    rate_limiter = RateLimiter.RateLimiter()
+    rate_limiter.Backoff([(RateLimiter.SERVICE, 'CampaignService')])
+    service = CreateService({'rate_limiter': rate_limiter, 'call_timeout': 1},
+                            RateLimitedService)
+    service._LookUpMethod = mock.Mock(return_value=MethodInfo((), (), (), ()))
+
+    start_time = time.time()
+    with mock.patch.object(RateLimitedService, '_soappyservice', mock.Mock()):
+      self.assertRaises(TimeoutError, service.get)
+    self.assertTrue(time.time() - start_time < 1)
+
 
 if __name__ == '__main__':
   unittest.main()
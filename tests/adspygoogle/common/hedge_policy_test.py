@@ -0,0 +1,147 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests to cover HedgePolicy."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import os
+import sys
+import thread
+import threading
+import time
+import unittest
+sys.path.insert(0, os.path.join('..', '..', '..'))
+
+from adspygoogle.common.Errors import Error
+from adspygoogle.common.HedgePolicy import HedgePolicy
+from adspygoogle.common.HedgePolicy import LatencyTracker
+
+
+class HedgePolicyTest(unittest.TestCase):
+
+  """Tests for the adspygoogle.common.HedgePolicy module."""
+
+  def _Warm(self, policy, key, latency):
+    tracker = policy._GetTracker(key)
+    for _ in range(20):
+      tracker.Add(latency)
+
+  def testLatencyTracker(self):
+    """Tests percentiles are only given once there are enough samples."""
+    tracker = LatencyTracker()
+    for latency in range(19):
+      tracker.Add(latency)
+    self.assertEqual(None, tracker.GetPercentile(95))
+    tracker.Add(19)
+    self.assertEqual(18, tracker.GetPercentile(95))
+    self.assertEqual(0, tracker.GetPercentile(0))
+
+  def testCall_coldMethodNotHedged(self):
+    """Tests that a method without latency history is called once."""
+    policy = HedgePolicy()
+    self.assertEqual(('ok', None), policy.Call('get', lambda: ('ok', None)))
+    self.assertEqual(0, policy.GetStats()['hedged'])
+
+  def testCall_firstAttemptOnCallingThread(self):
+    """Tests that a fast call is made once, on the calling thread."""
+    policy = HedgePolicy()
+    self._Warm(policy, 'get', 1)
+    threads = []
+
+    def Attempt():
+      threads.append(thread.get_ident())
+      return 'ok', None
+
+    self.assertEqual(('ok', None), policy.Call('get', Attempt))
+    self.assertEqual([thread.get_ident()], threads)
+    self.assertEqual(0, policy.GetStats()['hedged'])
+
+  def testCall_slowAttemptHedged(self):
+    """Tests that a slow attempt is hedged, cancelled and the hedge used."""
+    policy = HedgePolicy()
+    self._Warm(policy, 'get', 0.01)
+    cancelled = []
+    cancel = threading.Event()
+    attempts = []
+
+    def Attempt():
+      attempts.append(None)
+      if len(attempts) == 1:
+        cancel.wait(5)
+        return None, Error('Aborted.')
+      return 'fast', None
+
+    def Cancel(thread_id):
+      cancelled.append(thread_id)
+      cancel.set()
+
+    self.assertEqual(('fast', None), policy.Call('get', Attempt, Cancel))
+    self.assertEqual([thread.get_ident()], cancelled)
+    self.assertEqual({'calls': 1, 'hedged': 1, 'hedge_wins': 1},
+                     policy.GetStats())
+
+  def testCall_firstAttemptWinsAfterHedge(self):
+    """Tests that a first attempt which wins is used without the hedge."""
+    policy = HedgePolicy()
+    self._Warm(policy, 'get', 0.01)
+    hedge_sent = threading.Event()
+    release = threading.Event()
+    hedge_threads = []
+    cancelled = []
+
+    def Attempt():
+      if thread.get_ident() == caller:
+        hedge_sent.wait(5)
+        return 'first', None
+      hedge_threads.append(thread.get_ident())
+      hedge_sent.set()
+      release.wait(5)
+      return None, Error('Aborted.')
+
+    caller = thread.get_ident()
+    start_time = time.time()
+    try:
+      self.assertEqual(('first', None),
+                       policy.Call('get', Attempt, cancelled.append))
+      self.assertTrue(time.time() - start_time < 2)
+      self.assertFalse(release.isSet())
+      self.assertEqual(hedge_threads, cancelled)
+    finally:
+      release.set()
+    self.assertEqual({'calls': 1, 'hedged': 1, 'hedge_wins': 0},
+                     policy.GetStats())
+
+  def testCall_failedAttemptWaitsForOther(self):
+    """Tests that a failed attempt does not win over a pending one."""
+    policy = HedgePolicy()
+    self._Warm(policy, 'get', 0.01)
+    hedged = threading.Event()
+    attempts = []
+
+    def Attempt():
+      attempts.append(None)
+      if len(attempts) == 1:
+        hedged.wait(5)
+        return None, Error('Failed.')
+      hedged.set()
+      return 'ok', None
+
+    self.assertEqual(('ok', None), policy.Call('get', Attempt))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests to cover OperationChunker."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.join('..', '..', '..'))
+
+from adspygoogle.common import OperationChunker
+
+
+class OperationChunkerTest(unittest.TestCase):
+
+  """Tests for the adspygoogle.common.OperationChunker module."""
+
+  def testSplitOperations_maxOps(self):
+    """Tests that chunks hold at most max_ops operations."""
+    self.assertEqual([(0, [0, 1]), (2, [2, 3]), (4, [4])],
+                     OperationChunker.SplitOperations(range(5), 2))
+    self.assertEqual([], OperationChunker.SplitOperations([], 2))
+    self.assertRaises(ValueError, OperationChunker.SplitOperations, [1], 0)
+
+  def testSplitOperations_maxBytes(self):
+    """Tests that chunks stay under max_bytes, oversized operations alone."""
+    self.assertEqual(
+        [(0, ['a', 'b']), (2, ['c']), (3, ['d', 'e'])],
+        OperationChunker.SplitOperations(['a', 'b', 'c', 'd', 'e'], 10, 10,
+                                         [4, 6, 12, 5, 5]))
+
+  def testMergeResults_lists(self):
+    """Tests that list results are concatenated, failed chunks as None."""
+    self.assertEqual((1, 2, None, None, 3), OperationChunker.MergeResults(
+        [(1, 2), None, (3,)], [2, 2, 1], True, True))
+    self.assertEqual([1, 2, 3], OperationChunker.MergeResults(
+        [[1, 2], [3]], [2, 1], True, False))
+
+  def testMergeResults_returnValues(self):
+    """Tests that list fields of return values are concatenated."""
+    self.assertEqual(
+        ({'value': [1, 2, None, 3],
+          'partialFailureErrors': [{'fieldPath': 'a'}],
+          'ListReturnValue.Type': 'CampaignReturnValue'},),
+        OperationChunker.MergeResults(
+            [({'value': [1, 2], 'partialFailureErrors': [],
+               'ListReturnValue.Type': 'CampaignReturnValue'},),
+             None,
+             ({'value': [3], 'partialFailureErrors': [{'fieldPath': 'a'}],
+               'ListReturnValue.Type': 'CampaignReturnValue'},)],
+            [2, 1, 1], False, True))
+    self.assertEqual({'id': '1'}, OperationChunker.MergeResults(
+        [{'id': '1'}, None], [1, 1], False, False))
+    self.assertEqual(None, OperationChunker.MergeResults([None], [1], False,
+                                                         True))
+
+  def testOffsetFieldPath(self):
+    """Tests that the leading operation index is shifted."""
+    self.assertEqual('operations[5003].operand.criteria[1].text',
+                     OperationChunker.OffsetFieldPath(
+                         'operations[3].operand.criteria[1].text', 5000))
+    self.assertEqual('operand.name',
+                     OperationChunker.OffsetFieldPath('operand.name', 5000))
+
+
+if __name__ == '__main__':
+  unittest.main()
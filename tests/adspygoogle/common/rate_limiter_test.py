@@ -0,0 +1,118 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests to cover RateLimiter."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.join('..', '..', '..'))
+
+import mock
+
+from adspygoogle.common import RateLimiter
+from adspygoogle.common.Errors import TimeoutError
+
+
+class TokenBucketTest(unittest.TestCase):
+
+  """Tests for the adspygoogle.common.RateLimiter.TokenBucket class."""
+
+  def setUp(self):
+    self.now = [1000.0]
+    self.sleeps = []
+
+    def Sleep(seconds):
+      self.sleeps.append(seconds)
+      self.now[0] += seconds
+
+    self.time_patcher = mock.patch('time.time', lambda: self.now[0])
+    self.sleep_patcher = mock.patch('time.sleep', Sleep)
+    self.time_patcher.start()
+    self.sleep_patcher.start()
+
+  def tearDown(self):
+    self.time_patcher.stop()
+    self.sleep_patcher.stop()
+
+  def testAcquire_limitsRate(self):
+    """Tests that calls past the burst wait for tokens to be added."""
+    bucket = RateLimiter.TokenBucket(2)
+    self.assertEqual(0, bucket.Acquire())
+    self.assertEqual(0, bucket.Acquire())
+    self.assertEqual(0.5, bucket.Acquire())
+    self.assertEqual([0.5], self.sleeps)
+
+  def testAcquire_unlimited(self):
+    """Tests that a bucket without a rate never waits."""
+    bucket = RateLimiter.TokenBucket()
+    for _ in range(100):
+      self.assertEqual(0, bucket.Acquire())
+
+  def testBackoffAndRecover(self):
+    """Tests that a backoff pauses and slows the bucket until it recovers."""
+    bucket = RateLimiter.TokenBucket(10)
+    bucket.Backoff(30)
+    self.assertEqual(5, bucket.GetRate())
+    self.assertTrue(bucket.Acquire() >= 30)
+
+    for _ in range(5):
+      bucket.Backoff(0)
+    self.assertEqual(1, bucket.GetRate())
+
+    for _ in range(100):
+      bucket.Recover()
+    self.assertEqual(10, bucket.GetRate())
+
+  def testAcquire_deadline(self):
+    """Tests that a call is not held past its deadline."""
+    bucket = RateLimiter.TokenBucket()
+    bucket.Backoff(30)
+    self.assertRaises(TimeoutError, bucket.Acquire, self.now[0] + 5)
+    self.assertEqual([], self.sleeps)
+    self.assertEqual(30, bucket.Acquire(self.now[0] + 31))
+
+    limiter = RateLimiter.RateLimiter()
+    keys = [(RateLimiter.SERVICE, 'CampaignService')]
+    limiter.Backoff(keys)
+    self.assertRaises(TimeoutError, limiter.Acquire, keys, self.now[0] + 5)
+    self.assertEqual([30], self.sleeps)
+
+
+class RateLimiterTest(unittest.TestCase):
+
+  """Tests for the adspygoogle.common.RateLimiter.RateLimiter class."""
+
+  def testBackoff_scope(self):
+    """Tests that only the buckets of the exceeded scope are backed off."""
+    limiter = RateLimiter.RateLimiter({RateLimiter.TOKEN: 10,
+                                       RateLimiter.CUSTOMER: 4})
+    keys = [(RateLimiter.TOKEN, 'token'), (RateLimiter.CUSTOMER, '123'),
+            (RateLimiter.SERVICE, 'CampaignService')]
+    limiter.Acquire(keys)
+    limiter.Backoff(keys, 0, RateLimiter.CUSTOMER)
+
+    stats = limiter.GetStats()
+    self.assertEqual({(RateLimiter.TOKEN, 'token'): 10,
+                      (RateLimiter.CUSTOMER, '123'): 2}, stats['rates'])
+    self.assertEqual(1, stats['calls'])
+    self.assertEqual(1, stats['backoffs'])
+
+
+if __name__ == '__main__':
+  unittest.main()
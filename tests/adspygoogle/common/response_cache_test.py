@@ -0,0 +1,116 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests to cover ResponseCache."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.join('..', '..', '..'))
+
+import mock
+
+from adspygoogle.common import ResponseCache
+
+
+SCOPE = ('CampaignService', '123-456-7890')
+
+
+class ResponseCacheTest(unittest.TestCase):
+
+  """Tests for the adspygoogle.common.ResponseCache module."""
+
+  def testIsCacheableMethod(self):
+    """Tests that only entity reads are cached."""
+    self.assertTrue(ResponseCache.IsCacheableMethod('get'))
+    self.assertTrue(ResponseCache.IsCacheableMethod('query'))
+    self.assertTrue(ResponseCache.IsCacheableMethod('getLineItemsByStatement'))
+    self.assertFalse(ResponseCache.IsCacheableMethod('getReportJob'))
+    self.assertFalse(ResponseCache.IsCacheableMethod('mutate'))
+
+  def testGet_copiesAndExpires(self):
+    """Tests that responses are copied and expire after their ttl."""
+    cache = ResponseCache.ResponseCache(60)
+    response = {'entries': [{'id': '1'}]}
+    with mock.patch('time.time') as time_:
+      time_.return_value = 1000
+      cache.Put('key', SCOPE, response, 10, 60)
+      response['entries'].append({'id': '2'})
+      found, cached = cache.Get('key')
+      self.assertTrue(found)
+      self.assertEqual({'entries': [{'id': '1'}]}, cached)
+      cached['entries'] = []
+      self.assertEqual({'entries': [{'id': '1'}]}, cache.Get('key')[1])
+
+      time_.return_value = 1060
+      self.assertEqual((False, None), cache.Get('key'))
+    self.assertEqual(0, cache.GetStats()['bytes'])
+
+  def testPut_evictsLeastRecentlyUsed(self):
+    """Tests that the least recently used responses make room."""
+    cache = ResponseCache.ResponseCache(60, max_entries=2, max_bytes=25)
+    cache.Put('a', SCOPE, 'a', 10, 60)
+    cache.Put('b', SCOPE, 'b', 10, 60)
+    cache.Get('a')
+    cache.Put('c', SCOPE, 'c', 10, 60)
+    self.assertFalse(cache.Get('b')[0])
+    self.assertTrue(cache.Get('a')[0])
+    cache.Put('d', SCOPE, 'd', 10, 60)
+    self.assertEqual(2, cache.GetStats()['entries'])
+    self.assertEqual(20, cache.GetStats()['bytes'])
+    cache.Put('e', SCOPE, 'e', 30, 60)
+    self.assertFalse(cache.Get('e')[0])
+
+  def testInvalidate(self):
+    """Tests that responses are dropped by service and customer."""
+    cache = ResponseCache.ResponseCache(60)
+    cache.Put('a', SCOPE, 'a', 1, 60)
+    cache.Put('b', ('CampaignService', '999'), 'b', 1, 60)
+    cache.Put('c', ('AdGroupService', '123-456-7890'), 'c', 1, 60)
+    generation = cache.GetGeneration(SCOPE)
+    other_generation = cache.GetGeneration(('CampaignService', '999'))
+    cache.Invalidate(*SCOPE)
+    self.assertFalse(cache.Get('a')[0])
+    self.assertTrue(cache.Get('b')[0])
+    self.assertTrue(cache.Get('c')[0])
+    # A response read before the invalidation of its scope is not kept.
+    cache.Put('a', SCOPE, 'a', 1, 60, generation)
+    self.assertFalse(cache.Get('a')[0])
+    # Responses of other scopes still are.
+    cache.Put('d', ('CampaignService', '999'), 'd', 1, 60, other_generation)
+    self.assertTrue(cache.Get('d')[0])
+    generation = cache.GetGeneration(SCOPE)
+    cache.Invalidate(customer='999')
+    self.assertEqual(generation, cache.GetGeneration(SCOPE))
+    self.assertNotEqual(other_generation,
+                        cache.GetGeneration(('CampaignService', '999')))
+    cache.Invalidate()
+    self.assertEqual(0, cache.GetStats()['entries'])
+
+  def testSetTtl(self):
+    """Tests per-service times to live."""
+    cache = ResponseCache.ResponseCache()
+    self.assertEqual(0, cache.GetTtl('CampaignService'))
+    cache.SetTtl('CampaignService', 30)
+    self.assertEqual(30, cache.GetTtl('CampaignService'))
+    cache.SetTtl('CampaignService', None)
+    self.assertEqual(0, cache.GetTtl('CampaignService'))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,127 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests to cover RetryPolicy."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import os
+import socket
+import sys
+import unittest
+sys.path.insert(0, os.path.join('..', '..', '..'))
+
+import mock
+
+from adspygoogle.common import Utils
+from adspygoogle.common.Errors import Error
+from adspygoogle.common.Errors import ValidationError
+from adspygoogle.common.RetryPolicy import RetryPolicy
+
+
+def IsTransient(error):
+  return isinstance(error, (socket.error, Error)) and not isinstance(
+      error, ValidationError)
+
+
+class RetryPolicyTest(unittest.TestCase):
+
+  """Tests for the adspygoogle.common.RetryPolicy module."""
+
+  def setUp(self):
+    self.sleep_patcher = mock.patch('time.sleep')
+    self.sleep = self.sleep_patcher.start()
+
+  def tearDown(self):
+    self.sleep_patcher.stop()
+
+  def testCall_recovers(self):
+    """Tests that transient errors, raised or returned, are retried."""
+    call = mock.Mock(side_effect=[socket.error('Reset.'), Error('502'), 'ok'])
+    policy = RetryPolicy(3)
+
+    self.assertEqual('ok', policy.Call('get', call, ('selector',), IsTransient))
+    self.assertEqual(3, call.call_count)
+    self.assertEqual(2, self.sleep.call_count)
+    self.assertEqual({'calls': 1, 'retries': 2, 'recovered': 1,
+                      'exhausted': 0}, policy.GetStats())
+
+  def testCall_exhausted(self):
+    """Tests that the last error is raised once out of retries."""
+    call = mock.Mock(side_effect=socket.error('Reset.'))
+    policy = RetryPolicy(2)
+
+    self.assertRaises(socket.error, policy.Call, 'query', call, (),
+                      IsTransient)
+    self.assertEqual(3, call.call_count)
+    self.assertEqual(1, policy.GetStats()['exhausted'])
+
+  def testCall_deadline(self):
+    """Tests that backoffs stop at the deadline, and retries past it."""
+    call = mock.Mock(side_effect=[Error('502'), Error('503'), 'ok'])
+    policy = RetryPolicy(3, base_delay=60)
+    policy.GetDelay = mock.Mock(return_value=30)
+    with mock.patch('time.time') as time_:
+      time_.return_value = 100
+
+      self.assertEqual('ok', policy.Call('get', call, (), IsTransient, 110))
+      self.sleep.assert_called_with(10)
+
+      call = mock.Mock(side_effect=socket.error('Reset.'))
+      self.assertRaises(socket.error, policy.Call, 'get', call, (),
+                        IsTransient, 100)
+      self.assertEqual(1, call.call_count)
+
+      call = mock.Mock(return_value=Error('502'))
+      self.assertTrue(isinstance(
+          policy.Call('get', call, (), IsTransient, 99), Error))
+      self.assertEqual(1, call.call_count)
+    self.assertEqual(2, policy.GetStats()['exhausted'])
+
+  def testCall_notRetried(self):
+    """Tests that mutates and permanent errors are not retried."""
+    call = mock.Mock(side_effect=socket.error('Reset.'))
+    self.assertRaises(socket.error, RetryPolicy(3).Call, 'mutate', call, (),
+                      IsTransient)
+    self.assertEqual(1, call.call_count)
+
+    call = mock.Mock(side_effect=ValidationError('Invalid.'))
+    self.assertRaises(ValidationError, RetryPolicy(3).Call, 'get', call, (),
+                      IsTransient)
+    self.assertEqual(1, call.call_count)
+
+    call = mock.Mock(side_effect=[socket.error('Reset.'), 'ok'])
+    self.assertEqual('ok', RetryPolicy(3, retry_mutates=True).Call(
+        'mutate', call, (), IsTransient))
+
+  def testGetDelay(self):
+    """Tests that backoffs grow exponentially up to a cap."""
+    policy = RetryPolicy(base_delay=2)
+    for retry in range(10):
+      delay = policy.GetDelay(retry)
+      self.assertTrue(0 <= delay <= min(60, 2 * 2 ** retry))
+
+  def testIsReadOnlyMethod(self):
+    """Tests the methods which are considered read-only."""
+    self.assertTrue(Utils.IsReadOnlyMethod('get'))
+    self.assertTrue(Utils.IsReadOnlyMethod('GetLineItemsByStatement'))
+    self.assertTrue(Utils.IsReadOnlyMethod('query'))
+    self.assertFalse(Utils.IsReadOnlyMethod('mutate'))
+    self.assertFalse(Utils.IsReadOnlyMethod('createLineItems'))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,108 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests to cover Serializers."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import os
+import StringIO
+import sys
+import unittest
+sys.path.insert(0, os.path.join('..', '..', '..'))
+
+from adspygoogle import SOAPpy
+from adspygoogle.common import MessageHandler
+from adspygoogle.common.soappy import Serializers
+
+
+# Location of a cached WSDL to generate serializers for.
+WSDL_FILE_LOCATION = os.path.join('..', 'adwords', 'data',
+                                  'campaign_service.wsdl')
+VERSION = 'v201306'
+NS = 'https://adwords.google.com/api/adwords/cm/' + VERSION
+PREFIX_FUNCTION = lambda ns: 'cm:'
+CAMPAIGN = {
+    'name': 'Interplanetary Cruise & Co',
+    'status': 'PAUSED',
+    'budget': {
+        'period': 'DAILY',
+        'amount': {'microAmount': '50000000'},
+        'deliveryMethod': 'STANDARD'
+    },
+    'settings': [{
+        'xsi_type': 'KeywordMatchSetting',
+        'optIn': 'false'
+    }],
+    'id': None
+}
+
+
+class SerializersTest(unittest.TestCase):
+
+  """Tests for the adspygoogle.common.soappy.Serializers module."""
+
+  def setUp(self):
+    wsdl_data = open(WSDL_FILE_LOCATION).read() % {'version': VERSION}
+    self.service = SOAPpy.WSDL.Proxy(StringIO.StringIO(wsdl_data))
+
+  def assertPackedEqual(self, expected, packed):
+    """Asserts that two packed objects are alike."""
+    if isinstance(expected, list):
+      self.assertEqual(len(expected), len(packed))
+      for i in range(len(expected)):
+        self.assertPackedEqual(expected[i], packed[i])
+    elif isinstance(expected, SOAPpy.Types.structType):
+      self.assertTrue(isinstance(packed, SOAPpy.Types.structType))
+      self.assertEqual(expected._typename, packed._typename)
+      self.assertEqual(expected._keyord, packed._keyord)
+      self.assertEqual(expected._attrs, packed._attrs)
+      for key in expected._keyord:
+        self.assertPackedEqual(getattr(expected, key), getattr(packed, key))
+    else:
+      self.assertEqual(expected._data, packed._data)
+
+  def testPackForSoappy_sameAsSchemaLookups(self):
+    """Tests that serializers pack objects like the schema lookups do."""
+    serializers = Serializers.GetSerializerSet(self.service)
+    self.assertTrue(serializers.Get(NS, 'Campaign') is not None)
+
+    expected = MessageHandler.PackForSoappy(
+        CAMPAIGN, NS, 'Campaign', self.service, False, PREFIX_FUNCTION)
+    packed = MessageHandler.PackForSoappy(
+        CAMPAIGN, NS, 'Campaign', self.service, False, PREFIX_FUNCTION,
+        serializers)
+    self.assertPackedEqual(expected, packed)
+    self.assertEqual('Interplanetary Cruise &amp; Co', packed._asdict()[
+        'cm:name']._data)
+
+  def testPackForSoappy_unknownField(self):
+    """Tests that a key which is not a field of the type is rejected."""
+    serializers = Serializers.GetSerializerSet(self.service)
+    self.assertRaises(TypeError, MessageHandler.PackForSoappy,
+                      {'nmae': 'Campaign #1'}, NS, 'Campaign', self.service,
+                      False, PREFIX_FUNCTION, serializers)
+
+  def testGenerateSource(self):
+    """Tests that the generated source can be written out as a module."""
+    source = Serializers.GenerateSource(self.service)
+    module = {}
+    exec compile(source, 'serializers.py', 'exec') in module
+    self.assertTrue((NS, 'Campaign') in module['SERIALIZERS'])
+
+
+if __name__ == '__main__':
+  unittest.main()
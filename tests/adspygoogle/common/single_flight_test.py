@@ -0,0 +1,93 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests to cover SingleFlight."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import os
+import sys
+import threading
+import unittest
+sys.path.insert(0, os.path.join('..', '..', '..'))
+
+from adspygoogle.common.Errors import TimeoutError
+from adspygoogle.common.SingleFlight import SingleFlight
+
+
+class SingleFlightTest(unittest.TestCase):
+
+  """Tests for the adspygoogle.common.SingleFlight module."""
+
+  def testCall_identicalCallsCoalesced(self):
+    """Tests that calls made during an identical call share its outcome."""
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    attempts = []
+    outcomes = []
+
+    def Attempt():
+      attempts.append(None)
+      started.set()
+      release.wait(5)
+      return 'ok', None
+
+    def Leader():
+      outcomes.append(flight.Call('key', Attempt))
+
+    leader = threading.Thread(target=Leader)
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=Leader) for _ in range(3)]
+    for follower in followers:
+      follower.start()
+    while flight.GetStats()['calls'] < 4:
+      threading.Event().wait(0.01)
+    release.set()
+    leader.join(5)
+    for follower in followers:
+      follower.join(5)
+
+    self.assertEqual(1, len(attempts))
+    self.assertEqual(1, outcomes.count((('ok', None), True)))
+    self.assertEqual(3, outcomes.count((('ok', None), False)))
+    self.assertEqual({'calls': 4, 'coalesced': 3}, flight.GetStats())
+    # The next call sends a request of its own.
+    self.assertEqual((('again', None), True),
+                     flight.Call('key', lambda: ('again', None)))
+
+  def testCall_followerTimesOut(self):
+    """Tests that a waiting call gives up after its timeout."""
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def Attempt():
+      started.set()
+      release.wait(5)
+      return 'ok', None
+
+    leader = threading.Thread(target=flight.Call, args=('key', Attempt))
+    leader.start()
+    started.wait(5)
+    self.assertRaises(TimeoutError, flight.Call, 'key', Attempt, 0.01)
+    release.set()
+    leader.join(5)
+
+
+if __name__ == '__main__':
+  unittest.main()
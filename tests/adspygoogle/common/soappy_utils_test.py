@@ -0,0 +1,113 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests to cover SoappyUtils."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import os
+import StringIO
+import sys
+import unittest
+sys.path.insert(0, os.path.join('..', '..', '..'))
+
+import mock
+
+from adspygoogle import SOAPpy
+from adspygoogle.common.soappy import SoappyUtils
+
+
+# Location of a cached WSDL to build the type index from.
+WSDL_FILE_LOCATION = os.path.join('..', 'adwords', 'data',
+                                  'campaign_service.wsdl')
+VERSION = 'v201306'
+NS = 'https://adwords.google.com/api/adwords/cm/' + VERSION
+
+
+class SoappyUtilsTest(unittest.TestCase):
+
+  """Tests for the adspygoogle.common.soappy.SoappyUtils module."""
+
+  def setUp(self):
+    wsdl_data = open(WSDL_FILE_LOCATION).read() % {'version': VERSION}
+    self.service = SOAPpy.WSDL.Proxy(StringIO.StringIO(wsdl_data))
+
+  def testGetTypeIndex_sharedByWsdl(self):
+    """Tests that services sharing a parsed WSDL share its index."""
+    view = mock.Mock()
+    view.wsdl = self.service.wsdl
+    self.assertTrue(SoappyUtils.GetTypeIndex(self.service) is
+                    SoappyUtils.GetTypeIndex(view))
+
+  def testTypeIndex_matchesWalks(self):
+    """Tests that the index agrees with walking the schema for every type."""
+    for ns in self.service.wsdl.types.keys():
+      for name in self.service.wsdl.types[ns].types.keys():
+        self.assertEqual(
+            SoappyUtils._WalkArrayItemTypeName(name, ns, self.service),
+            SoappyUtils.GetArrayItemTypeName(name, ns, self.service))
+        self.assertEqual(
+            SoappyUtils._WalkIsAnArrayType(name, ns, self.service),
+            SoappyUtils.IsAnArrayType(name, ns, self.service))
+        info = SoappyUtils.GetTypeIndex(self.service).GetTypeInfo(ns, name)
+        if info.key_order_attrs is None:
+          continue
+        walked = SoappyUtils._WalkKeyOrderAttrs(self.service, ns, name)
+        self.assertEqual(walked, list(
+            SoappyUtils.GenKeyOrderAttrs(self.service, ns, name)))
+        for attributes in walked:
+          self.assertEqual(
+              SoappyUtils._WalkFieldNamespace(attributes['name'], name, ns,
+                                              self.service),
+              SoappyUtils.GetComplexFieldNamespaceByFieldName(
+                  attributes['name'], name, ns, self.service))
+
+  def testGetComplexFieldTypeByFieldName(self):
+    """Tests field lookups, including inherited and missing fields."""
+    self.assertEqual('long', SoappyUtils.GetComplexFieldTypeByFieldName(
+        'id', 'Campaign', NS, self.service).getName())
+    self.assertEqual('int', SoappyUtils.GetComplexFieldTypeByFieldName(
+        'totalNumEntries', 'CampaignPage', NS, self.service).getName())
+    self.assertRaises(TypeError, SoappyUtils.GetComplexFieldTypeByFieldName,
+                      'missing', 'Campaign', NS, self.service)
+    self.assertRaises(TypeError,
+                      SoappyUtils.GetComplexFieldNamespaceByFieldName,
+                      'missing', 'Campaign', NS, self.service)
+
+  def testIsASuperType(self):
+    """Tests subtype checks through the indexed ancestors."""
+    self.assertEqual(frozenset(['LongValue', 'NumberValue', 'ComparableValue']),
+                     SoappyUtils.GetTypeIndex(self.service).GetAncestors(
+                         NS, 'LongValue'))
+    self.assertTrue(SoappyUtils.IsASuperType(self.service, 'LongValue', NS,
+                                             'ComparableValue'))
+    self.assertFalse(SoappyUtils.IsASuperType(self.service, 'Money', NS,
+                                              'NumberValue'))
+    self.assertFalse(SoappyUtils.IsASuperType(self.service, 'Missing', NS,
+                                              'NumberValue'))
+
+  def testGetConcreteSubTypes(self):
+    """Tests that abstract types are left out of the concrete subtypes."""
+    self.assertEqual(
+        frozenset(['DoubleValue', 'LongValue', 'Money']),
+        SoappyUtils.GetConcreteSubTypes('ComparableValue', NS, self.service))
+    self.assertEqual(
+        frozenset(['Money']),
+        SoappyUtils.GetConcreteSubTypes('Money', NS, self.service))
+
+
+if __name__ == '__main__':
+  unittest.main()
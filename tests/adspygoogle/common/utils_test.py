@@ -90,6 +90,17 @@ class UtilsTest(unittest.TestCase):
 
     self.assertEqual(trigger_msg, Utils.GetErrorFromHtml(TEST_502))
 
+  def testGetCanonicalDigest(self):
+    """Tests that objects sent alike have the same digest."""
+    self.assertEqual(
+        Utils.GetCanonicalDigest(({'fields': ['Id', 'Name'], 'paging': None,
+                                   'ordering': ({'field': 'Id'},)},)),
+        Utils.GetCanonicalDigest(({'ordering': [{'field': u'Id'}],
+                                   'fields': ('Id', 'Name')},)))
+    self.assertNotEqual(
+        Utils.GetCanonicalDigest(({'fields': ['Id', 'Name']},)),
+        Utils.GetCanonicalDigest(({'fields': ['Name', 'Id']},)))
+
 
 if __name__ == '__main__':
   unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests to cover Validators."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import os
+import StringIO
+import sys
+import unittest
+sys.path.insert(0, os.path.join('..', '..', '..'))
+
+from adspygoogle import SOAPpy
+from adspygoogle.common import SanityCheck
+from adspygoogle.common.Errors import ValidationError
+from adspygoogle.common.soappy import Validators
+
+
+# Location of a cached WSDL to generate validators for.
+WSDL_FILE_LOCATION = os.path.join('..', 'adwords', 'data',
+                                  'campaign_service.wsdl')
+VERSION = 'v201306'
+NS = 'https://adwords.google.com/api/adwords/cm/' + VERSION
+
+
+class ValidatorsTest(unittest.TestCase):
+
+  """Tests for the adspygoogle.common.soappy.Validators module."""
+
+  def setUp(self):
+    wsdl_data = open(WSDL_FILE_LOCATION).read() % {'version': VERSION}
+    self.service = SOAPpy.WSDL.Proxy(StringIO.StringIO(wsdl_data))
+    self.validators = Validators.GetValidatorSet(self.service)
+
+  def assertSameError(self, obj, type_name):
+    """Asserts that the validators reject an object like SanityCheck does."""
+    try:
+      SanityCheck.SoappySanityCheck(self.service, obj, NS, type_name)
+      self.fail('SanityCheck accepted %s' % obj)
+    except ValidationError, e:
+      expected = str(e)
+    try:
+      SanityCheck.SoappySanityCheck(self.service, obj, NS, type_name,
+                                    validators=self.validators)
+      self.fail('The validators accepted %s' % obj)
+    except ValidationError, e:
+      self.assertEqual(expected, str(e))
+
+  def testSoappySanityCheck_valid(self):
+    """Tests that the validators accept a valid object."""
+    self.assertTrue(self.validators.Get(NS, 'Campaign') is not None)
+    SanityCheck.SoappySanityCheck(
+        self.service,
+        {'name': 'Campaign #1', 'status': 'PAUSED', 'id': None,
+         'budget': {'period': 'DAILY', 'amount': {'microAmount': '5000'}},
+         'settings': [{'xsi_type': 'KeywordMatchSetting', 'optIn': 'false'}]},
+        NS, 'Campaign', validators=self.validators)
+
+  def testSoappySanityCheck_sameErrors(self):
+    """Tests that the validators report errors like SanityCheck does."""
+    self.assertSameError({'nmae': 'Campaign #1'}, 'Campaign')
+    self.assertSameError({'id': 1}, 'Campaign')
+    self.assertSameError({'settings': {'optIn': 'false'}}, 'Campaign')
+    self.assertSameError({'budget': {'amount': {'microAmount': 5000}}},
+                         'Campaign')
+    self.assertSameError(
+        {'settings': [{'xsi_type': 'KeywordMatchSetting', 'optIn': 0}]},
+        'Campaign')
+
+
+if __name__ == '__main__':
+  unittest.main()
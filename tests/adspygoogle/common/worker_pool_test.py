@@ -0,0 +1,80 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests to cover WorkerPool."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import os
+import sys
+import threading
+import unittest
+sys.path.insert(0, os.path.join('..', '..', '..'))
+
+from adspygoogle.common.Errors import Error
+from adspygoogle.common.WorkerPool import WorkerPool
+
+
+class WorkerPoolTest(unittest.TestCase):
+
+  """Tests for the adspygoogle.common.WorkerPool module."""
+
+  def testSubmit_result(self):
+    """Tests that a future holds the value returned by the call."""
+    pool = WorkerPool(2)
+    futures = [pool.Submit(lambda x, y: x * y, i, 2) for i in range(20)]
+    self.assertEqual([i * 2 for i in range(20)],
+                     [future.Result(5) for future in futures])
+    self.assertTrue(len(pool._workers) <= 2)
+
+  def testSubmit_error(self):
+    """Tests that a future re-raises the error raised by the call."""
+    def Fail():
+      raise Error('Failed.')
+    future = WorkerPool(1).Submit(Fail)
+    self.assertRaises(Error, future.Result, 5)
+    self.assertTrue(isinstance(future.GetError(), Error))
+
+  def testResult_timeout(self):
+    """Tests that Result gives up after the timeout."""
+    event = threading.Event()
+    future = WorkerPool(1).Submit(event.wait)
+    self.assertRaises(Error, future.Result, 0.01)
+    self.assertFalse(future.Done())
+    event.set()
+    future.Result(5)
+
+  def testAddDoneCallback(self):
+    """Tests that callbacks run once the call completes."""
+    event = threading.Event()
+    called = threading.Event()
+    futures = []
+
+    def Callback(future):
+      futures.append(future)
+      called.set()
+
+    future = WorkerPool(1).Submit(event.wait)
+    future.AddDoneCallback(Callback)
+    self.assertFalse(called.isSet())
+    event.set()
+    called.wait(5)
+    future.AddDoneCallback(futures.append)
+    self.assertEqual([future, future], futures)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,120 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests to cover WsdlCache."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import mimetools
+import os
+import shutil
+import StringIO
+import sys
+import tempfile
+import unittest
+sys.path.insert(0, os.path.join('..', '..', '..'))
+
+import mock
+
+from adspygoogle.common.Errors import Error
+from adspygoogle.common.WsdlCache import WsdlCache
+
+
+URL = 'https://adwords.google.com/api/adwords/cm/v201309/CampaignService?wsdl'
+
+
+def Response(body, headers):
+  """Returns a fake response of urllib.URLopener.open."""
+  response = mock.Mock()
+  response.read.return_value = body
+  response.info.return_value = mimetools.Message(StringIO.StringIO(
+      ''.join(['%s: %s\r\n' % header for header in headers.items()])))
+  return response
+
+
+class WsdlCacheTest(unittest.TestCase):
+
+  """Tests for the adspygoogle.common.WsdlCache module."""
+
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    self.opener_patcher = mock.patch('urllib.URLopener')
+    self.opener = self.opener_patcher.start().return_value
+
+  def tearDown(self):
+    self.opener_patcher.stop()
+    shutil.rmtree(self.directory)
+
+  def testFetch_revalidates(self):
+    """Tests that a cached WSDL is revalidated and reused when unchanged."""
+    self.opener.open.return_value = Response('<wsdl/>', {'ETag': '"v1"'})
+    self.assertEqual('<wsdl/>', WsdlCache(self.directory).Fetch(URL))
+
+    self.opener.open.side_effect = IOError('http error', 304, 'Not Modified',
+                                           None)
+    cache = WsdlCache(self.directory)
+    self.assertEqual('<wsdl/>', cache.Fetch(URL))
+    self.opener.addheader.assert_called_with('If-None-Match', '"v1"')
+    self.assertEqual(1, cache.GetStats()['revalidated'])
+
+  def testFetch_serverUnreachable(self):
+    """Tests that a cached WSDL is used when the server cannot be reached."""
+    self.opener.open.side_effect = IOError('socket error', 'Refused.')
+    cache = WsdlCache(self.directory)
+    self.assertRaises(Error, cache.Fetch, URL)
+
+    self.opener.open.side_effect = None
+    self.opener.open.return_value = Response('<wsdl/>', {})
+    cache.Fetch(URL)
+    self.opener.open.side_effect = IOError('socket error', 'Refused.')
+    self.assertEqual('<wsdl/>', cache.Fetch(URL))
+    self.assertEqual(1, cache.GetStats()['stale'])
+
+  def testFetch_offline(self):
+    """Tests that offline mode never contacts the server."""
+    cache = WsdlCache(self.directory, offline=True)
+    self.assertRaises(Error, cache.Fetch, URL)
+
+    self.opener.open.return_value = Response('<wsdl/>', {})
+    WsdlCache(self.directory).Fetch(URL)
+    self.opener.open.reset_mock()
+    self.assertEqual('<wsdl/>', cache.Fetch(URL))
+    self.assertFalse(self.opener.open.called)
+
+  def testFetch_storesPlainText(self):
+    """Tests that entries are plain text and other files are ignored."""
+    self.opener.open.return_value = Response('<wsdl/>', {'ETag': '"v1"'})
+    WsdlCache(self.directory).Fetch(URL)
+    [name] = os.listdir(self.directory)
+    path = os.path.join(self.directory, name)
+    cache_file = open(path, 'rb')
+    try:
+      self.assertEqual('URL: %s\r\nETag: "v1"\r\n\r\n<wsdl/>' % URL,
+                       cache_file.read())
+    finally:
+      cache_file.close()
+
+    cache_file = open(path, 'wb')
+    try:
+      cache_file.write('(dp0\nS\'url\'\np1\n.')
+    finally:
+      cache_file.close()
+    self.assertRaises(Error, WsdlCache(self.directory, offline=True).Fetch,
+                      URL)
+
+
+if __name__ == '__main__':
+  unittest.main()
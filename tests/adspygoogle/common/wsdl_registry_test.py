@@ -0,0 +1,105 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests to cover WsdlRegistry."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.join('..', '..', '..'))
+
+import mock
+
+from adspygoogle.common import WsdlSnapshot
+from adspygoogle.common.WsdlRegistry import WsdlRegistry
+
+
+URL = 'https://adwords.google.com/api/adwords/cm/v201309/CampaignService'
+SANDBOX_URL = ('https://adwords-sandbox.google.com/api/adwords/cm/v201309/'
+               'CampaignService')
+SNAPSHOT_KEY = ('adspygoogle.adwords', 'v201309', 'CampaignService')
+
+
+class WsdlRegistryTest(unittest.TestCase):
+
+  """Tests for the adspygoogle.common.WsdlRegistry module."""
+
+  def setUp(self):
+    self.proxy_patcher = mock.patch('adspygoogle.SOAPpy.WSDL.Proxy')
+    self.proxy_class = self.proxy_patcher.start()
+    self.proxy_class.return_value.methods = {'get': mock.Mock()}
+    self.soapproxy_patcher = mock.patch('adspygoogle.SOAPpy.SOAPProxy')
+    self.soapproxy_class = self.soapproxy_patcher.start()
+    self.soapproxy_class.side_effect = lambda *args, **kw: mock.Mock()
+
+  def tearDown(self):
+    self.proxy_patcher.stop()
+    self.soapproxy_patcher.stop()
+
+  def testGetProxy_parsesOnce(self):
+    """Tests that views of a URL share one parse but not their SOAP proxy."""
+    registry = WsdlRegistry()
+    first = registry.GetProxy(URL, 'config1', noroot=1)
+    second = registry.GetProxy(URL, 'config2', noroot=1)
+
+    self.proxy_class.assert_called_once_with(URL + '?wsdl', noroot=1)
+    self.assertTrue(first.wsdl is second.wsdl)
+    self.assertTrue(first.methods is second.methods)
+    self.assertFalse(first.soapproxy is second.soapproxy)
+    self.assertEqual(URL, first.methods['get'].location)
+    self.assertEqual({'parses': 1, 'hits': 1, 'snapshot_parses': 0},
+                     registry.GetStats())
+
+  def testGetProxy_snapshot(self):
+    """Tests that a WSDL in a snapshot is parsed without downloading it."""
+    registry = WsdlRegistry()
+    registry.AddSnapshot('adspygoogle.adwords', {
+        ('v201309', 'CampaignService'): WsdlSnapshot.Encode('<wsdl/>')})
+    registry.GetProxy(URL, 'config', snapshot_key=SNAPSHOT_KEY)
+
+    wsdl_source = self.proxy_class.call_args[0][0]
+    self.assertEqual('<wsdl/>', wsdl_source.read())
+    self.assertEqual(URL + '?wsdl', wsdl_source.name)
+    self.assertEqual(1, registry.GetStats()['snapshot_parses'])
+
+  def testGetProxy_snapshotServesAnyServer(self):
+    """Tests that a snapshot is used whichever server a service is for."""
+    registry = WsdlRegistry()
+    registry.AddSnapshot('adspygoogle.adwords', {
+        ('v201309', 'CampaignService'): WsdlSnapshot.Encode('<wsdl/>')})
+    view = registry.GetProxy(SANDBOX_URL, 'config', snapshot_key=SNAPSHOT_KEY)
+    self.assertEqual(SANDBOX_URL, view.methods['get'].location)
+
+    registry.GetProxy(URL, 'config',
+                      snapshot_key=('adspygoogle.dfp', 'v201309',
+                                    'CampaignService'))
+    self.proxy_class.assert_called_with(URL + '?wsdl', noroot=1)
+    self.assertEqual({'parses': 2, 'hits': 0, 'snapshot_parses': 1},
+                     registry.GetStats())
+
+  def testClear(self):
+    """Tests that a cleared registry parses WSDLs again."""
+    registry = WsdlRegistry()
+    registry.GetProxy(URL, 'config')
+    registry.Clear()
+    registry.GetProxy(URL, 'config')
+    self.assertEqual(2, self.proxy_class.call_count)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,58 @@
+#!/usr/bin/python
+#
+# Copyright 2013 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests to cover WsdlSnapshot."""
+
+__author__ = 'api.jdilallo@gmail.com (Joseph DiLallo)'
+
+import os
+import sys
+import tempfile
+import unittest
+sys.path.insert(0, os.path.join('..', '..', '..'))
+
+from adspygoogle.common import WsdlSnapshot
+
+
+KEY = ('v201306', 'LineItemService')
+
+
+class WsdlSnapshotTest(unittest.TestCase):
+
+  """Tests for the adspygoogle.common.WsdlSnapshot module."""
+
+  def testWrite(self):
+    """Tests that a written snapshot restores the WSDLs it was given."""
+    wsdl = '<wsdl:definitions>%s</wsdl:definitions>' % ('x' * 1000)
+    _, path = tempfile.mkstemp(suffix='.py')
+    try:
+      WsdlSnapshot.Write(path, 'adspygoogle.dfp', {KEY: wsdl})
+      snapshot = {}
+      execfile(path, snapshot)
+    finally:
+      os.remove(path)
+
+    self.assertEqual([KEY], snapshot['WSDLS'].keys())
+    self.assertTrue(len(snapshot['WSDLS'][KEY]) < len(wsdl))
+    self.assertEqual(wsdl, WsdlSnapshot.Decode(snapshot['WSDLS'][KEY]))
+
+  def testLoad_noSnapshot(self):
+    """Tests that a product without a snapshot has no bundled WSDLs."""
+    self.assertEqual({}, WsdlSnapshot.Load('adspygoogle.common'))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -68,6 +68,27 @@ class GenericDfaServiceTest(unittest.TestCase):
           service._GenerateToken()
           self.assertEqual(len(captured_warnings), 0)
 
+  def testGenerateToken_sharedConfigUnchanged(self):
+    config = {'access': '', 'units': '0', 'xml_log': 'n', 'request_log': 'n',
+              'debug': 'n', 'raw_response': 'y', 'compress': 'n',
+              'app_name': ''}
+    with mock.patch('adspygoogle.SOAPpy.WSDL.Proxy'):
+      service = GenericDfaService.GenericDfaService(
+          {'Username': 'username', 'oauth2credentials': object()}, config,
+          {'server': '', 'version': '', 'http_proxy': ''},
+          mock.Mock(), mock.Mock(), 'ServiceInterface')
+
+      with mock.patch('adspygoogle.dfa.GenericDfaService.GenericDfaService.'
+                      '_CreateMethod') as mock_create_method:
+        def CheckConfig(*unused_args):
+          self.assertEqual('y', config['raw_response'])
+          return ({'token': 'token'},)
+        mock_create_method.return_value.side_effect = CheckConfig
+        service._GenerateToken()
+
+    self.assertEqual('y', config['raw_response'])
+    self.assertEqual('token', service._headers['AuthToken'])
+
   def testWrapSoapCall(self):
     with mock.patch('adspygoogle.SOAPpy.WSDL.Proxy'):
       service = GenericDfaService.GenericDfaService(